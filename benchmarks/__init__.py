@@ -0,0 +1 @@
+"""Offline benchmarks and simulation harnesses for the Lizard bot."""
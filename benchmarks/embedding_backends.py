@@ -0,0 +1,192 @@
+"""Mention matching backends compared: start-up, memory, latency and match quality.
+
+Each backend (``ngram`` and, when sentence-transformers is installed,
+``transformer``) runs in its own Python process so their memory use does not
+mix. A run loads the backend against the shipped responses file, then looks up
+a fixed set of mention-style queries one at a time.
+
+Match quality is measured against the transformer: how often the n-gram
+matcher picks the same top response, and how often its pick is among the
+transformer's top five. Each backend's match rate at its default threshold is
+reported too. Without sentence-transformers only the n-gram numbers are shown.
+
+Usage::
+
+    python -m benchmarks.embedding_backends
+    python -m benchmarks.embedding_backends --repeat 20 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from lizard_bot.embedding_service import EmbeddingService
+from lizard_bot.metrics import Histogram
+
+from .embedding_batch import QUERIES, load_responses
+
+
+BACKENDS = ("ngram", "transformer")
+
+# Mentions beyond the batch benchmark's set, including typos and emphasis.
+EXTRA_QUERIES = (
+    "want some crickets?",
+    "are you cold",
+    "go to sleep",
+    "can you climb",
+    "don't step on me",
+    "lizzard pls",
+    "HISS",
+    "you are so slow",
+    "shedding season",
+    "bask in the lamp",
+    "catch the fly",
+    "where do you hide",
+    "I will poke you",
+    "show me your tongue",
+    "sand everywhere",
+    "good morning",
+)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure_backend(args: argparse.Namespace) -> Dict[str, Any]:
+    """Load one backend in this process and look up every query."""
+    responses = load_responses(args.responses)
+    queries = list(QUERIES + EXTRA_QUERIES)
+    rss_before = _peak_rss_mb()
+
+    started = time.perf_counter()
+    service = EmbeddingService(args.model, backend=args.backend, cache_size=0)
+    if not service.load_now(responses) or service.active_backend != args.backend:
+        return {"backend": args.backend, "error": service.error or service.state}
+    startup = time.perf_counter() - started
+
+    latencies = Histogram(len(queries) * args.repeat)
+    top: List[List[int]] = []
+    scores: List[float] = []
+    rows = {response: row for row, response in enumerate(responses)}
+    for repeat in range(args.repeat):
+        for query in queries:
+            began = time.perf_counter()
+            results = service.find_most_similar(query, top_k=5)
+            latencies.observe(time.perf_counter() - began)
+            if repeat == 0:
+                top.append([rows[response] for response, _ in results])
+                scores.append(results[0][1] if results else 0.0)
+
+    return {
+        "backend": args.backend,
+        "model": service.model_name,
+        "responses": len(responses),
+        "queries": len(queries),
+        "startup_seconds": startup,
+        "timings": service.timings,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": _peak_rss_mb() - rss_before,
+        "matrix_mb": service.response_embeddings.nbytes / 1e6,
+        "query_ms_p50": latencies.percentile(50) * 1000.0,
+        "query_ms_p95": latencies.percentile(95) * 1000.0,
+        "min_similarity": service.min_similarity,
+        "match_rate": sum(score >= service.min_similarity for score in scores) / len(scores),
+        "top5": top,
+    }
+
+
+def run_backend(args: argparse.Namespace, backend: str) -> Dict[str, Any]:
+    """Run :func:`measure_backend` for ``backend`` in a fresh interpreter."""
+    command = [
+        sys.executable, "-m", "benchmarks.embedding_backends",
+        "--backend", backend, "--repeat", str(args.repeat), "--model", args.model, "--json",
+    ]
+    if args.responses:
+        command += ["--responses", args.responses]
+    child = subprocess.run(command, capture_output=True, text=True)
+    if child.returncode != 0:
+        errors = child.stderr.strip().splitlines() or [f"exit status {child.returncode}"]
+        return {"backend": backend, "error": errors[-1]}
+    # The report is the last line; libraries may print above it.
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def compare(reference: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, float]:
+    pairs = list(zip(reference["top5"], other["top5"]))
+    usable = [(ref, mine) for ref, mine in pairs if ref and mine]
+    if not usable:
+        return {}
+    return {
+        "top1_agreement": sum(ref[0] == mine[0] for ref, mine in usable) / len(usable),
+        "top1_in_reference_top5": sum(mine[0] in ref for ref, mine in usable) / len(usable),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {backend: run_backend(args, backend) for backend in BACKENDS}
+    report: Dict[str, Any] = {"results": results}
+    transformer, ngram = results["transformer"], results["ngram"]
+    if "error" not in transformer and "error" not in ngram:
+        report["ngram_vs_transformer"] = compare(transformer, ngram)
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{'backend':>12} {'startup_s':>9} {'rss_mb':>7} {'matrix_mb':>9} {'p50_ms':>7} "
+        f"{'p95_ms':>7} {'threshold':>9} {'matched':>7}"
+    ]
+    for backend, row in report["results"].items():
+        if "error" in row:
+            lines.append(f"{backend:>12} unavailable: {row['error']}")
+            continue
+        lines.append(
+            f"{backend:>12} {row['startup_seconds']:>9.3f} {row['rss_growth_mb']:>7.1f} "
+            f"{row['matrix_mb']:>9.2f} {row['query_ms_p50']:>7.3f} {row['query_ms_p95']:>7.3f} "
+            f"{row['min_similarity']:>9.2f} {row['match_rate']:>7.0%}"
+        )
+    quality = report.get("ngram_vs_transformer")
+    if quality:
+        lines.append(
+            f"ngram vs transformer: top-1 agreement {quality['top1_agreement']:.0%}, "
+            f"ngram top-1 in transformer top-5 {quality['top1_in_reference_top5']:.0%}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="passes over the query set")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--responses", help="responses file (default: the shipped one)")
+    parser.add_argument("--backend", choices=BACKENDS, help="measure one backend in-process")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    logging.getLogger("discord").setLevel(logging.WARNING)
+    logging.getLogger("lizard_bot").setLevel(logging.ERROR)
+
+    if args.backend:
+        report = measure_backend(args)
+        print(json.dumps(report) if args.json else json.dumps(report, indent=2))
+        return report
+    report = run(args)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Mention throughput with and without micro-batching of embedding lookups.
+
+Fires waves of concurrent ``EmbeddingService.best_response`` calls, the way
+simultaneous mentions from several guilds arrive, against the shipped
+responses file. Each concurrency level runs once with batching off
+(``batch_size=1``, one encode per mention) and once with the given batch
+size and window, both sharing one loaded model.
+
+The query cache is off, so every mention is encoded. The model is loaded
+in-process; without ``sentence-transformers`` the service falls back to the
+n-gram matcher and the report's ``backend`` says so.
+
+Usage::
+
+    python -m benchmarks.embedding_batch
+    python -m benchmarks.embedding_batch --concurrency 1 10 100 --waves 20 --json
+    python -m benchmarks.embedding_batch --batch-size 32 --window-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from lizard_bot.embedding_service import EmbeddingService
+from lizard_bot.metrics import Histogram
+from lizard_bot.text_cache import TextCache
+
+from .opus_playback import _usage
+
+
+# What people actually @ the bot with; cycled to fill each wave.
+QUERIES = (
+    "hi lizard",
+    "are you real",
+    "tell me a fact",
+    "what do you eat",
+    "do you like the sun",
+    "why are you in my voice channel",
+    "go away lizard",
+    "can lizards swim",
+    "who is the best lizard",
+    "are you a dragon",
+    "how old are you",
+    "do you have a tail",
+)
+
+
+def load_responses(path: Optional[str]) -> List[str]:
+    if path is None:
+        cache = TextCache(Path(__file__).resolve().parents[1])
+        cache.register("responses", "lizard_bot_responses.txt")
+    else:
+        cache = TextCache(Path(path).parent)
+        cache.register("responses", Path(path).name)
+    return cache.get_lines("responses") or []
+
+
+async def measure(service: EmbeddingService, concurrency: int, waves: int) -> Dict[str, Any]:
+    latencies = Histogram(max(1, concurrency * waves))
+    answered = 0
+
+    async def mention(index: int) -> None:
+        nonlocal answered
+        started = time.perf_counter()
+        if await service.best_response(QUERIES[index % len(QUERIES)], min_similarity=0.0):
+            answered += 1
+        latencies.observe(time.perf_counter() - started)
+
+    before = _usage()
+    for wave in range(waves):
+        await asyncio.gather(*(mention(wave * concurrency + i) for i in range(concurrency)))
+    after = _usage()
+
+    mentions = concurrency * waves
+    wall = after["wall"] - before["wall"]
+    return {
+        "mentions": mentions,
+        "answered": answered,
+        "mentions_per_second": mentions / wall if wall else 0.0,
+        "cpu_ms_per_mention": (after["cpu"] - before["cpu"]) * 1000.0 / mentions,
+        "latency_ms_p50": latencies.percentile(50) * 1000.0,
+        "latency_ms_p95": latencies.percentile(95) * 1000.0,
+        "batches": service.batches,
+        "mean_batch_size": service.batch_sizes.snapshot()["mean"],
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    responses = load_responses(args.responses)
+    base = EmbeddingService(args.model, torch_threads=args.torch_threads, cache_size=0)
+    if not base.load_now(responses):
+        raise SystemExit(f"Embedding model unavailable ({base.state}): {base.error}")
+
+    modes = {
+        "unbatched": {"batch_size": 1, "batch_window": 0.0},
+        "batched": {"batch_size": args.batch_size, "batch_window": args.window_ms / 1000.0},
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for concurrency in args.concurrency:
+        for mode, batching in modes.items():
+            service = EmbeddingService(
+                args.model,
+                workers=args.workers,
+                torch_threads=args.torch_threads,
+                max_pending=max(concurrency, 1),
+                cache_size=0,
+                **batching,
+            )
+            service.load_now(responses, model=base.model)
+            # One untimed wave so thread start-up is not counted.
+            await measure(service, concurrency, 1)
+            service.batches = 0
+            service.batch_sizes = Histogram()
+            results[f"{concurrency}/{mode}"] = dict(
+                await measure(service, concurrency, args.waves),
+                concurrency=concurrency,
+                mode=mode,
+            )
+    return {
+        "model": base.model_name,
+        "backend": base.active_backend,
+        "responses": len(responses),
+        "workers": args.workers,
+        "torch_threads": args.torch_threads,
+        "batch_size": args.batch_size,
+        "window_ms": args.window_ms,
+        "load_timings": base.timings,
+        "results": results,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"model={report['model']} backend={report['backend']} responses={report['responses']} "
+        f"workers={report['workers']} "
+        f"torch_threads={report['torch_threads']} batch_size={report['batch_size']} "
+        f"window_ms={report['window_ms']}",
+        f"{'conc':>5} {'mode':>10} {'mentions/s':>10} {'cpu_ms':>7} {'p50_ms':>8} "
+        f"{'p95_ms':>8} {'batches':>7} {'mean_bs':>7}",
+    ]
+    for row in report["results"].values():
+        lines.append(
+            f"{row['concurrency']:>5} {row['mode']:>10} {row['mentions_per_second']:>10.1f} "
+            f"{row['cpu_ms_per_mention']:>7.2f} {row['latency_ms_p50']:>8.2f} "
+            f"{row['latency_ms_p95']:>8.2f} {row['batches']:>7} {row['mean_batch_size']:>7.1f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--waves", type=int, default=10, help="waves of mentions per level")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--torch-threads", type=int, default=2)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--responses", help="responses file (default: the shipped one)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep the service's INFO logging")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger("discord").setLevel(logging.WARNING)
+        logging.getLogger("lizard_bot").setLevel(logging.WARNING)
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Response matrix precision: float32 vs float16 vs int8 memory, speed and recall.
+
+Builds the same synthetic corpora as ``embedding_retrieval`` and encodes each
+once at float32 with the n-gram matcher at ``--dimensions`` (384, MiniLM's
+width, by default). The float16 and int8 services start from that matrix,
+so all three score identical vectors. By default every response is scored,
+so the timings are those of the matrix alone; ``--candidates`` puts the BM25
+first stage in front.
+
+Queries are the fixed mention set plus ``--sampled`` corpus lines cut to
+their first few words. For each precision it reports the matrix size,
+per-query latency, recall@k of the float32 top ``--top-k``, top-1 agreement
+and the largest score difference.
+
+Usage::
+
+    python -m benchmarks.embedding_precision
+    python -m benchmarks.embedding_precision --sizes 10000 100000 --top-k 5 --json
+    python -m benchmarks.embedding_precision --candidates 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from lizard_bot.embedding_service import EmbeddingService
+from lizard_bot.metrics import Histogram
+from lizard_bot.ngram_encoder import HashedNgramEncoder
+
+from .embedding_backends import EXTRA_QUERIES
+from .embedding_batch import QUERIES, load_responses
+from .embedding_retrieval import synthetic_corpus
+
+PRECISIONS = ("float32", "float16", "int8")
+
+
+def sample_queries(corpus: List[str], count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    lines = rng.sample(corpus, min(count, len(corpus)))
+    return [" ".join(line.split()[: rng.randint(2, 4)]) for line in lines]
+
+
+def lookup(
+    service: EmbeddingService, queries: Sequence[str], top_k: int, repeat: int
+) -> Dict[str, Any]:
+    latencies = Histogram(len(queries) * repeat)
+    results: List[List[Any]] = []
+    for round_ in range(repeat):
+        for query in queries:
+            started = time.perf_counter()
+            matches = service.find_most_similar(query, top_k=top_k)
+            latencies.observe(time.perf_counter() - started)
+            if round_ == 0:
+                results.append(matches)
+    return {
+        "query_ms_p50": latencies.percentile(50) * 1000.0,
+        "query_ms_p95": latencies.percentile(95) * 1000.0,
+        "results": results,
+    }
+
+
+def compare(reference: List[List[Any]], other: List[List[Any]], top_k: int) -> Dict[str, float]:
+    recall = top1 = error = 0.0
+    for expected, found in zip(reference, other):
+        recall += len({r for r, _ in expected} & {r for r, _ in found}) / max(1, len(expected))
+        top1 += bool(expected and found and expected[0][0] == found[0][0])
+        scores = dict(found)
+        error = max([error] + [abs(s - scores[r]) for r, s in expected if r in scores])
+    return {
+        f"recall_at_{top_k}": recall / len(reference),
+        "top1_agreement": top1 / len(reference),
+        "max_score_error": error,
+    }
+
+
+def measure(args: argparse.Namespace, responses: List[str], size: int) -> Dict[str, Any]:
+    corpus = synthetic_corpus(responses, size, args.seed)
+    queries = list(QUERIES + EXTRA_QUERIES) + sample_queries(corpus, args.sampled, args.seed)
+
+    base = EmbeddingService(candidates=0, cache_size=0)
+    base.load_now(corpus, model=HashedNgramEncoder(dimensions=args.dimensions))
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    reference: List[List[Any]] = []
+    for precision in PRECISIONS:
+        service = EmbeddingService(candidates=args.candidates, cache_size=0, precision=precision)
+        started = time.perf_counter()
+        service.load_from(base, corpus)
+        convert_seconds = time.perf_counter() - started
+        found = lookup(service, queries, args.top_k, args.repeat)
+        if precision == "float32":
+            reference = found["results"]
+        rows[precision] = dict(
+            compare(reference, found["results"], args.top_k),
+            matrix_mb=service.response_embeddings.nbytes / 1e6,
+            convert_seconds=convert_seconds,
+            query_ms_p50=found["query_ms_p50"],
+            query_ms_p95=found["query_ms_p95"],
+        )
+    return {"responses": size, "queries": len(queries), "precisions": rows}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    responses = load_responses(args.responses)
+    return {
+        "dimensions": args.dimensions,
+        "candidates": args.candidates,
+        "top_k": args.top_k,
+        "results": [measure(args, responses, size) for size in args.sizes],
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    top_k = report["top_k"]
+    lines = [
+        f"dimensions={report['dimensions']} candidates={report['candidates']} top_k={top_k}",
+        f"{'responses':>9} {'precision':>9} {'matrix_mb':>9} {'p50_ms':>7} {'p95_ms':>7} "
+        f"{'recall@' + str(top_k):>9} {'top1':>6} {'max_err':>8}",
+    ]
+    for result in report["results"]:
+        for precision, row in result["precisions"].items():
+            lines.append(
+                f"{result['responses']:>9} {precision:>9} {row['matrix_mb']:>9.1f} "
+                f"{row['query_ms_p50']:>7.3f} {row['query_ms_p95']:>7.3f} "
+                f"{row[f'recall_at_{top_k}']:>9.1%} {row['top1_agreement']:>6.0%} "
+                f"{row['max_score_error']:>8.5f}"
+            )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 50000])
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--candidates", type=int, default=0, help="BM25 first stage (0: off)")
+    parser.add_argument("--sampled", type=int, default=200, help="extra queries cut from corpus lines")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the query set")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--responses", help="responses file (default: the shipped one)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    logging.getLogger("discord").setLevel(logging.WARNING)
+    logging.getLogger("lizard_bot").setLevel(logging.WARNING)
+
+    report = run(args)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Lookup cost against large response lists: full scan vs BM25 candidates + rerank.
+
+Builds synthetic corpora of the given sizes from the shipped responses'
+vocabulary and looks up a fixed set of mentions in each, once scoring every
+response and once scoring only the BM25 index's candidates. Vectors come from
+the n-gram matcher at ``--dimensions`` (384, MiniLM's width, by default) so no
+model is needed; the lookup path is the same for the transformer.
+
+Reports per-query latency, how often the two pipelines pick the same best
+response, how often the first stage found no candidate (and fell back to a
+full scan), and the memory of the matrix and the index.
+
+Usage::
+
+    python -m benchmarks.embedding_retrieval
+    python -m benchmarks.embedding_retrieval --sizes 1000 10000 100000 --candidates 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from lizard_bot.bm25 import tokenize
+from lizard_bot.embedding_service import EmbeddingService
+from lizard_bot.metrics import Histogram
+from lizard_bot.ngram_encoder import HashedNgramEncoder
+
+from .embedding_backends import EXTRA_QUERIES
+from .embedding_batch import QUERIES, load_responses
+
+
+def synthetic_corpus(responses: List[str], size: int, seed: int) -> List[str]:
+    """``size`` distinct lines of 3-8 words drawn from the responses' vocabulary."""
+    rng = random.Random(seed)
+    vocabulary = sorted({word for response in responses for word in tokenize(response)})
+    lines = list(dict.fromkeys(responses))[:size]
+    seen = set(lines)
+    while len(lines) < size:
+        line = " ".join(rng.choices(vocabulary, k=rng.randint(3, 8))).capitalize() + "."
+        if line not in seen:
+            seen.add(line)
+            lines.append(line)
+    return lines
+
+
+def lookup(service: EmbeddingService, queries: Sequence[str], repeat: int) -> Dict[str, Any]:
+    latencies = Histogram(len(queries) * repeat)
+    best: List[Optional[str]] = []
+    for round_ in range(repeat):
+        for query in queries:
+            started = time.perf_counter()
+            results = service.find_most_similar(query, top_k=1)
+            latencies.observe(time.perf_counter() - started)
+            if round_ == 0:
+                best.append(results[0][0] if results else None)
+    return {
+        "query_ms_p50": latencies.percentile(50) * 1000.0,
+        "query_ms_p95": latencies.percentile(95) * 1000.0,
+        "best": best,
+    }
+
+
+def measure(args: argparse.Namespace, responses: List[str], size: int) -> Dict[str, Any]:
+    corpus = synthetic_corpus(responses, size, args.seed)
+    queries = list(QUERIES + EXTRA_QUERIES)
+    encoder = HashedNgramEncoder(dimensions=args.dimensions)
+
+    dense = EmbeddingService(candidates=0, cache_size=0)
+    started = time.perf_counter()
+    dense.load_now(corpus, model=encoder)
+    encode_seconds = time.perf_counter() - started
+
+    staged = EmbeddingService(candidates=args.candidates, cache_size=0)
+    started = time.perf_counter()
+    staged.load_from(dense, corpus)
+    index_seconds = time.perf_counter() - started
+
+    full = lookup(dense, queries, args.repeat)
+    fast = lookup(staged, queries, args.repeat)
+    lookups = max(1, staged.reranked + staged.full_scans)
+    return {
+        "responses": size,
+        "encode_seconds": encode_seconds,
+        "index_seconds": index_seconds,
+        "matrix_mb": dense.response_embeddings.nbytes / 1e6,
+        "index_mb": staged._lexical.nbytes / 1e6 if staged._lexical is not None else 0.0,
+        "full_scan_ms_p50": full["query_ms_p50"],
+        "full_scan_ms_p95": full["query_ms_p95"],
+        "bm25_ms_p50": fast["query_ms_p50"],
+        "bm25_ms_p95": fast["query_ms_p95"],
+        "top1_agreement": sum(a == b for a, b in zip(full["best"], fast["best"])) / len(queries),
+        "fallback_rate": staged.full_scans / lookups,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    responses = load_responses(args.responses)
+    return {
+        "dimensions": args.dimensions,
+        "candidates": args.candidates,
+        "results": [measure(args, responses, size) for size in args.sizes],
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"dimensions={report['dimensions']} candidates={report['candidates']}",
+        f"{'responses':>9} {'matrix_mb':>9} {'index_mb':>8} {'index_s':>7} {'full_p50':>8} "
+        f"{'full_p95':>8} {'bm25_p50':>8} {'bm25_p95':>8} {'agree':>6} {'fallback':>8}",
+    ]
+    for row in report["results"]:
+        lines.append(
+            f"{row['responses']:>9} {row['matrix_mb']:>9.1f} {row['index_mb']:>8.2f} "
+            f"{row['index_seconds']:>7.2f} {row['full_scan_ms_p50']:>8.3f} "
+            f"{row['full_scan_ms_p95']:>8.3f} {row['bm25_ms_p50']:>8.3f} "
+            f"{row['bm25_ms_p95']:>8.3f} {row['top1_agreement']:>6.0%} {row['fallback_rate']:>8.0%}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 50000])
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the query set")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--responses", help="responses file (default: the shipped one)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    logging.getLogger("discord").setLevel(logging.WARNING)
+    logging.getLogger("lizard_bot").setLevel(logging.WARNING)
+
+    report = run(args)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+import asyncio
+import selectors
+import time
+from collections import Counter
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+from lizard_bot.audio import FRAME_SECONDS, OpusPacketCache, write_packet_file
+from lizard_bot.audio_library import AudioLibrary, initialize_audio_library
+from lizard_bot.settings import Settings
+
+
+class _VirtualTimeSelector(selectors.DefaultSelector):
+    """Selector that jumps the virtual clock instead of blocking on timeouts."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.loop: Optional["VirtualTimeEventLoop"] = None
+
+    def select(self, timeout: Optional[float] = None):
+        if timeout is None:
+            return super().select(None)
+        if self.loop is not None and self.loop.executor_jobs:
+            # A worker thread runs in real time; block until it reports back.
+            return super().select(timeout)
+        ready = super().select(0)
+        if not ready and timeout > 0 and self.loop is not None:
+            self.loop.advance(timeout)
+        return ready
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock only moves when every task is waiting on a timer.
+
+    ``asyncio.sleep`` and ``asyncio.wait_for`` complete instantly in wall time
+    while still advancing :meth:`time`, so long schedules run deterministically.
+    While ``run_in_executor`` work is in flight the clock stands still and the
+    loop waits for it in real time, so timeouts cannot fire early.
+    """
+
+    def __init__(self) -> None:
+        self._virtual_now = 0.0
+        self.executor_jobs = 0
+        selector = _VirtualTimeSelector()
+        super().__init__(selector=selector)
+        selector.loop = self
+
+    def run_in_executor(self, executor: Any, func: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        future = super().run_in_executor(executor, func, *args)
+        self.executor_jobs += 1
+        future.add_done_callback(self._executor_done)
+        return future
+
+    def _executor_done(self, _: "asyncio.Future[Any]") -> None:
+        self.executor_jobs -= 1
+
+    def time(self) -> float:
+        return self._virtual_now
+
+    def advance(self, seconds: float) -> None:
+        self._virtual_now += seconds
+
+
+class FakeClock:
+    """Naive ``datetime`` clock driven by the running loop's time."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, start: Optional[datetime] = None) -> None:
+        self.loop = loop
+        self.start = start or datetime(2024, 1, 1)
+        self._origin = loop.time()
+
+    def __call__(self) -> datetime:
+        return self.start + timedelta(seconds=self.loop.time() - self._origin)
+
+    def elapsed(self) -> float:
+        return self.loop.time() - self._origin
+
+
+class FakeMember:
+    def __init__(self, guild: "FakeGuild", member_id: int, bot: bool = False) -> None:
+        self.guild = guild
+        self.id = member_id
+        self.bot = bot
+        self.display_name = f"member-{member_id}"
+        self.mention = f"<@{member_id}>"
+        self.voice: Optional[FakeVoiceState] = None
+
+    def relocate(self, channel: Optional["FakeVoiceChannel"]) -> None:
+        """Apply a voice state change and dispatch it like the gateway would."""
+        before = FakeVoiceState(self.voice.channel if self.voice else None)
+        if self.voice and self.voice.channel is not None:
+            self.voice.channel.remove_member(self)
+        if channel is None:
+            self.voice = None
+        else:
+            channel.add_member(self)
+            if self.bot and self.guild.voice_client is not None:
+                self.guild.voice_client.channel = channel
+        after = FakeVoiceState(channel)
+        self.guild.fleet.dispatch("voice_state_update", self, before, after)
+
+    async def move_to(self, channel: Optional["FakeVoiceChannel"]) -> None:
+        fleet = self.guild.fleet
+        fleet.member_moves += 1
+        fleet.rest_in_flight += 1
+        fleet.rest_peak = max(fleet.rest_peak, fleet.rest_in_flight)
+        try:
+            if fleet.rest_latency:
+                await asyncio.sleep(fleet.rest_latency)
+            self.relocate(channel)
+        finally:
+            fleet.rest_in_flight -= 1
+
+    async def edit(self, **_: Any) -> None:
+        return None
+
+
+class FakeVoiceState:
+    def __init__(self, channel: Optional["FakeVoiceChannel"]) -> None:
+        self.channel = channel
+
+
+class FakeVoiceClient:
+    """Stand-in for ``discord.VoiceClient`` that never touches the network."""
+
+    def __init__(self, channel: "FakeVoiceChannel") -> None:
+        self.channel = channel
+        self.guild = channel.guild
+        self.client = channel.guild.fleet
+        self._connected = True
+        self.source: Any = None
+        self._loop = asyncio.get_running_loop()
+        self._playing_until = 0.0
+        self._after: Optional[asyncio.TimerHandle] = None
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def is_playing(self) -> bool:
+        return self._loop.time() < self._playing_until
+
+    def play(self, source: Any, *, after: Optional[Callable[[Optional[Exception]], None]] = None) -> None:
+        # Drain the source up front into the fleet's packet sink, then stay
+        # "playing" for as long as its frames would take to send. Like the
+        # player thread, PCM is Opus-encoded when the fleet has an encoder
+        # and the source is cleaned up (ffmpeg reaped) once it runs dry.
+        fleet = self.guild.fleet
+        self.source = source
+        encoder = None if source.is_opus() else fleet.encoder
+        frames = 0
+        try:
+            while True:
+                data = source.read()
+                if not data:
+                    break
+                if encoder is not None:
+                    data = encoder.encode(data, encoder.SAMPLES_PER_FRAME)
+                frames += 1
+                fleet.packets += 1
+                fleet.packet_bytes += len(data)
+        finally:
+            source.cleanup()
+        duration = frames * FRAME_SECONDS
+        fleet.plays += 1
+        self._playing_until = self._loop.time() + duration
+        if after is not None:
+            self._after = self._loop.call_later(duration, after, None)
+
+    def stop(self) -> None:
+        self.source = None
+        self._playing_until = 0.0
+        if self._after is not None:
+            self._after.cancel()
+            self._after = None
+
+    async def move_to(self, channel: "FakeVoiceChannel") -> None:
+        # Like discord.py, return once the request is sent; the gateway
+        # confirms the move ``move_latency`` later.
+        fleet = self.guild.fleet
+        fleet.moves += 1
+        self._loop.call_later(fleet.move_latency, self.guild.me.relocate, channel)
+
+    async def disconnect(self, *, force: bool = False) -> None:
+        self.stop()
+        self._connected = False
+        if self.guild.voice_client is self:
+            self.guild.voice_client = None
+            if self.guild.me.voice is not None:
+                self.guild.me.relocate(None)
+
+
+class FakeVoiceChannel(discord.VoiceChannel):
+    """Voice channel that passes ``isinstance`` checks without gateway state."""
+
+    def __init__(self, guild: "FakeGuild", channel_id: int, name: str) -> None:
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.user_limit = 0
+        self.permissions = discord.Permissions.all()
+        # Failure injection: a connect that takes ``connect_delay`` seconds
+        # (instead of the fleet's latency) and then raises ``connect_error``.
+        self.connect_delay: Optional[float] = None
+        self.connect_error: Optional[BaseException] = None
+        self._fake_members: List[FakeMember] = []
+
+    @property
+    def members(self) -> List[FakeMember]:  # type: ignore[override]
+        return list(self._fake_members)
+
+    def permissions_for(self, _: Any) -> discord.Permissions:  # type: ignore[override]
+        return self.permissions
+
+    def add_member(self, member: FakeMember) -> None:
+        self._fake_members.append(member)
+        member.voice = FakeVoiceState(self)
+
+    def remove_member(self, member: FakeMember) -> None:
+        if member in self._fake_members:
+            self._fake_members.remove(member)
+        member.voice = None
+
+    async def connect(self, **_: Any) -> FakeVoiceClient:  # type: ignore[override]
+        fleet = self.guild.fleet
+        fleet.connects += 1
+        if fleet.on_connect is not None:
+            fleet.on_connect(self)
+        delay = fleet.connect_latency if self.connect_delay is None else self.connect_delay
+        if delay:
+            await asyncio.sleep(delay)
+        if self.connect_error is not None:
+            raise self.connect_error
+        voice_client = FakeVoiceClient(self)
+        self.guild.voice_client = voice_client
+        self.guild.me.relocate(self)
+        return voice_client
+
+
+class FakeGuild:
+    def __init__(self, fleet: "FakeFleet", guild_id: int, shard_id: int = 0) -> None:
+        self.fleet = fleet
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.shard_id = shard_id
+        self.voice_channels: List[FakeVoiceChannel] = []
+        self.members: List[FakeMember] = []
+        self.voice_client: Optional[FakeVoiceClient] = None
+        self.me = FakeMember(self, 0, bot=True)
+
+    def get_member(self, member_id: int) -> Optional[FakeMember]:
+        for member in self.members:
+            if member.id == member_id:
+                return member
+        return None
+
+
+class FakeShard:
+    def __init__(self, shard_id: int, latency: float = 0.05) -> None:
+        self.id = shard_id
+        self.latency = latency
+        self.closed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+
+class FakeFleet:
+    """Collection of synthetic guilds exposed through a minimal bot facade."""
+
+    def __init__(
+        self,
+        connect_latency: float = 0.5,
+        shard_count: int = 1,
+        move_latency: float = 0.0,
+        rest_latency: float = 0.0,
+    ) -> None:
+        self.shards: Dict[int, FakeShard] = {
+            shard_id: FakeShard(shard_id) for shard_id in range(max(1, shard_count))
+        }
+        self.guilds: List[FakeGuild] = []
+        self.connect_latency = connect_latency
+        self.move_latency = move_latency
+        self.rest_latency = rest_latency
+        self.connects = 0
+        self.moves = 0
+        self.plays = 0
+        self.packets = 0
+        self.packet_bytes = 0
+        # Optional ``discord.opus.Encoder`` applied to PCM sources on play.
+        self.encoder: Any = None
+        self.member_moves = 0
+        self.rest_in_flight = 0
+        self.rest_peak = 0
+        self.on_connect: Optional[Callable[[FakeVoiceChannel], None]] = None
+        self._listeners: List[Tuple[str, Callable[..., bool], "asyncio.Future[Any]"]] = []
+        self._channels: Dict[int, FakeVoiceChannel] = {}
+        self._next_id = 1
+
+    def _allocate_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def add_channel(self, guild: FakeGuild, name: str, listed: bool = True) -> FakeVoiceChannel:
+        channel = FakeVoiceChannel(guild, self._allocate_id(), name)
+        if listed:
+            guild.voice_channels.append(channel)
+        self._channels[channel.id] = channel
+        return channel
+
+    def add_guild(self, channels: int, members: int, shard_id: int = 0) -> FakeGuild:
+        guild = FakeGuild(self, self._allocate_id(), shard_id=shard_id)
+        for index in range(channels):
+            self.add_channel(guild, f"voice-{index}")
+        for _ in range(members):
+            guild.members.append(FakeMember(guild, self._allocate_id()))
+        self.guilds.append(guild)
+        return guild
+
+    async def wait_for(
+        self,
+        event: str,
+        *,
+        check: Optional[Callable[..., bool]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._listeners.append((event, check or (lambda *_: True), future))
+        return await asyncio.wait_for(future, timeout)
+
+    def dispatch(self, event: str, *args: Any) -> None:
+        remaining = []
+        for name, check, future in self._listeners:
+            if future.done():
+                continue
+            if name == event and check(*args):
+                future.set_result(args[0] if len(args) == 1 else args)
+            else:
+                remaining.append((name, check, future))
+        self._listeners = remaining
+
+    def get_shard(self, shard_id: int) -> Optional[FakeShard]:
+        return self.shards.get(shard_id)
+
+    def get_channel(self, channel_id: int) -> Optional[FakeVoiceChannel]:
+        return self._channels.get(channel_id)
+
+    def get_guild(self, guild_id: int) -> Optional[FakeGuild]:
+        for guild in self.guilds:
+            if guild.id == guild_id:
+                return guild
+        return None
+
+
+class CountingStore:
+    """Proxy around a guild config store that counts and times every call."""
+
+    def __init__(self, inner: Any) -> None:
+        self._inner = inner
+        self.calls: Counter[str] = Counter()
+        self.seconds = 0.0
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.seconds = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._inner, name)
+        if not callable(attribute):
+            return attribute
+
+        def counted(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - started
+                self.calls[name] += 1
+
+        return counted
+
+
+# A 20 ms Opus frame of digital silence.
+SILENT_OPUS_FRAME = b"\xf8\xff\xfe"
+
+
+def install_silent_clip(
+    settings: Settings, workdir: Path, seconds: float = 0.5
+) -> Tuple[Settings, AudioLibrary]:
+    """Point the audio library at a synthetic clip that never needs ffmpeg.
+
+    The clip's packets are written straight into the Opus packet cache under
+    the key of a placeholder source file, so loading it is a cache hit.
+    """
+    audio_file = workdir / "silence.mp3"
+    audio_file.write_bytes(b"placeholder")
+    cache_directory = workdir / "opus_cache"
+    cache_directory.mkdir(exist_ok=True)
+    cache = OpusPacketCache(cache_directory)
+    packets = [SILENT_OPUS_FRAME] * max(1, round(seconds / FRAME_SECONDS))
+    write_packet_file(cache.path_for(audio_file, cache.key(audio_file)), packets)
+    settings = replace(
+        settings,
+        audio_file=audio_file,
+        clips_directory=workdir / "clips",
+        opus_cache_directory=cache_directory,
+    )
+    return settings, initialize_audio_library(settings)
+
+
+__all__ = [
+    "CountingStore",
+    "FakeClock",
+    "FakeFleet",
+    "FakeGuild",
+    "FakeMember",
+    "FakeShard",
+    "FakeVoiceChannel",
+    "FakeVoiceClient",
+    "SILENT_OPUS_FRAME",
+    "VirtualTimeEventLoop",
+    "install_silent_clip",
+]
@@ -0,0 +1,180 @@
+"""Pending kidnaps coming due together: one voice session per victim versus one batch.
+
+Runs on a virtual clock against fake voice channels and a real SQLite store.
+The per-victim flow is the timer's behaviour before batching: a full kidnap
+session per victim, three store writes each, then a fixed pause.
+
+Usage::
+
+    python -m benchmarks.kidnap_batch --victims 1 4 16 --channels 2
+    python -m benchmarks.kidnap_batch --rest-latency 0.3 --move-concurrency 3 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from lizard_bot.settings import Settings, load_settings
+from lizard_bot.storage.sqlite_store import SqliteGuildConfigStore
+from lizard_bot.voice import execute_kidnap, kidnap_members
+
+from .fakes import CountingStore, FakeFleet, FakeGuild, FakeMember, VirtualTimeEventLoop, install_silent_clip
+
+
+# The pending_kidnap_delay_seconds default before kidnaps were batched.
+LEGACY_KIDNAP_DELAY = 2.0
+
+
+def build_guild(fleet: FakeFleet, channels: int, victims: int) -> FakeGuild:
+    guild = fleet.add_guild(channels + 1, victims + 1)
+    for index, member in enumerate(guild.members[1:]):
+        guild.voice_channels[index % channels].add_member(member)
+    return guild
+
+
+async def per_victim(
+    settings: Settings,
+    store: Any,
+    guild: FakeGuild,
+    victims: List[FakeMember],
+    initiator: FakeMember,
+) -> int:
+    destination = guild.voice_channels[-1]
+    kidnapped = 0
+    for member in victims:
+        if await execute_kidnap(settings, guild, member, destination):
+            store.increment_user_stat(guild.id, member.id, "kidnapped")
+            store.increment_user_stat(guild.id, initiator.id, "kidnap_successes")
+            store.clear_pending_kidnap(guild.id, member.id)
+            kidnapped += 1
+            await asyncio.sleep(LEGACY_KIDNAP_DELAY)
+    return kidnapped
+
+
+async def batched(
+    settings: Settings,
+    store: Any,
+    guild: FakeGuild,
+    victims: List[FakeMember],
+    initiator: FakeMember,
+) -> int:
+    moved = await kidnap_members(settings, guild, victims, guild.voice_channels[-1])
+    store.record_kidnaps(guild.id, [(member.id, initiator.id) for member in moved])
+    return len(moved)
+
+
+async def measure(
+    args: argparse.Namespace, settings: Settings, workdir: Path, victims: int, mode: str
+) -> Dict[str, Any]:
+    fleet = FakeFleet(
+        connect_latency=args.connect_latency,
+        move_latency=args.move_latency,
+        rest_latency=args.rest_latency,
+    )
+    guild = build_guild(fleet, args.channels, victims)
+    initiator, targets = guild.members[0], guild.members[1:]
+
+    store = CountingStore(SqliteGuildConfigStore(workdir / f"{mode}-{victims}.sqlite3"))
+    for member in targets:
+        store.set_pending_kidnap(guild.id, member.id, initiator.id)
+    store.reset()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    flow = batched if mode == "batch" else per_victim
+    kidnapped = await flow(settings, store, guild, targets, initiator)
+    return {
+        "wall_seconds": loop.time() - started,
+        "kidnapped": kidnapped,
+        "connects": fleet.connects,
+        "plays": fleet.plays,
+        "peak_rest_in_flight": fleet.rest_peak,
+        "store_writes": sum(store.calls.values()),
+        "store_ms": store.seconds * 1000.0,
+        "pending_left": len(store.load_pending_kidnaps()),
+    }
+
+
+async def run(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    settings, _ = install_silent_clip(load_settings(), workdir, args.clip_seconds)
+    settings = dataclasses.replace(settings, kidnap_move_concurrency=args.move_concurrency)
+    results = []
+    for victims in args.victims:
+        legacy = await measure(args, settings, workdir, victims, "per_victim")
+        batch = await measure(args, settings, workdir, victims, "batch")
+        results.append(
+            {
+                "victims": victims,
+                "per_victim": legacy,
+                "batch": batch,
+                "speedup": legacy["wall_seconds"] / batch["wall_seconds"]
+                if batch["wall_seconds"]
+                else 0.0,
+            }
+        )
+    return {
+        "channels": args.channels,
+        "connect_latency": args.connect_latency,
+        "rest_latency": args.rest_latency,
+        "move_concurrency": args.move_concurrency,
+        "results": results,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"channels={report['channels']} connect_latency={report['connect_latency']}s "
+        f"rest_latency={report['rest_latency']}s move_concurrency={report['move_concurrency']}",
+        f"{'victims':>7} {'legacy_s':>9} {'batch_s':>8} {'speedup':>8} {'connects':>9} "
+        f"{'plays':>7} {'writes':>8} {'peak_moves':>10}",
+    ]
+    for row in report["results"]:
+        legacy, batch = row["per_victim"], row["batch"]
+        lines.append(
+            f"{row['victims']:>7} {legacy['wall_seconds']:>9.2f} {batch['wall_seconds']:>8.2f} "
+            f"{row['speedup']:>7.2f}x {legacy['connects']:>4}/{batch['connects']:<4} "
+            f"{legacy['plays']:>3}/{batch['plays']:<3} {legacy['store_writes']:>3}/{batch['store_writes']:<4} "
+            f"{batch['peak_rest_in_flight']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--victims", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--channels", type=int, default=2, help="source channels the victims sit in")
+    parser.add_argument("--connect-latency", type=float, default=1.0, help="virtual seconds per connect")
+    parser.add_argument("--move-latency", type=float, default=0.2, help="virtual seconds per bot move")
+    parser.add_argument("--rest-latency", type=float, default=0.15, help="virtual seconds per member move")
+    parser.add_argument("--move-concurrency", type=int, default=5)
+    parser.add_argument("--clip-seconds", type=float, default=0.5)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's INFO logging")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger("discord").setLevel(logging.CRITICAL)
+
+    loop = VirtualTimeEventLoop()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            report = loop.run_until_complete(run(args, Path(workdir)))
+    finally:
+        loop.close()
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""CPU cost of one clip playback: ffmpeg + PCM + Opus encode versus pre-encoded packets.
+
+Reads every frame the way ``discord.VoiceClient``'s player thread does, without
+a Discord connection. The ffmpeg path spawns ``FFmpegPCMAudio`` and, when libopus
+is loadable, Opus-encodes each PCM frame; the pre-encoded path replays an
+``OpusClip`` built once up front. Cold and warm starts of the on-disk packet
+cache are timed as well.
+
+Usage::
+
+    python -m benchmarks.opus_playback --iterations 50
+    python -m benchmarks.opus_playback --ffmpeg /usr/bin/ffmpeg --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import resource
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import discord
+import discord.opus
+
+from lizard_bot.audio import OpusClip, OpusPacketCache
+from lizard_bot.settings import load_settings
+
+
+def _usage() -> Dict[str, float]:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "wall": time.perf_counter(),
+        "cpu": own.ru_utime + own.ru_stime,
+        "children_cpu": children.ru_utime + children.ru_stime,
+    }
+
+
+def measure(play_once: Callable[[], int], iterations: int) -> Dict[str, float]:
+    frames = 0
+    before = _usage()
+    for _ in range(iterations):
+        frames += play_once()
+    after = _usage()
+    per_run = 1000.0 / max(1, iterations)
+    return {
+        "iterations": iterations,
+        "frames_per_playback": frames / max(1, iterations),
+        "wall_ms": (after["wall"] - before["wall"]) * per_run,
+        "cpu_ms": (after["cpu"] - before["cpu"]) * per_run,
+        "ffmpeg_cpu_ms": (after["children_cpu"] - before["children_cpu"]) * per_run,
+    }
+
+
+def load_encoder() -> Optional[discord.opus.Encoder]:
+    if not discord.opus.is_loaded():
+        try:
+            discord.opus._load_default()
+        except Exception:
+            return None
+    if not discord.opus.is_loaded():
+        return None
+    return discord.opus.Encoder()
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    settings = load_settings()
+    audio_file = Path(args.audio_file) if args.audio_file else settings.audio_file
+    ffmpeg = args.ffmpeg or shutil.which("ffmpeg") or str(settings.ffmpeg_path)
+    encoder = load_encoder()
+
+    def play_ffmpeg() -> int:
+        source = discord.FFmpegPCMAudio(str(audio_file), executable=ffmpeg)
+        frames = 0
+        try:
+            while True:
+                frame = source.read()
+                if not frame:
+                    break
+                if encoder is not None:
+                    encoder.encode(frame, encoder.SAMPLES_PER_FRAME)
+                frames += 1
+        finally:
+            source.cleanup()
+        return frames
+
+    started = _usage()
+    clip = OpusClip.from_file(audio_file, Path(ffmpeg))
+    finished = _usage()
+
+    def load_cached(directory: Path) -> Dict[str, float]:
+        before = _usage()
+        OpusClip.from_file(audio_file, Path(ffmpeg), OpusPacketCache(directory))
+        after = _usage()
+        return {
+            "wall_ms": (after["wall"] - before["wall"]) * 1000.0,
+            "cpu_ms": (after["cpu"] - before["cpu"]) * 1000.0,
+            "ffmpeg_cpu_ms": (after["children_cpu"] - before["children_cpu"]) * 1000.0,
+        }
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_cold = dict(load_cached(Path(cache_dir)), subprocesses=1)
+        cache_warm = dict(load_cached(Path(cache_dir)), subprocesses=0)
+
+    def play_preencoded() -> int:
+        source = clip.source()
+        frames = 0
+        while source.read():
+            frames += 1
+        return frames
+
+    return {
+        "audio_file": str(audio_file),
+        "clip_packets": len(clip.packets),
+        "clip_bytes": clip.size_bytes,
+        "clip_seconds": clip.duration_seconds,
+        "opus_encode_in_python": encoder is not None,
+        "preencode_once": {
+            "wall_ms": (finished["wall"] - started["wall"]) * 1000.0,
+            "cpu_ms": (finished["cpu"] - started["cpu"]) * 1000.0,
+            "ffmpeg_cpu_ms": (finished["children_cpu"] - started["children_cpu"]) * 1000.0,
+            "subprocesses": 1,
+        },
+        "cache_cold_start": cache_cold,
+        "cache_warm_start": cache_warm,
+        "ffmpeg_per_playback": dict(measure(play_ffmpeg, args.iterations), subprocesses=1),
+        "preencoded_per_playback": dict(measure(play_preencoded, args.iterations), subprocesses=0),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"clip={report['audio_file']} packets={report['clip_packets']} "
+        f"bytes={report['clip_bytes']} seconds={report['clip_seconds']:.2f}",
+        f"opus_encode_in_python={report['opus_encode_in_python']}",
+    ]
+    for key in (
+        "preencode_once",
+        "cache_cold_start",
+        "cache_warm_start",
+        "ffmpeg_per_playback",
+        "preencoded_per_playback",
+    ):
+        stats = report[key]
+        lines.append(
+            f"{key:<24} wall_ms={stats['wall_ms']:.3f} cpu_ms={stats['cpu_ms']:.3f} "
+            f"ffmpeg_cpu_ms={stats['ffmpeg_cpu_ms']:.3f} subprocesses={stats['subprocesses']}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20, help="playbacks per strategy")
+    parser.add_argument("--audio-file", help="clip to play (default: settings.audio_file)")
+    parser.add_argument("--ffmpeg", help="ffmpeg executable (default: PATH, then settings)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's INFO logging")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger("discord").setLevel(logging.CRITICAL)
+
+    report = run(args)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Dead time per voice session: fixed sleeps and is_playing polling versus readiness events.
+
+Both flows run on a virtual clock against a fake voice channel. Dead time is
+the session's wall time minus the parts that cannot be avoided: connect
+latency, clip length and the configured disconnect delay.
+
+Usage::
+
+    python -m benchmarks.playback_wait --clip-seconds 0.3 0.52 1.1 2.5 4
+    python -m benchmarks.playback_wait --connect-latency 1.5 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from lizard_bot.audio_library import AudioLibrary
+from lizard_bot.settings import Settings, load_settings
+from lizard_bot.voice import join_play_leave
+
+from .fakes import FakeFleet, FakeVoiceChannel, VirtualTimeEventLoop, install_silent_clip
+
+
+# The playback_delay_seconds default before readiness waits replaced it.
+LEGACY_PLAYBACK_DELAY = 1.0
+
+
+async def polling_session(
+    channel: FakeVoiceChannel, settings: Settings, library: AudioLibrary
+) -> None:
+    """The session flow before readiness waits, kept here for comparison."""
+    guild = channel.guild
+    if guild.voice_client:
+        await guild.voice_client.disconnect(force=True)
+        await asyncio.sleep(1)
+    voice_client = await channel.connect(timeout=settings.connection_timeout)
+    await guild.me.edit(mute=False, deafen=False)
+    await asyncio.sleep(LEGACY_PLAYBACK_DELAY)
+    clip = await library.load(library.default_name)
+    voice_client.play(clip.source())
+    while voice_client.is_playing():
+        await asyncio.sleep(1)
+    await asyncio.sleep(settings.disconnect_delay_seconds)
+    await voice_client.disconnect(force=True)
+
+
+async def measure(
+    args: argparse.Namespace, settings: Settings, library: AudioLibrary, clip_seconds: float
+) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    floor = args.connect_latency + clip_seconds + settings.disconnect_delay_seconds
+    report: Dict[str, Any] = {"clip_seconds": clip_seconds}
+    for mode in ("polling", "event"):
+        fleet = FakeFleet(connect_latency=args.connect_latency)
+        guild = fleet.add_guild(1, 2)
+        channel = guild.voice_channels[0]
+        for member in guild.members:
+            channel.add_member(member)
+        if args.stale_connection:
+            await channel.connect()
+
+        started = loop.time()
+        for _ in range(args.sessions):
+            if mode == "polling":
+                await polling_session(channel, settings, library)
+            else:
+                await join_play_leave(channel, settings)
+        per_session = (loop.time() - started) / args.sessions
+        # Rounded so float noise in the virtual clock does not print as -0.00.
+        dead = round(per_session - floor, 6) + 0.0
+        report[mode] = {"session_seconds": per_session, "dead_seconds": dead}
+    report["saved_seconds"] = report["polling"]["dead_seconds"] - report["event"]["dead_seconds"]
+    return report
+
+
+async def run(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    results = []
+    for index, clip_seconds in enumerate(args.clip_seconds):
+        clip_dir = workdir / str(index)
+        clip_dir.mkdir()
+        settings, library = install_silent_clip(load_settings(), clip_dir, clip_seconds)
+        actual = library.preload(library.default_name).duration_seconds
+        results.append(await measure(args, settings, library, actual))
+    return {
+        "connect_latency": args.connect_latency,
+        "sessions": args.sessions,
+        "stale_connection": args.stale_connection,
+        "results": results,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"connect_latency={report['connect_latency']}s sessions={report['sessions']} "
+        f"stale_connection={report['stale_connection']}",
+        f"{'clip_s':>7} {'poll_dead_s':>12} {'event_dead_s':>13} {'saved_s':>8}",
+    ]
+    for row in report["results"]:
+        lines.append(
+            f"{row['clip_seconds']:>7.2f} {row['polling']['dead_seconds']:>12.2f} "
+            f"{row['event']['dead_seconds']:>13.2f} {row['saved_seconds']:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clip-seconds", type=float, nargs="+", default=[0.3, 0.52, 1.1, 2.5, 4.0])
+    parser.add_argument("--sessions", type=int, default=5, help="sessions per clip length")
+    parser.add_argument("--connect-latency", type=float, default=1.0, help="virtual seconds per connect")
+    parser.add_argument(
+        "--stale-connection",
+        action="store_true",
+        help="start each run with the bot still connected, as after a crashed session",
+    )
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's INFO logging")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger("discord").setLevel(logging.CRITICAL)
+
+    loop = VirtualTimeEventLoop()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            report = loop.run_until_complete(run(args, Path(workdir)))
+    finally:
+        loop.close()
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Deterministic fleet simulation for ``lizard_timer``.
+
+Drives the real timer body against thousands of synthetic guilds on a virtual
+clock, with members joining and leaving voice between ticks, and reports tick
+duration, visit lateness, storage calls per tick and memory.
+
+Usage::
+
+    python -m benchmarks.timer_fleet --guilds 10000 --minutes 15
+    python -m benchmarks.timer_fleet --guilds 10000 --shards 8 --sharded
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from lizard_bot.metrics import TimerStats
+from lizard_bot.settings import load_settings
+from lizard_bot.state import BotState, PendingKidnap
+from lizard_bot.storage import SqliteGuildConfigStore
+from lizard_bot.timer import create_lizard_timer
+
+from .fakes import CountingStore, FakeClock, FakeFleet, FakeVoiceChannel, VirtualTimeEventLoop
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return float(ordered[index])
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean": (sum(values) / len(values)) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def build_fleet(
+    args: argparse.Namespace,
+    rng: random.Random,
+    store: SqliteGuildConfigStore,
+    state: BotState,
+    clock: FakeClock,
+) -> FakeFleet:
+    fleet = FakeFleet(connect_latency=args.connect_latency, shard_count=args.shards)
+    for index in range(args.guilds):
+        guild = fleet.add_guild(
+            channels=args.channels,
+            members=args.members,
+            shard_id=index % max(1, args.shards),
+        )
+        if rng.random() < args.kidnap_share:
+            kidnap_channel = fleet.add_channel(guild, "kidnap", listed=False)
+            store.set_guild_config(guild.id, kidnap_channel_id=kidnap_channel.id)
+        for member in guild.members:
+            if rng.random() < args.initial_voice_share:
+                rng.choice(guild.voice_channels).add_member(member)
+            if rng.random() < args.pending_share:
+                state.pending_kidnaps[(guild.id, member.id)] = PendingKidnap(
+                    initiator_id=guild.members[0].id,
+                    created_at=clock(),
+                )
+    return fleet
+
+
+def churn(fleet: FakeFleet, rng: random.Random, join_prob: float, leave_prob: float) -> int:
+    events = 0
+    for guild in fleet.guilds:
+        for member in guild.members:
+            if member.voice is None:
+                if rng.random() < join_prob:
+                    rng.choice(guild.voice_channels).add_member(member)
+                    events += 1
+            elif rng.random() < leave_prob:
+                member.voice.channel.remove_member(member)
+                events += 1
+    return events
+
+
+async def simulate(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    clock = FakeClock(loop)
+
+    # A missing clip keeps visits on the connect -> edit -> disconnect path
+    # without spawning ffmpeg for every synthetic channel.
+    settings = replace(load_settings(), audio_file=workdir / "missing.mp3")
+
+    state = BotState()
+    raw_store = SqliteGuildConfigStore(workdir / "fleet.sqlite3")
+    fleet = build_fleet(args, rng, raw_store, state, clock)
+
+    visit_started: Dict[int, float] = {}
+    lateness: List[float] = []
+
+    def on_connect(channel: FakeVoiceChannel) -> None:
+        guild_id = channel.guild.id
+        scheduled = state.guild_timers.get(guild_id)
+        if scheduled is None or visit_started.get(guild_id) == scheduled.timestamp():
+            return
+        visit_started[guild_id] = scheduled.timestamp()
+        lateness.append((clock() - scheduled).total_seconds())
+
+    fleet.on_connect = on_connect
+
+    tick_virtual: List[float] = []
+    tick_cpu_ms: List[float] = []
+    storage_calls: List[float] = []
+    storage_ms: List[float] = []
+    storage_by_method: Dict[str, int] = {}
+    timer_stats: Dict[Optional[int], TimerStats] = {}
+    late_starts = 0
+    churn_events = 0
+    horizon = args.minutes * 60.0
+
+    async def drive(shard_id: Optional[int]) -> None:
+        # Mirrors tasks.Loop with a relative interval: the next start is anchored
+        # to the previous scheduled start, so overrunning ticks run back to back.
+        nonlocal late_starts
+        store = CountingStore(raw_store)
+        stats = timer_stats.setdefault(shard_id, TimerStats())
+        timer = create_lizard_timer(
+            fleet, state, settings, store, clock=clock, shard_id=shard_id, stats=stats
+        )
+        interval = float(timer.seconds or 10)
+        scheduled_start = loop.time()
+        while clock.elapsed() < horizon:
+            if loop.time() > scheduled_start:
+                late_starts += 1
+            scheduled_start += interval
+
+            store.reset()
+            virtual_started = loop.time()
+            cpu_started = time.perf_counter()
+            await timer.coro()
+            tick_cpu_ms.append((time.perf_counter() - cpu_started) * 1000)
+            tick_virtual.append(loop.time() - virtual_started)
+            storage_calls.append(sum(store.calls.values()))
+            storage_ms.append(store.seconds * 1000)
+            for name, count in store.calls.items():
+                storage_by_method[name] = storage_by_method.get(name, 0) + count
+
+            delay = scheduled_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def drive_churn() -> None:
+        nonlocal churn_events
+        while clock.elapsed() < horizon:
+            churn_events += churn(fleet, rng, args.join_prob, args.leave_prob)
+            await asyncio.sleep(args.churn_interval)
+
+    if args.trace_memory:
+        tracemalloc.start()
+
+    shard_ids: List[Optional[int]] = sorted(fleet.shards) if args.sharded else [None]
+    await asyncio.gather(drive_churn(), *(drive(shard_id) for shard_id in shard_ids))
+
+    memory: Dict[str, float] = {
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    if args.trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory["traced_current_mb"] = current / 1024 / 1024
+        memory["traced_peak_mb"] = peak / 1024 / 1024
+
+    ticks = len(tick_virtual)
+    return {
+        "guilds": args.guilds,
+        "timer_partitions": len(shard_ids),
+        "virtual_minutes": args.minutes,
+        "ticks": ticks,
+        "late_tick_starts": late_starts,
+        "churn_events": churn_events,
+        "voice_connects": fleet.connects,
+        "visits": len(lateness),
+        "tick_virtual_seconds": summarize(tick_virtual),
+        "tick_cpu_ms": summarize(tick_cpu_ms),
+        "visit_lateness_seconds": summarize(lateness),
+        "storage_calls_per_tick": summarize(storage_calls),
+        "storage_ms_per_tick": summarize(storage_ms),
+        "storage_calls_by_method": {
+            name: count / max(1, ticks) for name, count in sorted(storage_by_method.items())
+        },
+        "memory": memory,
+        "overrun_intervals": sum(stats.overrun_intervals for stats in timer_stats.values()),
+        "timer_stats": {
+            str(shard_id): stats.snapshot() for shard_id, stats in timer_stats.items()
+        },
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"guilds={report['guilds']} partitions={report['timer_partitions']} ticks={report['ticks']} "
+        f"virtual_minutes={report['virtual_minutes']} late_tick_starts={report['late_tick_starts']}",
+        f"visits={report['visits']} voice_connects={report['voice_connects']} "
+        f"churn_events={report['churn_events']} overrun_intervals={report['overrun_intervals']}",
+    ]
+    for key in (
+        "tick_virtual_seconds",
+        "tick_cpu_ms",
+        "visit_lateness_seconds",
+        "storage_calls_per_tick",
+        "storage_ms_per_tick",
+    ):
+        stats = report[key]
+        lines.append(
+            f"{key:<24} mean={stats['mean']:.2f} p50={stats['p50']:.2f} "
+            f"p90={stats['p90']:.2f} p99={stats['p99']:.2f} max={stats['max']:.2f}"
+        )
+    lines.append("storage calls per tick by method:")
+    for name, count in report["storage_calls_by_method"].items():
+        lines.append(f"  {name:<22} {count:.1f}")
+    lines.append(
+        "memory: " + ", ".join(f"{key}={value:.1f}" for key, value in report["memory"].items())
+    )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=10000)
+    parser.add_argument("--minutes", type=float, default=15.0, help="virtual minutes to simulate")
+    parser.add_argument("--channels", type=int, default=3, help="voice channels per guild")
+    parser.add_argument("--members", type=int, default=8, help="members per guild")
+    parser.add_argument("--shards", type=int, default=1, help="gateway shards guilds are spread over")
+    parser.add_argument("--sharded", action="store_true", help="run one timer partition per shard")
+    parser.add_argument("--initial-voice-share", type=float, default=0.1)
+    parser.add_argument("--join-prob", type=float, default=0.01, help="per idle member, per tick")
+    parser.add_argument("--leave-prob", type=float, default=0.05, help="per voice member, per tick")
+    parser.add_argument("--churn-interval", type=float, default=10.0, help="virtual seconds between churn rounds")
+    parser.add_argument("--kidnap-share", type=float, default=0.2, help="guilds with a kidnap channel")
+    parser.add_argument("--pending-share", type=float, default=0.01, help="members with a pending kidnap")
+    parser.add_argument("--connect-latency", type=float, default=0.5, help="virtual seconds per connect")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--trace-memory", action="store_true", help="also report tracemalloc peak")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's INFO logging")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger("discord").setLevel(logging.CRITICAL)
+
+    loop = VirtualTimeEventLoop()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            report = loop.run_until_complete(simulate(args, Path(workdir)))
+    finally:
+        loop.close()
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
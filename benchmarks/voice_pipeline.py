@@ -0,0 +1,264 @@
+"""Voice pipeline throughput: sessions per second, CPU per session and ffmpeg spawns.
+
+Drives the real visit, tour and kidnap flows (``join_play_leave``,
+``tour_channels``, ``kidnap_members``) against fake voice clients with
+configurable connect/move latency. Every packet a session plays is drained
+into the fleet's packet sink, and PCM is Opus-encoded there when libopus is
+loadable, as discord.py's player thread would.
+
+``ffmpeg`` is a counting shell wrapper around either a fake that streams PCM
+silence (default) or a real local binary (``--ffmpeg``). ``--no-libopus``
+makes the wrapper reject Opus encodes, like an ffmpeg build without libopus,
+which forces the per-visit ``FFmpegPCMAudio`` fallback.
+
+On the default virtual clock sleeps cost nothing, so sessions per second and
+CPU per session measure the bot's own overhead; ``--clock real`` includes the
+configured latencies and clip length.
+
+Usage::
+
+    python -m benchmarks.voice_pipeline --sessions 200
+    python -m benchmarks.voice_pipeline --no-libopus --flows visit tour
+    python -m benchmarks.voice_pipeline --ffmpeg /usr/bin/ffmpeg --no-libopus --json
+    python -m benchmarks.voice_pipeline --clock real --sessions 5 --connect-latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import logging
+import shlex
+import stat
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from lizard_bot.audio_library import initialize_audio_library
+from lizard_bot.metrics import Histogram
+from lizard_bot.settings import Settings, load_settings
+from lizard_bot.voice import join_play_leave, kidnap_members, tour_channels
+
+from .fakes import FakeFleet, FakeGuild, VirtualTimeEventLoop, install_silent_clip
+from .opus_playback import _usage, load_encoder
+
+
+FLOWS = ("visit", "tour", "kidnap")
+
+# 20 ms of 48 kHz stereo s16le PCM, the frame size FFmpegPCMAudio reads.
+PCM_BYTES_PER_SECOND = 48000 * 2 * 2
+
+
+def write_ffmpeg_wrapper(
+    workdir: Path, target: Optional[str], clip_seconds: float, no_libopus: bool
+) -> Tuple[Path, Path]:
+    """Write an executable ``ffmpeg`` that logs each spawn; returns it and the log."""
+    log = workdir / "ffmpeg-spawns.log"
+    log.touch()
+    if target is None:
+        run = f"exec head -c {int(clip_seconds * PCM_BYTES_PER_SECOND)} /dev/zero"
+    else:
+        run = f'exec {shlex.quote(target)} "$@"'
+    refuse = (
+        'case "$*" in *libopus*) echo "Unknown encoder \'libopus\'" >&2; exit 1;; esac\n'
+        if no_libopus
+        else ""
+    )
+    wrapper = workdir / "ffmpeg"
+    wrapper.write_text(
+        "#!/bin/sh\n"
+        f'case "$*" in *libopus*) echo encode;; *) echo pcm;; esac >> {shlex.quote(str(log))}\n'
+        f"{refuse}{run}\n"
+    )
+    wrapper.chmod(wrapper.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return wrapper, log
+
+
+def count_spawns(log: Path) -> Dict[str, int]:
+    lines = log.read_text().split()
+    return {"encode": lines.count("encode"), "pcm": lines.count("pcm")}
+
+
+def prepare(args: argparse.Namespace, workdir: Path) -> Tuple[Settings, Path, Dict[str, int]]:
+    """Point the settings at the wrapper and a clip; returns the startup spawns too."""
+    wrapper, log = write_ffmpeg_wrapper(workdir, args.ffmpeg, args.clip_seconds, args.no_libopus)
+    settings = dataclasses.replace(load_settings(), ffmpeg_path=wrapper)
+    if args.ffmpeg is None and not args.no_libopus:
+        # The fake cannot produce Ogg Opus; seed the packet cache instead.
+        settings, _ = install_silent_clip(settings, workdir, args.clip_seconds)
+        return settings, log, count_spawns(log)
+
+    audio_file = workdir / "clip.wav"
+    if args.ffmpeg is None:
+        audio_file.write_bytes(b"placeholder")
+    else:
+        subprocess.run(
+            [
+                args.ffmpeg, "-hide_banner", "-loglevel", "error",
+                "-f", "lavfi", "-i", "anullsrc=r=48000:cl=stereo",
+                "-t", str(args.clip_seconds), str(audio_file),
+            ],
+            check=True,
+        )
+    settings = dataclasses.replace(
+        settings,
+        audio_file=audio_file,
+        clips_directory=workdir / "clips",
+        opus_cache_directory=workdir / "opus_cache",
+    )
+    initialize_audio_library(settings)
+    return settings, log, count_spawns(log)
+
+
+def build_guild(fleet: FakeFleet, args: argparse.Namespace, flow: str) -> FakeGuild:
+    if flow == "visit":
+        guild = fleet.add_guild(1, args.members)
+    elif flow == "tour":
+        guild = fleet.add_guild(args.channels, args.channels * args.members)
+    else:
+        # Victims spread over two source channels; the last channel is the destination.
+        guild = fleet.add_guild(3, args.victims)
+    sources = guild.voice_channels if flow != "kidnap" else guild.voice_channels[:2]
+    for index, member in enumerate(guild.members):
+        sources[index % len(sources)].add_member(member)
+    return guild
+
+
+async def session(flow: str, guild: FakeGuild, settings: Settings) -> None:
+    if flow == "visit":
+        await join_play_leave(guild.voice_channels[0], settings)
+    elif flow == "tour":
+        await tour_channels(guild.voice_channels, settings)
+    else:
+        sources, destination = guild.voice_channels[:2], guild.voice_channels[2]
+        await kidnap_members(settings, guild, guild.members, destination)
+        # Put the victims back for the next session.
+        for index, member in enumerate(guild.members):
+            member.relocate(sources[index % len(sources)])
+
+
+async def measure(
+    args: argparse.Namespace, settings: Settings, log: Path, flow: str, encoder: Any
+) -> Dict[str, Any]:
+    fleet = FakeFleet(
+        connect_latency=args.connect_latency,
+        move_latency=args.move_latency,
+        rest_latency=args.rest_latency,
+    )
+    fleet.encoder = encoder
+    guild = build_guild(fleet, args, flow)
+    loop = asyncio.get_running_loop()
+    durations = Histogram(max(1, args.sessions))
+
+    spawns_before = count_spawns(log)
+    before = _usage()
+    for _ in range(args.sessions):
+        started = loop.time()
+        await session(flow, guild, settings)
+        durations.observe(loop.time() - started)
+    after = _usage()
+    spawns_after = count_spawns(log)
+
+    sessions = max(1, args.sessions)
+    wall = after["wall"] - before["wall"]
+    return {
+        "sessions": args.sessions,
+        "sessions_per_second": args.sessions / wall if wall else 0.0,
+        "cpu_ms_per_session": (after["cpu"] - before["cpu"]) * 1000.0 / sessions,
+        "ffmpeg_cpu_ms_per_session": (after["children_cpu"] - before["children_cpu"])
+        * 1000.0
+        / sessions,
+        "session_seconds_p50": durations.percentile(50),
+        "session_seconds_p95": durations.percentile(95),
+        "encode_spawns": spawns_after["encode"] - spawns_before["encode"],
+        "pcm_spawns": spawns_after["pcm"] - spawns_before["pcm"],
+        "connects": fleet.connects,
+        "moves": fleet.moves,
+        "member_moves": fleet.member_moves,
+        "plays": fleet.plays,
+        "packets_per_session": fleet.packets / sessions,
+        "packet_bytes_per_session": fleet.packet_bytes / sessions,
+    }
+
+
+async def run(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    settings, log, startup = prepare(args, workdir)
+    encoder = load_encoder()
+    results = {flow: await measure(args, settings, log, flow, encoder) for flow in args.flows}
+    return {
+        "clock": args.clock,
+        "ffmpeg": args.ffmpeg or "fake",
+        "libopus_in_ffmpeg": not args.no_libopus,
+        "opus_encode_in_python": encoder is not None,
+        "connect_latency": args.connect_latency,
+        "move_latency": args.move_latency,
+        "clip_seconds": args.clip_seconds,
+        "startup_spawns": startup,
+        "results": results,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"clock={report['clock']} ffmpeg={report['ffmpeg']} "
+        f"libopus_in_ffmpeg={report['libopus_in_ffmpeg']} "
+        f"opus_encode_in_python={report['opus_encode_in_python']}",
+        f"connect_latency={report['connect_latency']}s move_latency={report['move_latency']}s "
+        f"clip_seconds={report['clip_seconds']}s startup_spawns={report['startup_spawns']}",
+        f"{'flow':>6} {'sess/s':>8} {'cpu_ms':>7} {'ffmpeg_ms':>9} {'p50_s':>7} {'p95_s':>7} "
+        f"{'encodes':>7} {'pcm':>5} {'connects':>8} {'packets':>8}",
+    ]
+    for flow, row in report["results"].items():
+        lines.append(
+            f"{flow:>6} {row['sessions_per_second']:>8.1f} {row['cpu_ms_per_session']:>7.2f} "
+            f"{row['ffmpeg_cpu_ms_per_session']:>9.2f} {row['session_seconds_p50']:>7.2f} "
+            f"{row['session_seconds_p95']:>7.2f} {row['encode_spawns']:>7} {row['pcm_spawns']:>5} "
+            f"{row['connects']:>8} {row['packets_per_session']:>8.0f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", nargs="+", choices=FLOWS, default=list(FLOWS))
+    parser.add_argument("--sessions", type=int, default=100, help="sessions per flow")
+    parser.add_argument("--channels", type=int, default=4, help="channels per tour")
+    parser.add_argument("--members", type=int, default=3, help="members per channel")
+    parser.add_argument("--victims", type=int, default=4, help="members moved per kidnap")
+    parser.add_argument("--clip-seconds", type=float, default=0.5)
+    parser.add_argument("--connect-latency", type=float, default=0.5, help="seconds per connect")
+    parser.add_argument("--move-latency", type=float, default=0.1, help="seconds per bot move")
+    parser.add_argument("--rest-latency", type=float, default=0.05, help="seconds per member move")
+    parser.add_argument("--ffmpeg", help="real ffmpeg to wrap (default: a fake PCM generator)")
+    parser.add_argument(
+        "--no-libopus",
+        action="store_true",
+        help="reject Opus encodes so every visit runs ffmpeg",
+    )
+    parser.add_argument("--clock", choices=("virtual", "real"), default="virtual")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's INFO logging")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger("discord").setLevel(logging.CRITICAL)
+
+    loop = VirtualTimeEventLoop() if args.clock == "virtual" else asyncio.new_event_loop()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            report = loop.run_until_complete(run(args, Path(workdir)))
+    finally:
+        loop.close()
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Tour wall time against channel count: one connection per channel versus one per tour.
+
+Runs on a virtual clock against fake voice channels, so the numbers are the
+sum of configured latencies, clip length and the bot's own delays rather than
+a live Discord round trip.
+
+Usage::
+
+    python -m benchmarks.voice_tour --channels 1 2 4 8 16
+    python -m benchmarks.voice_tour --connect-latency 1.5 --move-latency 0.3 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from lizard_bot.settings import Settings, load_settings
+from lizard_bot.voice import join_play_leave, tour_channels
+
+from .fakes import FakeFleet, FakeGuild, VirtualTimeEventLoop, install_silent_clip
+
+
+def build_guild(fleet: FakeFleet, channels: int, members_per_channel: int) -> FakeGuild:
+    guild = fleet.add_guild(channels, channels * members_per_channel)
+    for index, member in enumerate(guild.members):
+        guild.voice_channels[index % channels].add_member(member)
+    return guild
+
+
+async def legacy_tour(guild: FakeGuild, settings: Settings) -> List[Any]:
+    """The pre-tour behaviour: a full visit per channel, then a fixed pause."""
+    visited = []
+    for channel in guild.voice_channels:
+        await join_play_leave(channel, settings)
+        await asyncio.sleep(2)
+        visited.append(channel)
+    return visited
+
+
+async def measure(
+    args: argparse.Namespace, settings: Settings, channels: int, mode: str
+) -> Dict[str, float]:
+    fleet = FakeFleet(connect_latency=args.connect_latency, move_latency=args.move_latency)
+    guild = build_guild(fleet, channels, args.members)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    if mode == "tour":
+        visited = await tour_channels(guild.voice_channels, settings)
+    else:
+        visited = await legacy_tour(guild, settings)
+    return {
+        "wall_seconds": loop.time() - started,
+        "visited": len(visited),
+        "connects": fleet.connects,
+        "moves": fleet.moves,
+        "plays": fleet.plays,
+    }
+
+
+async def run(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    settings, _ = install_silent_clip(load_settings(), workdir, args.clip_seconds)
+    results = []
+    for channels in args.channels:
+        legacy = await measure(args, settings, channels, "legacy")
+        tour = await measure(args, settings, channels, "tour")
+        results.append(
+            {
+                "channels": channels,
+                "legacy": legacy,
+                "tour": tour,
+                "speedup": legacy["wall_seconds"] / tour["wall_seconds"]
+                if tour["wall_seconds"]
+                else 0.0,
+            }
+        )
+    return {
+        "connect_latency": args.connect_latency,
+        "move_latency": args.move_latency,
+        "clip_seconds": args.clip_seconds,
+        "results": results,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"connect_latency={report['connect_latency']}s move_latency={report['move_latency']}s "
+        f"clip_seconds={report['clip_seconds']}s",
+        f"{'channels':>8} {'legacy_s':>9} {'tour_s':>8} {'speedup':>8} {'connects':>9} {'moves':>6}",
+    ]
+    for row in report["results"]:
+        lines.append(
+            f"{row['channels']:>8} {row['legacy']['wall_seconds']:>9.2f} "
+            f"{row['tour']['wall_seconds']:>8.2f} {row['speedup']:>7.2f}x "
+            f"{row['legacy']['connects']:>4}/{row['tour']['connects']:<4} {row['tour']['moves']:>6}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--members", type=int, default=3, help="members per channel")
+    parser.add_argument("--connect-latency", type=float, default=1.0, help="virtual seconds per connect")
+    parser.add_argument("--move-latency", type=float, default=0.2, help="virtual seconds per move")
+    parser.add_argument("--clip-seconds", type=float, default=0.5)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's INFO logging")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger("discord").setLevel(logging.CRITICAL)
+
+    loop = VirtualTimeEventLoop()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            report = loop.run_until_complete(run(args, Path(workdir)))
+    finally:
+        loop.close()
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
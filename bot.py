@@ -3,13 +3,23 @@ from datetime import datetime
 
 from discord.ext import commands
 
+from lizard_bot.audio_library import initialize_audio_library
+from lizard_bot.breaker import initialize_voice_breaker
 from lizard_bot.commands import register_commands
+from lizard_bot.diagnostics import DiagnosticsRegistry, register_diagnostics
+from lizard_bot.embedding_service import configure_embedding_service
 from lizard_bot.events import register_events
+from lizard_bot.leader import LeaderLease
+from lizard_bot.metrics import TimerStats
 from lizard_bot.settings import create_intents, load_settings
+from lizard_bot.sharding import ShardedLizardTimers
 from lizard_bot.state import BotState, PendingKidnap
 from lizard_bot.storage import SqliteGuildConfigStore
 from lizard_bot.text_cache import TextCache
 from lizard_bot.timer import create_lizard_timer
+from lizard_bot.tracing import initialize_voice_tracer
+from lizard_bot.voice import voice_stats
+from lizard_bot.voice_actor import VoiceActors
 
 
 settings = load_settings()
@@ -41,36 +51,106 @@ def resolve_prefix(bot_obj, message):
     return settings.command_prefix
 
 
-bot = commands.Bot(command_prefix=resolve_prefix, intents=intents, help_command=None)
-
-for (guild_id, user_id), record in config_store.load_pending_kidnaps().items():
-    created_at = record.get("created_at") or datetime.utcnow()
-    initiator = record.get("initiator_id", 0)
-    if isinstance(initiator, str) and initiator.isdigit():
-        initiator = int(initiator)
-    pending = PendingKidnap(
-        initiator_id=initiator,
-        created_at=created_at,
-        due_at=record.get("due_at"),
+if settings.sharded:
+    bot = commands.AutoShardedBot(
+        command_prefix=resolve_prefix,
+        intents=intents,
+        help_command=None,
+        shard_count=settings.shard_count,
     )
-    state.pending_kidnaps[(guild_id, user_id)] = pending
-
-state.guild_timers.update(config_store.load_guild_timers())
+else:
+    bot = commands.Bot(command_prefix=resolve_prefix, intents=intents, help_command=None)
+
+
+def load_schedule() -> None:
+    """Load timers and pending kidnaps, the only state the visit loop owns."""
+    for (guild_id, user_id), record in config_store.load_pending_kidnaps().items():
+        created_at = record.get("created_at") or datetime.utcnow()
+        initiator = record.get("initiator_id", 0)
+        if isinstance(initiator, str) and initiator.isdigit():
+            initiator = int(initiator)
+        pending = PendingKidnap(
+            initiator_id=initiator,
+            created_at=created_at,
+            due_at=record.get("due_at"),
+        )
+        state.pending_kidnaps[(guild_id, user_id)] = pending
+
+    state.guild_timers.update(config_store.load_guild_timers())
+
+
+load_schedule()
+audio_library = initialize_audio_library(settings, config_store.get_clip_weights)
+voice_tracer = initialize_voice_tracer(settings)
+voice_breaker = initialize_voice_breaker(settings)
+embedding_service = configure_embedding_service(settings)
+voice_actors = VoiceActors(settings)
 
 text_cache = TextCache(base_path=settings.audio_file.parent)
 text_cache.register("facts", "lizard_facts.txt")
 text_cache.register("responses", "lizard_bot_responses.txt")
+# Edits to the responses file re-encode only the changed lines.
+text_cache.subscribe("responses", embedding_service.update_responses)
+
+diagnostics = DiagnosticsRegistry()
+diagnostics.register("voice", voice_stats.snapshot)
+diagnostics.register("audio", audio_library.snapshot)
+diagnostics.register("traces", voice_tracer.snapshot)
+diagnostics.register("actors", voice_actors.snapshot)
+diagnostics.register("breaker", voice_breaker.snapshot)
+diagnostics.register("embeddings", embedding_service.snapshot)
+
+leader = None
+if settings.leader_election_enabled:
+
+    def on_promoted(token: int) -> None:
+        # The previous leader kept writing timers and clearing kidnaps; pick up
+        # just those tables instead of reloading every guild.
+        state.pending_kidnaps.clear()
+        load_schedule()
+
+    leader = LeaderLease(
+        config_store,
+        lease_seconds=settings.leader_lease_seconds,
+        renew_seconds=settings.leader_renew_seconds,
+        on_promoted=on_promoted,
+    )
+    diagnostics.register("leader", leader.snapshot)
 
-lizard_timer = create_lizard_timer(bot, state, settings, config_store)
-
+if settings.sharded:
+    shard_timers = ShardedLizardTimers(
+        bot, state, settings, config_store, leader=leader, actors=voice_actors
+    )
+    diagnostics.register("shards", shard_timers.snapshot)
+
+    def start_timer() -> None:
+        if leader is not None:
+            leader.start()
+        shard_timers.start_all()
+
+else:
+    timer_stats = TimerStats()
+    lizard_timer = create_lizard_timer(
+        bot,
+        state,
+        settings,
+        config_store,
+        stats=timer_stats,
+        leader=leader,
+        actors=voice_actors,
+    )
+    diagnostics.register("timer", timer_stats.snapshot)
 
-def start_timer() -> None:
-    if not lizard_timer.is_running():
-        lizard_timer.start()
+    def start_timer() -> None:
+        if leader is not None:
+            leader.start()
+        if not lizard_timer.is_running():
+            lizard_timer.start()
 
 
 register_events(bot, state, settings, text_cache, config_store, start_timer)
-register_commands(bot, state, settings, config_store)
+register_commands(bot, state, settings, config_store, voice_actors, leader=leader)
+register_diagnostics(bot, diagnostics)
 
 
 if __name__ == "__main__":
@@ -78,4 +158,8 @@ if __name__ == "__main__":
         print("Error: DISCORD_BOT_TOKEN not found in environment variables!")
         print("Please create a .env file based on .envexample")
     else:
-        bot.run(settings.token)
+        try:
+            bot.run(settings.token)
+        finally:
+            if leader is not None:
+                leader.release()
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import mmap
+import os
+import re
+import struct
+import subprocess
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union, overload
+
+import discord
+from discord.oggparse import OggStream
+
+from .settings import logger
+
+
+# discord.py sends one 20 ms Opus frame per packet at 48 kHz stereo.
+FRAME_SECONDS = 0.02
+
+_OGG_HEADERS = (b"OpusHead", b"OpusTags")
+
+# Cache file layout: header (magic, format version, frame ms, packet count),
+# then every packet as a little-endian u16 length followed by its bytes.
+_CACHE_MAGIC = b"LZOP"
+_CACHE_VERSION = 1
+_CACHE_HEADER = struct.Struct("<4sHHI")
+_PACKET_LENGTH = struct.Struct("<H")
+_CACHE_SUFFIX = ".opus.bin"
+
+
+def encode_opus_packets(
+    audio_file: Path, ffmpeg_path: Path, bitrate_kbps: int = 128
+) -> List[bytes]:
+    """Transcode ``audio_file`` to 20 ms Opus packets with a single ffmpeg run."""
+    args = [
+        str(ffmpeg_path),
+        "-hide_banner",
+        "-loglevel", "error",
+        "-i", str(audio_file),
+        "-map_metadata", "-1",
+        "-vn",
+        "-c:a", "libopus",
+        "-ar", "48000",
+        "-ac", "2",
+        "-b:a", f"{bitrate_kbps}k",
+        "-frame_duration", "20",
+        "-f", "ogg",
+        "pipe:1",
+    ]
+    result = subprocess.run(args, capture_output=True, check=True)
+    return [
+        packet
+        for packet in OggStream(io.BytesIO(result.stdout)).iter_packets()
+        if not packet.startswith(_OGG_HEADERS)
+    ]
+
+
+class OpusPacketSource(discord.AudioSource):
+    """Plays a list of pre-encoded Opus packets; discord.py sends them as-is."""
+
+    def __init__(self, packets: Sequence[bytes]) -> None:
+        self._packets = packets
+        self._index = 0
+
+    def read(self) -> bytes:
+        if self._index >= len(self._packets):
+            return b""
+        packet = self._packets[self._index]
+        self._index += 1
+        return packet
+
+    def is_opus(self) -> bool:
+        return True
+
+
+class MappedPackets(Sequence[bytes]):
+    """Read-only view of a packet cache file.
+
+    The file is memory-mapped, so every process playing the same clip shares
+    the page cache instead of holding its own copy.
+    """
+
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._offsets = self._index()
+        except ValueError:
+            self._map.close()
+            raise
+
+    def _index(self) -> array:
+        if len(self._map) < _CACHE_HEADER.size:
+            raise ValueError("truncated header")
+        magic, version, frame_ms, count = _CACHE_HEADER.unpack_from(self._map, 0)
+        if magic != _CACHE_MAGIC or version != _CACHE_VERSION:
+            raise ValueError("not a packet cache file")
+        if frame_ms != round(FRAME_SECONDS * 1000):
+            raise ValueError(f"unexpected frame duration {frame_ms} ms")
+        offsets = array("L")
+        position = _CACHE_HEADER.size
+        for _ in range(count):
+            if position + _PACKET_LENGTH.size > len(self._map):
+                raise ValueError("truncated packet table")
+            (length,) = _PACKET_LENGTH.unpack_from(self._map, position)
+            position += _PACKET_LENGTH.size
+            offsets.append(position)
+            position += length
+        if position != len(self._map):
+            raise ValueError("packet lengths do not match file size")
+        offsets.append(position + _PACKET_LENGTH.size)
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> bytes: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[bytes]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[bytes, List[bytes]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        end = self._offsets[index + 1] - _PACKET_LENGTH.size
+        return self._map[self._offsets[index] : end]
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def write_packet_file(path: Path, packets: Iterable[bytes]) -> None:
+    """Atomically write ``packets`` in the cache file format."""
+    packets = list(packets)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(
+                _CACHE_HEADER.pack(
+                    _CACHE_MAGIC, _CACHE_VERSION, round(FRAME_SECONDS * 1000), len(packets)
+                )
+            )
+            for packet in packets:
+                handle.write(_PACKET_LENGTH.pack(len(packet)))
+                handle.write(packet)
+        os.replace(temp_name, path)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+class OpusPacketCache:
+    """On-disk cache of encoded clips, keyed by a hash of the source file.
+
+    Entries are named ``<stem>-<key>.opus.bin``. Editing the source file
+    changes the key, so the next load re-encodes it and deletes the other
+    entries with the same stem. Processes on one host that point at the same
+    directory share entries; only the first to start pays for ffmpeg.
+    """
+
+    def __init__(self, directory: Path, bitrate_kbps: int = 128) -> None:
+        self.directory = directory
+        self.bitrate_kbps = bitrate_kbps
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def key(self, audio_file: Path) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"v{_CACHE_VERSION}:{self.bitrate_kbps}k:".encode())
+        with open(audio_file, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 16), b""):
+                digest.update(chunk)
+        return digest.hexdigest()[:16]
+
+    def path_for(self, audio_file: Path, key: str) -> Path:
+        return self.directory / f"{audio_file.stem}-{key}{_CACHE_SUFFIX}"
+
+    def load(self, audio_file: Path, ffmpeg_path: Path) -> Sequence[bytes]:
+        """Return the clip's packets, encoding and storing them on a miss."""
+        path = self.path_for(audio_file, self.key(audio_file))
+        if path.exists():
+            try:
+                packets = MappedPackets(path)
+            except (OSError, ValueError) as error:
+                logger.warning("Discarding unreadable packet cache %s: %s", path.name, error)
+            else:
+                self.hits += 1
+                return packets
+
+        self.misses += 1
+        encoded = encode_opus_packets(audio_file, ffmpeg_path, self.bitrate_kbps)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            write_packet_file(path, encoded)
+            self._remove_stale(audio_file, path)
+            return MappedPackets(path)
+        except (OSError, ValueError) as error:
+            logger.warning("Could not cache packets for %s: %s", audio_file.name, error)
+            return encoded
+
+    def _remove_stale(self, audio_file: Path, current: Path) -> None:
+        # Only this clip's entries: "roar-<key>", not "roar-2-<key>" from another clip.
+        own = re.compile(re.escape(audio_file.stem) + r"-[0-9a-f]{16}" + re.escape(_CACHE_SUFFIX))
+        for entry in self.directory.glob(f"{audio_file.stem}-*{_CACHE_SUFFIX}"):
+            if entry == current or not own.fullmatch(entry.name):
+                continue
+            try:
+                entry.unlink()
+            except OSError:
+                # Still mapped by a process on Windows; the next load retries.
+                continue
+            self.invalidations += 1
+            logger.info("Removed stale packet cache %s", entry.name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+class OpusClip:
+    """An audio file encoded once and replayable without ffmpeg."""
+
+    def __init__(self, name: str, packets: Sequence[bytes]) -> None:
+        self.name = name
+        self.packets = packets
+        self.size_bytes = sum(len(packet) for packet in packets)
+
+    @classmethod
+    def from_file(
+        cls,
+        audio_file: Path,
+        ffmpeg_path: Path,
+        cache: Optional[OpusPacketCache] = None,
+    ) -> "OpusClip":
+        if cache is not None:
+            return cls(audio_file.name, cache.load(audio_file, ffmpeg_path))
+        return cls(audio_file.name, encode_opus_packets(audio_file, ffmpeg_path))
+
+    @property
+    def duration_seconds(self) -> float:
+        return len(self.packets) * FRAME_SECONDS
+
+    def source(self) -> OpusPacketSource:
+        return OpusPacketSource(self.packets)
+
+
+__all__ = [
+    "FRAME_SECONDS",
+    "MappedPackets",
+    "OpusClip",
+    "OpusPacketCache",
+    "OpusPacketSource",
+    "encode_opus_packets",
+    "write_packet_file",
+]
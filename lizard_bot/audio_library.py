@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import subprocess
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from discord.oggparse import OggError
+
+from .audio import OpusClip, OpusPacketCache
+from .settings import Settings, logger
+
+
+CLIP_SUFFIXES = frozenset({".flac", ".m4a", ".mp3", ".ogg", ".opus", ".wav"})
+
+WeightsProvider = Callable[[int], Mapping[str, float]]
+
+
+class AudioLibrary:
+    """Lizard sounds indexed by name, encoded on first use.
+
+    Clips are the audio files in ``directory`` (named by lower-cased stem)
+    plus ``default_file``. Encoded clips stay resident in an LRU bounded by
+    ``max_bytes``; the most recently used clip is never evicted, so a clip
+    larger than the budget still plays.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path],
+        default_file: Path,
+        ffmpeg_path: Path,
+        max_bytes: int,
+        cache: Optional[OpusPacketCache] = None,
+        weights: Optional[WeightsProvider] = None,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.directory = directory
+        self.default_file = default_file
+        self.default_name = default_file.stem.lower()
+        self.ffmpeg_path = ffmpeg_path
+        self.max_bytes = max_bytes
+        self.cache = cache
+        self.weights = weights
+        self.rng = rng or random.Random()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_failures = 0
+        self._paths: Dict[str, Path] = {}
+        self._resident: "OrderedDict[str, OpusClip]" = OrderedDict()
+        self._loading: Dict[str, "asyncio.Future[Optional[OpusClip]]"] = {}
+        self.refresh()
+
+    def refresh(self) -> List[str]:
+        """Re-scan the clips directory; resident clips that disappeared are dropped."""
+        paths: Dict[str, Path] = {}
+        if self.directory is not None and self.directory.is_dir():
+            for entry in sorted(self.directory.iterdir()):
+                if entry.is_file() and entry.suffix.lower() in CLIP_SUFFIXES:
+                    paths.setdefault(entry.stem.lower(), entry)
+        if self.default_file.exists():
+            paths.setdefault(self.default_name, self.default_file)
+
+        for name in list(self._resident):
+            if name not in paths:
+                self._evict(name)
+        self._paths = paths
+        return self.names()
+
+    def names(self) -> List[str]:
+        return sorted(self._paths)
+
+    def path(self, name: str) -> Optional[Path]:
+        return self._paths.get(name.lower())
+
+    def choose(self, guild_id: Optional[int] = None) -> Optional[str]:
+        """Pick a clip at random, using the guild's weight overrides (default 1)."""
+        names = self.names()
+        if not names:
+            return None
+        overrides: Mapping[str, float] = {}
+        if self.weights is not None and guild_id is not None:
+            overrides = self.weights(guild_id)
+        weights = [max(0.0, overrides.get(name, 1.0)) for name in names]
+        if not any(weights):
+            # Every clip was switched off; keep the classic sound rather than silence.
+            return self.default_name if self.default_name in self._paths else None
+        return self.rng.choices(names, weights=weights)[0]
+
+    def preload(self, name: str) -> Optional[OpusClip]:
+        """Encode a clip on the calling thread, for use before the event loop starts."""
+        key = name.lower()
+        clip = self._resident.get(key)
+        if clip is not None:
+            return clip
+        path = self._paths.get(key)
+        if path is None:
+            return None
+        self.misses += 1
+        return self._admit(key, self._encode(path))
+
+    async def load(self, name: str) -> Optional[OpusClip]:
+        """Return an encoded clip, encoding it in a worker thread on a miss.
+
+        Concurrent requests for the same clip share one encode, and the encode
+        finishes even if the caller that started it is cancelled.
+        """
+        key = name.lower()
+        clip = self._resident.get(key)
+        if clip is not None:
+            self._resident.move_to_end(key)
+            self.hits += 1
+            return clip
+
+        path = self._paths.get(key)
+        if path is None:
+            return None
+
+        future = self._loading.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.get_running_loop().run_in_executor(None, self._encode, path)
+            future.add_done_callback(lambda done: self._loaded(key, done))
+            self._loading[key] = future
+        return await asyncio.shield(future)
+
+    def _encode(self, path: Path) -> Optional[OpusClip]:
+        try:
+            return OpusClip.from_file(path, self.ffmpeg_path, self.cache)
+        except (OSError, subprocess.CalledProcessError, OggError) as error:
+            logger.warning("Could not pre-encode clip %s: %s", path.name, error)
+            return None
+
+    def _loaded(self, key: str, future: "asyncio.Future[Optional[OpusClip]]") -> None:
+        self._loading.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            self.load_failures += 1
+            return
+        self._admit(key, future.result())
+
+    def _admit(self, key: str, clip: Optional[OpusClip]) -> Optional[OpusClip]:
+        if clip is None or not clip.packets:
+            self.load_failures += 1
+            return None
+        if key in self._resident:
+            self._evict(key)
+        self._resident[key] = clip
+        self.resident_bytes += clip.size_bytes
+        while self.resident_bytes > self.max_bytes and len(self._resident) > 1:
+            self._evict(next(iter(self._resident)))
+        return clip
+
+    def _evict(self, key: str) -> None:
+        # Sources already playing keep their own reference to the packets.
+        clip = self._resident.pop(key)
+        self.resident_bytes -= clip.size_bytes
+        self.evictions += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        snapshot: Dict[str, Any] = {
+            "clips": len(self._paths),
+            "resident": len(self._resident),
+            "resident_bytes": self.resident_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "load_failures": self.load_failures,
+        }
+        if self.cache is not None:
+            snapshot["disk_cache"] = self.cache.snapshot()
+        return snapshot
+
+
+# Global instance for easy access
+_audio_library: Optional[AudioLibrary] = None
+
+
+def get_audio_library() -> Optional[AudioLibrary]:
+    """The library built by :func:`initialize_audio_library`, if any."""
+    return _audio_library
+
+
+def initialize_audio_library(
+    settings: Settings, weights: Optional[WeightsProvider] = None
+) -> AudioLibrary:
+    """Index the clips directory and encode the default clip up front."""
+    global _audio_library
+    library = AudioLibrary(
+        settings.clips_directory,
+        settings.audio_file,
+        settings.ffmpeg_path,
+        settings.clip_memory_kb * 1024,
+        cache=OpusPacketCache(settings.opus_cache_directory),
+        weights=weights,
+    )
+    _audio_library = library
+
+    clip = library.preload(library.default_name)
+    if clip is not None:
+        logger.info(
+            "Pre-encoded %s: %d packets, %.2fs, %d bytes",
+            clip.name,
+            len(clip.packets),
+            clip.duration_seconds,
+            clip.size_bytes,
+        )
+    logger.info("Audio library indexed %d clip(s): %s", len(library.names()), ", ".join(library.names()))
+    return library
+
+
+__all__ = [
+    "AudioLibrary",
+    "CLIP_SUFFIXES",
+    "WeightsProvider",
+    "get_audio_library",
+    "initialize_audio_library",
+]
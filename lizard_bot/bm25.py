@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.casefold())
+
+
+class BM25Index:
+    """Inverted index that ranks documents for a query with Okapi BM25.
+
+    Each term's posting list stores the documents containing it together
+    with that term's precomputed BM25 weight in the document, so a search
+    only touches the postings of the query's terms: its cost depends on
+    how common those words are, not on how many documents there are.
+    """
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.2, b: float = 0.75) -> None:
+        self.documents = len(documents)
+        token_lists = [tokenize(document) for document in documents]
+        average = sum(map(len, token_lists)) / max(1, len(token_lists)) or 1.0
+
+        postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for doc_id, tokens in enumerate(token_lists):
+            norm = k1 * (1.0 - b + b * len(tokens) / average)
+            for term, count in Counter(tokens).items():
+                postings[term].append((doc_id, count * (k1 + 1.0) / (count + norm)))
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, entries in postings.items():
+            idf = math.log(1.0 + (self.documents - len(entries) + 0.5) / (len(entries) + 0.5))
+            ids = np.fromiter((doc_id for doc_id, _ in entries), dtype=np.int32, count=len(entries))
+            weights = np.fromiter((w for _, w in entries), dtype=np.float32, count=len(entries))
+            self._postings[term] = (ids, weights * idf)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ids.nbytes + weights.nbytes for ids, weights in self._postings.values())
+
+    def search(self, query: str, limit: int) -> np.ndarray:
+        """Ids of up to ``limit`` best-scoring documents sharing a term with ``query``, unordered."""
+        hits = [self._postings[term] for term in set(tokenize(query)) if term in self._postings]
+        if not hits or limit <= 0:
+            return np.empty(0, dtype=np.int32)
+        ids = np.concatenate([doc_ids for doc_ids, _ in hits])
+        weights = np.concatenate([term_weights for _, term_weights in hits])
+        candidates, positions = np.unique(ids, return_inverse=True)
+        if len(candidates) <= limit:
+            return candidates
+        scores = np.bincount(positions, weights=weights)
+        return candidates[np.argpartition(-scores, limit - 1)[:limit]]
+
+
+__all__ = ["BM25Index", "tokenize"]
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+from .settings import Settings, logger
+
+
+class VoiceUnavailable(discord.ClientException):
+    """A voice channel was ruled out before connecting, by permissions or the breaker."""
+
+
+@dataclass
+class BreakerEntry:
+    """Failure history of one (guild, channel) voice target."""
+
+    guild_id: int
+    channel_id: int
+    channel_name: str
+    state: str = "closed"
+    failures: int = 0
+    trips: int = 0
+    open_until: float = 0.0
+    probe_started: Optional[float] = None
+    skipped: int = 0
+    last_error: str = ""
+
+    def describe(self, now: float) -> str:
+        if self.state == "open":
+            status = f"open {max(0.0, self.open_until - now):.0f}s"
+        elif self.state == "half_open":
+            status = "probing"
+        elif self.failures:
+            status = f"{self.failures} failure(s)"
+        else:
+            status = "no access"
+        return f"{status}, skipped {self.skipped}: {self.last_error or '-'}"
+
+
+def missing_permissions(channel: discord.VoiceChannel, move_members: bool = False) -> List[str]:
+    """Permissions the bot lacks to visit ``channel``, read from the member cache."""
+    me = channel.guild.me
+    permissions = channel.permissions_for(me)
+    needed = ["view_channel", "connect", "speak"]
+    if move_members:
+        needed.append("move_members")
+    missing = [name for name in needed if not getattr(permissions, name)]
+    limit = channel.user_limit
+    if (
+        limit
+        and len(channel.members) >= limit
+        and me not in channel.members
+        and not permissions.move_members
+    ):
+        missing.append("room in a full channel")
+    return missing
+
+
+class VoiceBreaker:
+    """Circuit breaker for voice targets, keyed by guild and channel.
+
+    After ``threshold`` consecutive connect or move failures a target is
+    skipped for ``backoff_seconds``, doubling on every further trip up to
+    ``max_backoff_seconds``. When the backoff ends one half-open probe is let
+    through: success closes the breaker, failure re-opens it. Channels the
+    bot has no permission to join are skipped without counting a failure.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        backoff_seconds: float = 60.0,
+        max_backoff_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = max(1, threshold)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.clock = clock
+        self.trips = 0
+        self.skipped = 0
+        self.permission_skips = 0
+        self._entries: Dict[Tuple[int, int], BreakerEntry] = {}
+
+    def _entry(self, channel: discord.VoiceChannel) -> BreakerEntry:
+        key = (channel.guild.id, channel.id)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = BreakerEntry(channel.guild.id, channel.id, channel.name)
+        return entry
+
+    def check(self, channel: discord.VoiceChannel) -> Optional[str]:
+        """Return why ``channel`` should be skipped, or None to go ahead."""
+        missing = missing_permissions(channel)
+        if missing:
+            entry = self._entry(channel)
+            entry.skipped += 1
+            entry.last_error = f"missing {', '.join(missing)}"
+            self.permission_skips += 1
+            return entry.last_error
+
+        entry = self._entries.get((channel.guild.id, channel.id))
+        if entry is None or entry.state == "closed":
+            return None
+
+        now = self.clock()
+        if entry.state == "open" and now < entry.open_until:
+            entry.skipped += 1
+            self.skipped += 1
+            return f"circuit open for another {entry.open_until - now:.0f}s"
+        if (
+            entry.state == "half_open"
+            and entry.probe_started is not None
+            and now - entry.probe_started < self.backoff_seconds
+        ):
+            entry.skipped += 1
+            self.skipped += 1
+            return "a probe is already in flight"
+
+        # Backoff over (or a probe that never reported back): let one attempt through.
+        entry.state = "half_open"
+        entry.probe_started = now
+        logger.info("Probing voice channel %s after backoff", channel.name)
+        return None
+
+    def record_success(self, channel: discord.VoiceChannel) -> None:
+        entry = self._entries.pop((channel.guild.id, channel.id), None)
+        if entry is not None and entry.state != "closed":
+            logger.info("Voice channel %s recovered, breaker closed", channel.name)
+
+    def record_failure(self, channel: discord.VoiceChannel, error: BaseException) -> None:
+        entry = self._entry(channel)
+        entry.failures += 1
+        entry.last_error = f"{type(error).__name__}: {error}"[:120]
+        if entry.state != "half_open" and entry.failures < self.threshold:
+            return
+
+        entry.trips += 1
+        self.trips += 1
+        backoff = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (entry.trips - 1))
+        entry.state = "open"
+        entry.open_until = self.clock() + backoff
+        entry.probe_started = None
+        logger.warning(
+            "Voice channel %s failed %d time(s) (%s); skipping it for %.0fs",
+            channel.name,
+            entry.failures,
+            entry.last_error,
+            backoff,
+        )
+
+    def reset(self, guild_id: int, channel_id: Optional[int] = None) -> int:
+        """Forget the history of a guild's channels (or one channel); returns how many."""
+        keys = [
+            key
+            for key in self._entries
+            if key[0] == guild_id and (channel_id is None or key[1] == channel_id)
+        ]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def entries(self, guild_id: Optional[int] = None) -> List[BreakerEntry]:
+        return [
+            entry
+            for entry in self._entries.values()
+            if guild_id is None or entry.guild_id == guild_id
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = self.clock()
+        states = [entry.state for entry in self._entries.values()]
+        worst = sorted(
+            self._entries.values(),
+            key=lambda entry: (entry.state == "closed", -entry.open_until, -entry.skipped),
+        )
+        return {
+            "tracked": len(states),
+            "open": states.count("open"),
+            "half_open": states.count("half_open"),
+            "trips": self.trips,
+            "skipped": self.skipped,
+            "permission_skips": self.permission_skips,
+            "targets": {
+                f"{entry.guild_id}/{entry.channel_name}": entry.describe(now)
+                for entry in worst[:5]
+            },
+        }
+
+
+# Global instance for easy access
+_voice_breaker: Optional[VoiceBreaker] = None
+
+
+def get_voice_breaker() -> Optional[VoiceBreaker]:
+    """The breaker built by :func:`initialize_voice_breaker`, if any."""
+    return _voice_breaker
+
+
+def initialize_voice_breaker(settings: Settings) -> VoiceBreaker:
+    global _voice_breaker
+    _voice_breaker = VoiceBreaker(
+        threshold=settings.voice_breaker_threshold,
+        backoff_seconds=settings.voice_breaker_backoff_seconds,
+        max_backoff_seconds=settings.voice_breaker_max_backoff_seconds,
+    )
+    return _voice_breaker
+
+
+__all__ = [
+    "BreakerEntry",
+    "VoiceBreaker",
+    "VoiceUnavailable",
+    "get_voice_breaker",
+    "initialize_voice_breaker",
+    "missing_permissions",
+]
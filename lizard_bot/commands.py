@@ -3,15 +3,19 @@ from __future__ import annotations
 import asyncio
 import random
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import discord
 from discord.ext import commands
 
+from .audio_library import get_audio_library
+from .breaker import get_voice_breaker
+from .leader import LeaderLease, NotLeaderError
 from .state import BotState, PendingKidnap
-from .settings import Settings
-from .storage.base import BaseGuildConfigStore
-from .voice import execute_kidnap, get_users_in_voice_channels, join_play_leave
+from .settings import Settings, logger
+from .storage.base import BaseGuildConfigStore, StaleFencingTokenError
+from .voice import get_users_in_voice_channels
+from .voice_actor import VoiceActors
 
 
 def register_commands(
@@ -19,7 +23,38 @@ def register_commands(
     state: BotState,
     settings: Settings,
     config_store: BaseGuildConfigStore,
+    actors: Optional[VoiceActors] = None,
+    leader: Optional[LeaderLease] = None,
 ) -> None:
+    voice_actors = actors if actors is not None else VoiceActors(settings)
+
+    def is_standby() -> bool:
+        return leader is not None and not leader.is_leader
+
+    def leader_only() -> Callable[[Any], Any]:
+        """Check for commands that change state the scheduled timer owns."""
+
+        async def predicate(ctx: commands.Context) -> bool:
+            if is_standby():
+                raise NotLeaderError("This process does not hold the timer lease")
+            return True
+
+        return commands.check(predicate)
+
+    def fenced(write: Callable[..., None], *args: Any) -> None:
+        """Run a store write the timer also makes, fenced by this process's lease."""
+        if leader is None:
+            write(*args)
+            return
+        if not leader.is_leader:
+            raise NotLeaderError("This process does not hold the timer lease")
+        try:
+            write(*args, fencing_token=leader.token)
+        except StaleFencingTokenError:
+            # Another process took the lease; its writes win.
+            leader.demote()
+            raise
+
     def get_guild_config(guild_id: int) -> Dict[str, Any]:
         return config_store.get_guild_config(guild_id)
 
@@ -35,28 +70,32 @@ def register_commands(
             return channel
         return None
 
-    async def resolve_pending_kidnap(
+    async def resolve_pending_kidnaps(
         guild: discord.Guild,
-        member: discord.Member,
+        members: List[discord.Member],
         target_channel: discord.VoiceChannel,
     ) -> None:
-        pending_key = (guild.id, member.id)
-        pending = state.pending_kidnaps.get(pending_key)
-        if not pending:
+        # Pending kidnaps belong to the leader's timer; a standby leaves them be.
+        if is_standby():
+            return
+        victims = [member for member in members if (guild.id, member.id) in state.pending_kidnaps]
+        if not victims:
             return
 
-        success = await execute_kidnap(settings, guild, member, target_channel)
-        if success:
-            config_store.increment_user_stat(guild.id, member.id, "kidnapped")
-            if pending.initiator_id:
-                config_store.increment_user_stat(
-                    guild.id,
-                    pending.initiator_id,
-                    "kidnap_successes",
-                )
-            del state.pending_kidnaps[pending_key]
-            config_store.clear_pending_kidnap(guild.id, member.id)
-            await asyncio.sleep(settings.pending_kidnap_delay_seconds)
+        kidnapped = await voice_actors.for_guild(guild).kidnap_members(victims, target_channel)
+        completed = []
+        for member in kidnapped:
+            pending = state.pending_kidnaps.get((guild.id, member.id))
+            completed.append((member.id, pending.initiator_id if pending else None))
+        try:
+            fenced(config_store.record_kidnaps, guild.id, completed)
+        except (NotLeaderError, StaleFencingTokenError):
+            logger.warning(
+                "[%s] Lost the leader lease; leaving kidnaps to the new leader", guild.name
+            )
+            return
+        for member in kidnapped:
+            state.pending_kidnaps.pop((guild.id, member.id), None)
 
     @bot.command(name="ping")
     async def ping(ctx: commands.Context) -> None:
@@ -67,13 +106,15 @@ def register_commands(
         prefix = ctx.prefix
         description_lines = [
             "**Core Commands**",
-            f"`{prefix}lizard` - Summon the lizard to your voice channel or all active channels",
+            f"`{prefix}lizard [clip]` - Summon the lizard to your voice channel or all active channels",
+            f"`{prefix}clips` - List lizard sounds; `{prefix}clips weight <clip> <n>` (admin) tunes how often each plays",
             f"`{prefix}kidnap @user` - Attempt a dice roll kidnap toward the configured channel",
             f"`{prefix}kidnap opt-out` / `{prefix}kidnap opt-in` - Toggle your kidnap preference",
             f"`{prefix}stats` - View weighted visit and kidnap statistics",
             f"`{prefix}timer` - Check time remaining before the next automatic visit",
             f"`{prefix}timer set <minutes>` - Admin: schedule the next automatic visit",
             f"`{prefix}setup` - Configure guild defaults (admin only)",
+            f"`{prefix}breaker` - Admin: list voice channels being skipped; `{prefix}breaker reset [channel]` clears them",
         ]
 
         embed = discord.Embed(
@@ -91,7 +132,7 @@ def register_commands(
         await ctx.send(embed=embed)
     @bot.command(name="lizard")
     @commands.cooldown(1, settings.lizard_cooldown, commands.BucketType.user)
-    async def lizard_command(ctx: commands.Context) -> None:
+    async def lizard_command(ctx: commands.Context, clip: Optional[str] = None) -> None:
         if ctx.author.voice and ctx.author.voice.channel:
             sender_channel = ctx.author.voice.channel
             await ctx.send(
@@ -101,7 +142,7 @@ def register_commands(
             )
 
             try:
-                await join_play_leave(sender_channel, settings)
+                await voice_actors.for_guild(ctx.guild).visit(sender_channel, clip)
 
                 members = [member for member in sender_channel.members if not member.bot]
                 for member in members:
@@ -111,8 +152,7 @@ def register_commands(
                 kidnap_channel = resolve_kidnap_channel(ctx.guild, guild_config)
 
                 if kidnap_channel:
-                    for member in members:
-                        await resolve_pending_kidnap(ctx.guild, member, kidnap_channel)
+                    await resolve_pending_kidnaps(ctx.guild, members, kidnap_channel)
 
                 await ctx.send(
                     settings.messages.get(
@@ -142,25 +182,25 @@ def register_commands(
                 return
 
             try:
+                channels = [
+                    channel_info["channel"]
+                    for channel_info in voice_info
+                    if channel_info["guild"].id == ctx.guild.id
+                ]
+                toured = await voice_actors.for_guild(ctx.guild).tour(channels, clip)
+
+                guild_config = get_guild_config(ctx.guild.id)
+                kidnap_channel = resolve_kidnap_channel(ctx.guild, guild_config)
                 visited_channels = []
-                for channel_info in voice_info:
-                    channel = channel_info["channel"]
+                visited_members: List[discord.Member] = []
+                for channel in toured:
                     members = [member for member in channel.members if not member.bot]
-
-                    if members and channel.guild.id == ctx.guild.id:
-                        await join_play_leave(channel, settings)
-
-                        for member in members:
-                            config_store.increment_user_stat(ctx.guild.id, member.id, "visits")
-
-                        guild_config = get_guild_config(ctx.guild.id)
-                        kidnap_channel = resolve_kidnap_channel(ctx.guild, guild_config)
-                        if kidnap_channel:
-                            for member in members:
-                                await resolve_pending_kidnap(ctx.guild, member, kidnap_channel)
-
-                        visited_channels.append(channel.name)
-                        await asyncio.sleep(2)
+                    for member in members:
+                        config_store.increment_user_stat(ctx.guild.id, member.id, "visits")
+                    visited_members.extend(members)
+                    visited_channels.append(channel.name)
+                if kidnap_channel:
+                    await resolve_pending_kidnaps(ctx.guild, visited_members, kidnap_channel)
 
                 if visited_channels:
                     await ctx.send(
@@ -176,8 +216,55 @@ def register_commands(
                     ).format(error=error)
                 )
 
+    @bot.group(name="clips", invoke_without_command=True)
+    async def clips_group(ctx: commands.Context) -> None:
+        library = get_audio_library()
+        names = library.names() if library is not None else []
+        if not names:
+            await ctx.send("🦎 No lizard sounds found!")
+            return
+
+        weights = config_store.get_clip_weights(ctx.guild.id)
+        lines = [f"🔊 **{name}** - weight {weights.get(name, 1.0):g}" for name in names]
+        embed = discord.Embed(
+            title=f"🦎 Lizard Sounds for {ctx.guild.name}",
+            description="\n".join(lines),
+            color=discord.Color.green(),
+        )
+        embed.set_footer(
+            text=f"{ctx.prefix}lizard <clip> plays one. Visits pick clips at random by weight."
+        )
+        await ctx.send(embed=embed)
+
+    @clips_group.command(name="weight")
+    @commands.has_permissions(administrator=True)
+    async def clips_weight(ctx: commands.Context, name: str, weight: str) -> None:
+        library = get_audio_library()
+        if library is None or library.path(name) is None:
+            await ctx.send(f"❔ Unknown clip: `{name}`")
+            return
+
+        clip_name = name.lower()
+        if weight.lower() in {"reset", "default"}:
+            config_store.set_clip_weight(ctx.guild.id, clip_name, None)
+            await ctx.send(f"🔊 `{clip_name}` weight reset to 1.")
+            return
+
+        try:
+            value = float(weight)
+        except ValueError:
+            await ctx.send("❗ Weight must be a number or `reset`.")
+            return
+        if value < 0:
+            await ctx.send("❗ Weight cannot be negative.")
+            return
+
+        config_store.set_clip_weight(ctx.guild.id, clip_name, value)
+        await ctx.send(f"🔊 `{clip_name}` weight set to {value:g}.")
+
     @bot.group(name="kidnap", invoke_without_command=True)
     @commands.cooldown(1, settings.kidnap_cooldown, commands.BucketType.user)
+    @leader_only()
     async def kidnap(
         ctx: commands.Context,
         member: discord.Member | None = None,
@@ -246,18 +333,20 @@ def register_commands(
                 )
                 return
 
-            config_store.increment_user_stat(guild_id, ctx.author.id, "kidnap_attempts")
-            success = await execute_kidnap(settings, ctx.guild, member, target_channel)
+            fenced(config_store.increment_user_stat, guild_id, ctx.author.id, "kidnap_attempts")
+            success = await voice_actors.for_guild(ctx.guild).kidnap(member, target_channel)
             if success:
                 await ctx.send(
                     settings.messages.get(
                         "kidnap_success_message", "🦎 **FORCE KIDNAP!** {member} has been taken!"
                     ).format(member=member.mention)
                 )
-                config_store.increment_user_stat(guild_id, ctx.author.id, "kidnap_successes")
-                config_store.increment_user_stat(guild_id, member.id, "kidnapped")
+                fenced(
+                    config_store.increment_user_stat, guild_id, ctx.author.id, "kidnap_successes"
+                )
+                fenced(config_store.increment_user_stat, guild_id, member.id, "kidnapped")
             else:
-                config_store.increment_user_stat(guild_id, ctx.author.id, "kidnap_failures")
+                fenced(config_store.increment_user_stat, guild_id, ctx.author.id, "kidnap_failures")
             return
 
         immunity_minutes = guild_config.get(
@@ -299,7 +388,7 @@ def register_commands(
                 settings.messages.get("dice_roll_message", "🎲 Rolled: {roll}").format(roll=roll)
             )
 
-        config_store.increment_user_stat(guild_id, ctx.author.id, "kidnap_attempts")
+        fenced(config_store.increment_user_stat, guild_id, ctx.author.id, "kidnap_attempts")
 
         if roll <= settings.dice_roll_failure_threshold:
             await ctx.send(
@@ -307,15 +396,17 @@ def register_commands(
                     "kidnap_failure_message", "*lizard crawls away*"
                 )
             )
-            config_store.increment_user_stat(guild_id, ctx.author.id, "kidnap_failures")
+            fenced(config_store.increment_user_stat, guild_id, ctx.author.id, "kidnap_failures")
             state.kidnap_immunity[immunity_key] = now + timedelta(minutes=immunity_minutes)
         elif roll >= settings.dice_roll_success_threshold:
-            success = await execute_kidnap(settings, ctx.guild, member, target_channel)
+            success = await voice_actors.for_guild(ctx.guild).kidnap(member, target_channel)
             if success:
-                config_store.increment_user_stat(guild_id, ctx.author.id, "kidnap_successes")
-                config_store.increment_user_stat(guild_id, member.id, "kidnapped")
+                fenced(
+                    config_store.increment_user_stat, guild_id, ctx.author.id, "kidnap_successes"
+                )
+                fenced(config_store.increment_user_stat, guild_id, member.id, "kidnapped")
             else:
-                config_store.increment_user_stat(guild_id, ctx.author.id, "kidnap_failures")
+                fenced(config_store.increment_user_stat, guild_id, ctx.author.id, "kidnap_failures")
         else:
             await ctx.send(
                 settings.messages.get(
@@ -467,6 +558,7 @@ def register_commands(
 
     @timer_group.command(name="set")
     @commands.has_permissions(administrator=True)
+    @leader_only()
     async def timer_set(ctx: commands.Context, minutes: int) -> None:
         if minutes <= 0:
             await ctx.send("Minutes must be greater than 0.")
@@ -474,8 +566,8 @@ def register_commands(
 
         guild_id = ctx.guild.id
         when = datetime.now() + timedelta(minutes=minutes)
+        fenced(config_store.set_guild_timer, guild_id, when)
         state.guild_timers[guild_id] = when
-        config_store.set_guild_timer(guild_id, when)
         await ctx.send(f"⏱️ Timer updated. Next visit in {minutes} minute(s).")
 
     @bot.command(name="setup")
@@ -813,6 +905,38 @@ def register_commands(
         embed.set_footer(text="Stay warm and bask responsibly.")
         await ctx.send(embed=embed)
 
+    @bot.group(name="breaker", invoke_without_command=True)
+    @commands.has_permissions(administrator=True)
+    async def breaker_group(ctx: commands.Context) -> None:
+        breaker = get_voice_breaker()
+        entries = breaker.entries(ctx.guild.id) if breaker is not None else []
+        if not entries:
+            await ctx.send("🔌 No voice channels are being skipped.")
+            return
+
+        now = breaker.clock()
+        lines = [f"🔇 **{entry.channel_name}** - {entry.describe(now)}" for entry in entries]
+        embed = discord.Embed(
+            title=f"🦎 Voice Channels Skipped in {ctx.guild.name}",
+            description="\n".join(lines),
+            color=discord.Color.orange(),
+        )
+        embed.set_footer(text=f"{ctx.prefix}breaker reset [channel] lets the bot try again.")
+        await ctx.send(embed=embed)
+
+    @breaker_group.command(name="reset")
+    @commands.has_permissions(administrator=True)
+    async def breaker_reset(
+        ctx: commands.Context, channel: Optional[discord.VoiceChannel] = None
+    ) -> None:
+        breaker = get_voice_breaker()
+        if breaker is None:
+            await ctx.send("🔌 No voice channels are being skipped.")
+            return
+        cleared = breaker.reset(ctx.guild.id, channel.id if channel is not None else None)
+        target = f"**{channel.name}**" if channel is not None else "all voice channels"
+        await ctx.send(f"🔌 Cleared {cleared} record(s) for {target}.")
+
     @bot.command(name="stop")
     async def stop(ctx: commands.Context) -> None:
         if ctx.guild.voice_client and ctx.guild.voice_client.is_playing():
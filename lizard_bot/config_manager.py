@@ -38,7 +38,9 @@ class ConfigManager:
         # Bot settings
         self.config['bot'] = {
             'command_prefix': '*',
-            'activity_name': 'Lizard'
+            'activity_name': 'Lizard',
+            'sharded': 'false',
+            'shard_count': '0'
         }
         
         # URLs
@@ -52,6 +54,9 @@ class ConfigManager:
             'config_file': 'guild_configs.json',
             'audio_file': 'lizzard-1.mp3',
             'ffmpeg_path': 'ffmpeg.exe',
+            'opus_cache_directory': 'opus_cache',
+            'embedding_cache_directory': 'embedding_cache',
+            'clips_directory': 'clips',
             'dice_gif': 'Diceroll.gif',
             'frames_directory': 'Frames'
         }
@@ -66,7 +71,43 @@ class ConfigManager:
         self.config['timer'] = {
             'min_visit_delay': '2',
             'max_visit_delay': '30',
-            'timer_check_interval': '10'
+            'timer_check_interval': '10',
+            'slo_lateness_seconds': '60',
+            'slo_tick_seconds': '10',
+            'slo_percentile': '95',
+            'slo_check_interval': '300'
+        }
+        
+        # Leader election
+        self.config['leader'] = {
+            'enabled': 'false',
+            'lease_seconds': '15',
+            'renew_seconds': '5'
+        }
+        
+        # Voice session tracing
+        self.config['tracing'] = {
+            'file': 'logs/voice_traces.jsonl',
+            'max_kb': '1024',
+            'backups': '3'
+        }
+        
+        # Mention-response embeddings
+        self.config['embeddings'] = {
+            'model': 'all-MiniLM-L6-v2',
+            'workers': '1',
+            'torch_threads': '2',
+            'max_pending': '16',
+            'worker': '',
+            'timeout_seconds': '2',
+            'batch_size': '16',
+            'batch_window_ms': '5',
+            'cache_size': '1024',
+            'cache_file': '',
+            'backend': 'auto',
+            'min_similarity': '',
+            'candidates': '0',
+            'precision': 'float32'
         }
         
         # Cooldowns
@@ -80,14 +121,21 @@ class ConfigManager:
             'immunity_duration_minutes': '30',
             'dice_roll_success_threshold': '14',
             'dice_roll_failure_threshold': '7',
-            'pending_kidnap_delay_seconds': '2'
+            'move_concurrency': '5'
         }
         
         # Voice settings
         self.config['voice'] = {
             'connection_timeout': '30.0',
-            'playback_delay_seconds': '1',
-            'disconnect_delay_seconds': '1'
+            'playback_delay_seconds': '0',
+            'disconnect_delay_seconds': '1',
+            'operation_timeout': '10',
+            'playback_timeout': '30',
+            'session_timeout': '90',
+            'breaker_threshold': '3',
+            'breaker_backoff_seconds': '60',
+            'breaker_max_backoff_seconds': '3600',
+            'clip_memory_kb': '4096'
         }
         
         # Reactions
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+import discord
+from discord.ext import commands
+
+
+DiagnosticsProvider = Callable[[], Dict[str, Any]]
+
+# Discord rejects embed field values longer than this.
+_FIELD_LIMIT = 1024
+
+
+class DiagnosticsRegistry:
+    """Named snapshot providers surfaced to admins through the ``diag`` command."""
+
+    def __init__(self) -> None:
+        self._providers: Dict[str, DiagnosticsProvider] = {}
+
+    def register(self, name: str, provider: DiagnosticsProvider) -> None:
+        self._providers[name] = provider
+
+    def names(self) -> List[str]:
+        return sorted(self._providers)
+
+    def collect(self, name: str) -> Dict[str, Any]:
+        provider = self._providers.get(name)
+        if provider is None:
+            raise KeyError(name)
+        return provider()
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    if isinstance(value, dict):
+        return ", ".join(f"{key}={_format_value(item)}" for key, item in value.items()) or "-"
+    return str(value)
+
+
+def _format_section(data: Dict[str, Any]) -> str:
+    lines = [f"**{key}:** {_format_value(value)}" for key, value in data.items()]
+    text = "\n".join(lines) or "No data yet."
+    if len(text) > _FIELD_LIMIT:
+        text = text[: _FIELD_LIMIT - 1] + "…"
+    return text
+
+
+def register_diagnostics(bot: commands.Bot, registry: DiagnosticsRegistry) -> None:
+    @bot.command(name="diag")
+    @commands.has_permissions(administrator=True)
+    async def diag(ctx: commands.Context, section: Optional[str] = None) -> None:
+        names = registry.names()
+        if section is None:
+            await ctx.send(
+                f"Usage: `{ctx.prefix}diag <section>` - available: "
+                + (", ".join(f"`{name}`" for name in names) or "none")
+            )
+            return
+
+        try:
+            data = registry.collect(section.lower())
+        except KeyError:
+            await ctx.send(f"❔ Unknown diagnostics section: `{section}`")
+            return
+
+        embed = discord.Embed(
+            title=f"🦎 Diagnostics: {section.lower()}",
+            color=discord.Color.green(),
+        )
+        nested = {key: value for key, value in data.items() if isinstance(value, dict)}
+        flat = {key: value for key, value in data.items() if not isinstance(value, dict)}
+        if flat or not nested:
+            embed.add_field(name="Summary", value=_format_section(flat), inline=False)
+        for key, value in list(nested.items())[:24]:
+            embed.add_field(name=key, value=_format_section(value), inline=False)
+        await ctx.send(embed=embed)
+
+
+__all__ = ["DiagnosticsRegistry", "register_diagnostics"]
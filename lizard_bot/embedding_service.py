@@ -1,42 +1,533 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import random
-from typing import List, Tuple
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
 import logging
 
+from .metrics import Histogram
+from .query_cache import QueryCache, corpus_key
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
 logger = logging.getLogger(__name__)
 
-# Try to import ML dependencies, but make them optional
-try:
-    import numpy as np
-    from sentence_transformers import SentenceTransformer
+# The ML stack (numpy, sentence_transformers and with it torch) is imported by
+# the background loader, not at module import, so bot start-up does not pay
+# for it. Until the import succeeds the service runs in fallback mode.
+np: Any = None
+SentenceTransformer: Any = None
+ML_AVAILABLE = False
+
+
+def _import_ml(torch_threads: int = 0) -> None:
+    """Import the optional ML dependencies into this module's globals.
+
+    With ``torch_threads`` set, torch's intra-op pool is capped at that many
+    threads (and the OpenMP/MKL pools through the environment, which they
+    only read at import) so inference leaves cores for the event loop.
+    """
+    global np, SentenceTransformer, ML_AVAILABLE
+    if torch_threads > 0:
+        for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ.setdefault(variable, str(torch_threads))
+    import numpy
+    from sentence_transformers import SentenceTransformer as model_class
+
+    if torch_threads > 0:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Only allowed before torch runs any parallel work.
+            pass
+
+    np = numpy
+    SentenceTransformer = model_class
     ML_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"ML dependencies not available: {e}. Using fallback mode.")
-    ML_AVAILABLE = False
+
+
+def _import_numpy() -> None:
+    global np
+    if np is None:
+        import numpy
+
+        np = numpy
+
+
+def _import_store() -> Any:
+    """Import numpy and the quantized matrix helpers; returns their module."""
+    _import_numpy()
+    from . import quantized_matrix
+
+    return quantized_matrix
+
+
+def _import_ngram() -> Any:
+    """Import numpy and the n-gram encoder; returns the encoder class."""
+    _import_numpy()
+    from .ngram_encoder import HashedNgramEncoder
+
+    return HashedNgramEncoder
+
+
+def _rank(scores: Any, top_k: int) -> Any:
+    """Positions of the ``top_k`` highest ``scores``, best first, without a full sort."""
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if top_k < len(scores):
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+# Default min_similarity per backend: n-gram cosines run lower than MiniLM's.
+DEFAULT_MIN_SIMILARITY = {"transformer": 0.3, "ngram": 0.2}
+
+
+class EmbeddingMatrixCache:
+    """On-disk cache of encoded response matrices, keyed by model and corpus.
+
+    Entries are ``<model>-<corpus key>.npy`` files, memory-mapped read-only
+    on a hit, so a restart with an unchanged response list does not encode
+    it again and processes on one host share the pages. Several corpora can
+    be live at once (a shared worker serves more than one bot), so the
+    ``keep`` most recently used entries per model are kept rather than just
+    the current one.
+    """
+
+    def __init__(self, directory: Path, keep: int = 8) -> None:
+        self.directory = directory
+        self.keep = max(1, keep)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def path_for(self, model_name: str, responses: List[str]) -> Path:
+        model = re.sub(r"[^\w.-]", "_", model_name)
+        return self.directory / f"{model}-{corpus_key(responses)}.npy"
+
+    def load(self, model_name: str, responses: List[str], encode: Callable[[List[str]], Any]) -> Any:
+        """Return the response matrix, encoding and storing it on a miss."""
+        store = _import_store()
+        path = self.path_for(model_name, responses)
+        if path.exists():
+            try:
+                matrix = store.from_array(np.load(path, mmap_mode="r"))
+                if matrix.ndim != 2 or matrix.shape[0] != len(responses):
+                    raise ValueError(f"shape {matrix.shape} for {len(responses)} responses")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable embedding cache {path.name}: {e}")
+            else:
+                self.hits += 1
+                self._touch(path)
+                return matrix
+
+        self.misses += 1
+        return self.store(model_name, responses, encode(responses))
+
+    def store(self, model_name: str, responses: List[str], matrix: Any) -> Any:
+        """Save ``matrix`` for ``responses``; returns it memory-mapped from disk if possible."""
+        store = _import_store()
+        path = self.path_for(model_name, responses)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=self.directory, prefix=path.name, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    np.save(handle, store.to_array(matrix))
+                os.replace(temp_name, path)
+            except BaseException:
+                try:
+                    os.unlink(temp_name)
+                except OSError:
+                    pass
+                raise
+            self._remove_stale(path)
+            return store.from_array(np.load(path, mmap_mode="r"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not cache response embeddings in {path.name}: {e}")
+            return matrix
+
+    def _touch(self, path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _remove_stale(self, current: Path) -> None:
+        model = current.name.rsplit("-", 1)[0]
+        entries = sorted(
+            (
+                entry
+                for entry in self.directory.glob(f"{model}-*.npy")
+                if entry != current and len(entry.stem) == len(current.stem)
+            ),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True,
+        )
+        for entry in entries[self.keep - 1 :]:
+            try:
+                entry.unlink()
+            except OSError:
+                # Still mapped by a process on Windows; the next save retries.
+                continue
+            self.invalidations += 1
+            logger.info(f"Removed stale embedding cache {entry.name}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "matrix_cache": str(self.directory),
+            "matrix_cache_hits": self.hits,
+            "matrix_cache_misses": self.misses,
+            "matrix_cache_invalidations": self.invalidations,
+        }
 
 
 class EmbeddingService:
-    """Service for finding the most similar response using sentence embeddings."""
-    
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    """Service for finding the most similar response using sentence embeddings.
+
+    ``backend`` picks the matcher: ``transformer`` (sentence-transformers),
+    ``ngram`` (:class:`HashedNgramEncoder`, NumPy only, no model to load) or
+    ``auto``, which uses the transformer when it can be imported and the
+    n-gram matcher otherwise.
+
+    Nothing heavy happens in the constructor. :meth:`start_background_load`
+    imports the ML stack, loads the model, runs a warm-up encode and encodes
+    the responses on a daemon thread; until then :attr:`ready` is False and
+    callers should use their non-ML path.
+
+    :meth:`best_response` is the event loop's entry point: it encodes on a
+    small thread pool and turns requests away once ``max_pending`` are
+    queued or running, so a burst of mentions cannot pile up behind torch.
+    Queries that arrive within ``batch_window`` seconds of each other are
+    encoded together (up to ``batch_size`` at a time) and scored with one
+    matrix multiply. Best matches are remembered per normalised query in a
+    :class:`QueryCache`, so repeated phrases skip the model altogether.
+    With a ``matrix_cache_directory`` the encoded responses are kept on disk
+    by :class:`EmbeddingMatrixCache`, so restarts only load the model.
+
+    With ``candidates`` set (off by default) and a response list longer
+    than that, a :class:`BM25Index`
+    first picks the ``candidates`` responses sharing the most (and rarest)
+    words with the query and only those are scored against its embedding;
+    a query sharing no word with any response is scored against all of them.
+
+    ``precision`` sets how the response matrix is held: ``float32`` as the
+    model returns it, or ``float16`` / ``int8`` as a :class:`QuantizedMatrix`
+    at half or a quarter of the memory, scored in blocks of rows.
+
+    :meth:`update_responses` swaps in an edited response list on a
+    background thread, encoding only the lines that are new; lookups keep
+    using the previous list until the new one is complete.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        workers: int = 1,
+        torch_threads: int = 2,
+        max_pending: int = 16,
+        worker_address: str = "",
+        timeout: float = 2.0,
+        spawn_worker: bool = True,
+        load_timeout: float = 300.0,
+        batch_size: int = 16,
+        batch_window: float = 0.005,
+        cache_size: int = 1024,
+        cache_file: Optional[Path] = None,
+        matrix_cache_directory: Optional[Path] = None,
+        backend: str = "auto",
+        min_similarity: Optional[float] = None,
+        candidates: int = 0,
+        precision: str = "float32",
+    ):
         """
-        Initialize the embedding service with a lightweight model.
-        
+        Initialize the embedding service without loading anything.
+
         Args:
-            model_name: The sentence transformer model to use. 
+            model_name: The sentence transformer model to use.
                       'all-MiniLM-L6-v2' is lightweight and fast.
+            workers: Threads that run encodes for :meth:`best_response`
+            torch_threads: Cap on torch's intra-op threads (0 leaves torch's default)
+            max_pending: Queued plus running encodes before requests are turned away
+            worker_address: Unix socket (or Windows pipe) of an embedding worker
+                      process; empty runs the model in this process
+            timeout: Seconds to wait for the worker to answer one query
+            spawn_worker: Start and supervise a worker when none answers
+            load_timeout: Seconds to wait for the worker to load and encode the responses
+            batch_size: Most queries :meth:`best_response` encodes in one batch
+            batch_window: Seconds the first query of a batch waits for more to arrive
+            cache_size: Best matches remembered by normalised query (0 disables)
+            cache_file: JSON file that keeps those matches across restarts
+            matrix_cache_directory: Where encoded response matrices are kept
+                      across restarts (None re-encodes on every start)
+            backend: 'auto', 'transformer' or 'ngram'
+            min_similarity: Default match threshold; None uses the backend's
+            candidates: Responses the BM25 first stage passes on for embedding
+                      scoring; worth it for thousands of responses (0 scores every response)
+            precision: 'float32', 'float16' or 'int8' storage for the response matrix
         """
         self.model_name = model_name
+        self.backend = backend
+        # The backend actually in use, once loaded.
+        self.active_backend = ""
+        self._min_similarity = min_similarity
+        self.candidates = max(0, candidates)
+        self.reranked = 0
+        self.full_scans = 0
+        self._lexical: Any = None
+        self.precision = precision
+        self.workers = max(1, workers)
+        self.torch_threads = torch_threads
+        self.max_pending = max(1, max_pending)
+        self.pending = 0
+        self.queries = 0
+        self.rejected = 0
+        self.latency = Histogram()
+        self.batch_size = max(1, batch_size)
+        self.batch_window = max(0.0, batch_window)
+        self.batches = 0
+        self.batch_sizes = Histogram()
+        self._batch: List[Tuple[str, float, "asyncio.Future[Optional[str]]"]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self.query_cache = QueryCache(cache_size, cache_file)
+        self.matrix_cache = (
+            EmbeddingMatrixCache(matrix_cache_directory)
+            if matrix_cache_directory is not None
+            else None
+        )
+        self.corpus_version = ""
+        # Model, precision and candidates of the worker's answers, when they
+        # come from a worker that was already running.
+        self._served: Optional[Tuple[str, str, int]] = None
+        self._response_index: Dict[str, int] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.worker_address = worker_address
+        self.timeout = timeout
+        self.spawn_worker = spawn_worker
+        self.load_timeout = load_timeout
+        self._client: Any = None
+        self._supervisor: Any = None
         self.model = None
         self.responses = []
         self.response_embeddings = None
-        if ML_AVAILABLE:
-            self._load_model()
+        # idle -> loading -> ready, or unavailable (no ML stack) / failed
+        self.state = "idle"
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Guards the responses / matrix / version trio while it is swapped.
+        self._swap_lock = threading.Lock()
+        self._wanted: Optional[List[str]] = None
+        self._updater: Optional[threading.Thread] = None
+        self.corpus_updates = 0
+        self.update_errors = 0
+        self.last_update: Dict[str, int] = {}
+
+    @property
+    def min_similarity(self) -> float:
+        """Threshold used when a caller does not pass one."""
+        if self._min_similarity is not None:
+            return self._min_similarity
+        return DEFAULT_MIN_SIMILARITY.get(self.active_backend, 0.3)
+
+    @property
+    def ready(self) -> bool:
+        """True once the model is loaded and the responses are encoded."""
+        if self.state != "ready":
+            return False
+        return self._client is not None or self.response_embeddings is not None
+
+    def start_background_load(self, responses: Optional[List[str]] = None) -> bool:
+        """
+        Import the ML stack and load the model on a background thread.
+
+        Args:
+            responses: Responses to encode once the model is up
+
+        Returns:
+            True if a load was started, False if one already ran or is running
+        """
+        with self._lock:
+            if self.state != "idle":
+                return False
+            self.state = "loading"
+            if responses:
+                self.responses = responses
+            self._thread = threading.Thread(
+                target=self._background_load, name="embedding-loader", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Block until the background load finishes; True if the service is ready."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def _timed(self, name: str, started: float) -> float:
+        now = time.perf_counter()
+        self.timings[name] = now - started
+        return now
+
+    def _background_load(self) -> None:
+        if self.worker_address and self.backend != "ngram":
+            self._connect_worker()
         else:
-            logger.info("ML not available, running EmbeddingService in fallback mode.")
-    
+            self.load_now(self.responses)
+        # The responses file may have been edited while the model loaded.
+        self._start_updater()
+
+    def load_now(self, responses: Optional[List[str]] = None, model: Any = None) -> bool:
+        """
+        Load the model and encode ``responses`` on the calling thread.
+
+        Args:
+            responses: Responses to encode once the model is up
+            model: An already loaded model to share instead of loading one
+
+        Returns:
+            True if the service ended up ready
+        """
+        self.state = "loading"
+        started = step = time.perf_counter()
+        if model is not None:
+            self._use_model(model)
+        else:
+            try:
+                self._select_backend()
+            except ImportError as e:
+                self.state = "unavailable"
+                self.error = str(e)
+                logger.warning(f"ML dependencies not available: {e}. Using fallback mode.")
+                return False
+            step = self._timed("import_seconds", started)
+
+        try:
+            if model is None and self.active_backend == "transformer":
+                self._load_model()
+                step = self._timed("load_seconds", step)
+                self.model.encode(["warm up"])
+                step = self._timed("warmup_seconds", step)
+            if responses:
+                self.load_responses(responses)
+                self._timed("encode_seconds", step)
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            return False
+        self.state = "ready"
+        if self.active_backend == "ngram" and model is None:
+            logger.info(
+                "N-gram matcher ready in %.3fs for %d responses",
+                time.perf_counter() - started,
+                len(self.responses),
+            )
+        elif model is None:
+            logger.info(
+                "Embedding model ready in %.2fs (import %.2fs, load %.2fs, warm-up %.2fs)",
+                time.perf_counter() - started,
+                self.timings["import_seconds"],
+                self.timings["load_seconds"],
+                self.timings["warmup_seconds"],
+            )
+        return True
+
+    def _select_backend(self) -> None:
+        """Import the configured backend; ``auto`` falls back to n-grams without torch."""
+        if self.backend != "ngram":
+            try:
+                _import_ml(self.torch_threads)
+                self.active_backend = "transformer"
+                return
+            except ImportError as e:
+                if self.backend != "auto":
+                    raise
+                logger.info(f"sentence-transformers not available ({e}), using the n-gram matcher")
+        self._use_model(_import_ngram()())
+
+    def _use_model(self, model: Any) -> None:
+        _import_numpy()
+        self.model = model
+        self.active_backend = getattr(model, "backend", "transformer")
+        if self.active_backend == "ngram":
+            self.model_name = model.name
+
+    @property
+    def _matrix_name(self) -> str:
+        """Matrix cache name: the model, plus the precision when it is not float32."""
+        if self.precision == "float32":
+            return self.model_name
+        return f"{self.model_name}.{self.precision}"
+
+    def _encode(self, texts: List[str]) -> Any:
+        """Encode ``texts`` into a matrix stored at :attr:`precision`."""
+        return _import_store().quantize(self.model.encode(texts), self.precision)
+
+    def _connect_worker(self) -> None:
+        """Make sure a worker serves ``worker_address`` and register the responses with it."""
+        from .embedding_worker import WorkerClient, WorkerError, WorkerSupervisor, create_authkey
+
+        started = time.perf_counter()
+        if self.spawn_worker:
+            try:
+                create_authkey()
+            except OSError as e:
+                self.state = "failed"
+                self.error = f"worker key: {e}"
+                logger.error(f"Could not create the embedding worker key: {e}")
+                return
+            self._supervisor = WorkerSupervisor(
+                self.worker_address,
+                self.model_name,
+                self.torch_threads,
+                cache_directory=self.matrix_cache.directory if self.matrix_cache else None,
+                precision=self.precision,
+                backend=self.backend,
+                candidates=self.candidates,
+            )
+            self._supervisor.start()
+        client = WorkerClient(self.worker_address, timeout=self.timeout)
+        try:
+            info = client.register(self.responses, wait=self.load_timeout)
+        except WorkerError as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error(f"Embedding worker at {self.worker_address} is unusable: {e}")
+            return
+        self._client = client
+        self.active_backend = info.get("backend") or "transformer"
+        self._served = (
+            info.get("model", self.model_name),
+            info.get("precision", self.precision),
+            info.get("candidates", self.candidates),
+        )
+        self._set_corpus(self.responses)
+        self.timings["connect_seconds"] = time.perf_counter() - started
+        self.timings.update(
+            {f"worker_{name}": value for name, value in info.get("timings", {}).items()}
+        )
+        self.state = "ready"
+        logger.info(
+            f"Using embedding worker at {self.worker_address} (pid {info.get('pid')}) "
+            f"for {len(self.responses)} responses"
+        )
+
     def _load_model(self) -> None:
         """Load the sentence transformer model."""
         if not ML_AVAILABLE:
@@ -58,7 +549,7 @@ class EmbeddingService:
         Args:
             responses: List of response strings to match against
         """
-        if not ML_AVAILABLE:
+        if np is None:
             self.responses = responses
             logger.info("ML not available, storing responses for random selection.")
             return
@@ -66,17 +557,181 @@ class EmbeddingService:
         if not self.model:
             raise RuntimeError("Model not loaded. Call _load_model() first.")
         
-        self.responses = responses
         logger.info(f"Encoding {len(responses)} responses")
         
         try:
-            # Encode all responses at once for efficiency
-            self.response_embeddings = self.model.encode(responses)
+            # Encode all responses at once for efficiency, or map them from disk
+            if self.matrix_cache is not None:
+                embeddings = self.matrix_cache.load(self._matrix_name, responses, self._encode)
+            else:
+                embeddings = self._encode(responses)
+            self._set_corpus(responses, embeddings)
             logger.info("Responses encoded successfully")
         except Exception as e:
             logger.error(f"Failed to encode responses: {e}")
             raise
     
+    def _set_corpus(self, responses: List[str], embeddings: Any = None) -> None:
+        """Adopt ``responses`` (and their matrix) and the cache version that goes with them."""
+        index = {response: row for row, response in enumerate(responses)}
+        # Everything that decides which response a query matches, so a cached
+        # answer never outlives a change of model, precision or BM25 stage.
+        model, precision, candidates = self._served or (
+            self.model_name,
+            self.precision,
+            self.candidates,
+        )
+        version = f"{model}:{precision}:{candidates}:{corpus_key(responses)}"
+        lexical = None
+        if embeddings is not None and 0 < self.candidates < len(responses):
+            from .bm25 import BM25Index
+
+            lexical = BM25Index(responses)
+        with self._swap_lock:
+            if embeddings is not None:
+                self.response_embeddings = embeddings
+                self._lexical = lexical
+            self.responses = responses
+            self._response_index = index
+            self.corpus_version = version
+
+    def _current(self) -> Tuple[List[str], Any, str, Dict[str, int], Any]:
+        """Responses, matrix, version, row index and BM25 index, all from the same corpus."""
+        with self._swap_lock:
+            return (
+                self.responses,
+                self.response_embeddings,
+                self.corpus_version,
+                self._response_index,
+                self._lexical,
+            )
+
+    def _cached(self, query: str) -> Optional[List[Tuple[str, float]]]:
+        """The remembered best match for ``query`` as a one-item result list."""
+        responses, _, version, _, _ = self._current()
+        hit = self.query_cache.get(version, query)
+        if hit is None or hit[0] >= len(responses):
+            return None
+        index, similarity = hit
+        return [(responses[index], similarity)]
+
+    def _remember(
+        self,
+        queries: Sequence[str],
+        results: List[List[Tuple[str, float]]],
+        version: str,
+        rows: Dict[str, int],
+    ) -> None:
+        for query, matches in zip(queries, results):
+            if not matches:
+                continue
+            index = rows.get(matches[0][0])
+            if index is not None:
+                self.query_cache.put(version, query, index, matches[0][1])
+        self.query_cache.maybe_save()
+
+    def update_responses(self, responses: List[str], version: int = 0) -> None:
+        """
+        Switch to an edited response list without blocking the caller.
+
+        Meant as a :meth:`TextCache.subscribe` callback. Lines that were
+        already encoded keep their rows, removed lines are dropped and only
+        new lines are encoded; the new matrix replaces the old one in a
+        single swap once it is complete.
+
+        Args:
+            responses: The new response list
+            version: The text cache's version of it, for logging
+        """
+        if not self.ready:
+            if self.state in ("idle", "loading"):
+                # Picked up when the background load finishes.
+                self._wanted = list(responses)
+            else:
+                self.responses = list(responses)
+            return
+        logger.info(f"Responses changed (version {version}), updating embeddings")
+        self._wanted = list(responses)
+        self._start_updater()
+
+    def _start_updater(self) -> None:
+        with self._lock:
+            if self._wanted is None or not self.ready:
+                return
+            if self._updater is not None and self._updater.is_alive():
+                return
+            self._updater = threading.Thread(
+                target=self._run_updates, name="embedding-updater", daemon=True
+            )
+            self._updater.start()
+
+    def _run_updates(self) -> None:
+        while True:
+            with self._lock:
+                wanted, self._wanted = self._wanted, None
+                if wanted is None:
+                    self._updater = None
+                    return
+            if wanted == self.responses:
+                continue
+            started = time.perf_counter()
+            try:
+                if self._client is not None:
+                    self._client.register(wanted, wait=self.load_timeout)
+                    self._set_corpus(wanted)
+                    self.last_update = {"responses": len(wanted)}
+                else:
+                    self._apply_update(wanted)
+            except Exception as e:
+                self.update_errors += 1
+                self.error = f"update: {e}"
+                logger.error(f"Failed to update response embeddings: {e}")
+                continue
+            self.corpus_updates += 1
+            self.timings["update_seconds"] = time.perf_counter() - started
+            logger.info(f"Response embeddings updated: {self.last_update}")
+
+    def load_from(self, other: "EmbeddingService", responses: List[str]) -> None:
+        """
+        Share ``other``'s model and encode ``responses`` starting from its matrix.
+
+        Only lines ``other`` has not encoded go through the model.
+
+        Args:
+            other: A ready, in-process service using the same model
+            responses: Responses for this service
+        """
+        self._use_model(other.model)
+        _, embeddings, _, _, _ = other._current()
+        self._set_corpus(other.responses, _import_store().quantize(embeddings, self.precision))
+        self.state = "ready"
+        if responses != self.responses:
+            self._apply_update(responses)
+
+    def _apply_update(self, responses: List[str]) -> None:
+        """Build the matrix for ``responses`` from the current one plus the new lines."""
+        _, old_matrix, _, old_rows, _ = self._current()
+        new_lines = [line for line in dict.fromkeys(responses) if line not in old_rows]
+        kept = [row for row, line in enumerate(responses) if line in old_rows]
+
+        matrix = _import_store().empty_like(old_matrix, len(responses))
+        if kept:
+            matrix[kept] = old_matrix[[old_rows[responses[row]] for row in kept]]
+        if new_lines:
+            encoded = self._encode(new_lines)
+            new_rows = {line: row for row, line in enumerate(new_lines)}
+            added = [row for row, line in enumerate(responses) if line in new_rows]
+            matrix[added] = encoded[[new_rows[responses[row]] for row in added]]
+        if self.matrix_cache is not None:
+            matrix = self.matrix_cache.store(self._matrix_name, responses, matrix)
+
+        self._set_corpus(responses, matrix)
+        self.last_update = {
+            "responses": len(responses),
+            "encoded": len(new_lines),
+            "removed": len(set(old_rows) - set(responses)),
+        }
+
     def find_most_similar(self, query: str, top_k: int = 1) -> List[Tuple[str, float]]:
         """
         Find the most similar response(s) to the given query.
@@ -88,59 +743,121 @@ class EmbeddingService:
         Returns:
             List of tuples containing (response_text, similarity_score)
         """
-        if not ML_AVAILABLE:
+        if not self.ready:
             if self.responses:
                 return [(random.choice(self.responses), 0.0)] # Return a random response with 0 similarity
             return []
+        return self.find_most_similar_batch([query], top_k)[0]
 
-        if not self.model or self.response_embeddings is None:
+    def find_most_similar_batch(
+        self, queries: Sequence[str], top_k: int = 1
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Find the most similar response(s) to each query with one encode.
+
+        Args:
+            queries: The input texts to find similar responses for
+            top_k: Number of top similar responses to return per query
+
+        Returns:
+            One list of (response_text, similarity_score) tuples per query;
+            empty lists if the lookup failed
+        """
+        queries = list(queries)
+        if not self.ready:
+            return [self.find_most_similar(query, top_k) for query in queries]
+
+        if self._client is not None:
+            from .embedding_worker import WorkerError
+
+            _, _, version, rows, _ = self._current()
+            try:
+                results = [
+                    [tuple(result) for result in matches]
+                    for matches in self._client.query(queries, top_k)
+                ]
+                self._remember(queries, results, version, rows)
+                return results
+            except WorkerError as e:
+                logger.warning(f"Embedding worker query failed: {e}")
+                if self._supervisor is not None:
+                    self._supervisor.check_now()
+                return [[] for _ in queries]
+
+        responses, embeddings, version, rows, lexical = self._current()
+        if not self.model or embeddings is None:
             raise RuntimeError("Model or responses not loaded")
         
-        if not self.responses:
-            return []
+        if not responses or not queries:
+            return [[] for _ in queries]
         
         try:
-            # Encode the query
-            query_embedding = self.model.encode([query])
+            # Encode the queries in one batch
+            query_embeddings = self.model.encode(queries)
             
-            # Calculate cosine similarity
-            similarities = np.dot(self.response_embeddings, query_embedding.T).flatten()
-            
-            # Get top-k most similar responses
-            top_indices = np.argsort(similarities)[::-1][:top_k]
+            if lexical is None:
+                # Cosine similarity of every response against every query: (responses, queries)
+                similarities = embeddings.dot(query_embeddings.T)
+                columns = [(None, similarities[:, column]) for column in range(len(queries))]
+            else:
+                columns = [
+                    self._rerank(lexical, embeddings, query, query_embeddings[column])
+                    for column, query in enumerate(queries)
+                ]
             
+            # Get top-k most similar responses for each query
             results = []
-            for idx in top_indices:
-                response = self.responses[idx]
-                similarity = float(similarities[idx])
-                results.append((response, similarity))
-            
+            for candidates, scores in columns:
+                top = _rank(scores, top_k)
+                ids = top if candidates is None else candidates[top]
+                results.append(
+                    [(responses[idx], float(score)) for idx, score in zip(ids, scores[top])]
+                )
+            self._remember(queries, results, version, rows)
             return results
             
         except Exception as e:
             logger.error(f"Error finding similar responses: {e}")
-            return []
+            return [[] for _ in queries]
     
-    def get_best_response(self, query: str, min_similarity: float = 0.3) -> str | None:
+    def _rerank(
+        self, lexical: Any, embeddings: Any, query: str, query_embedding: Any
+    ) -> Tuple[Any, Any]:
+        """BM25 candidates for ``query`` and their cosine scores (all rows if none match)."""
+        candidates = lexical.search(query, self.candidates)
+        if len(candidates) == 0:
+            self.full_scans += 1
+            return None, embeddings.dot(query_embedding)
+        self.reranked += 1
+        return candidates, embeddings[candidates].dot(query_embedding)
+
+    def get_best_response(self, query: str, min_similarity: Optional[float] = None) -> str | None:
         """
         Get the best matching response, or None if no good match is found.
         
         Args:
             query: The input text to find similar responses for
-            min_similarity: Minimum similarity threshold (0-1) for a valid match
+            min_similarity: Minimum similarity (0-1) for a match; None uses the default
             
         Returns:
             The best matching response string, or None if no good match
         """
-        if not ML_AVAILABLE:
+        if not self.ready:
             if self.responses:
                 return random.choice(self.responses)
             return None
 
-        results = self.find_most_similar(query, top_k=1)
-        
+        results = self._cached(query) or self.find_most_similar(query, top_k=1)
+        return self._pick(query, results, min_similarity)
+
+    def _pick(
+        self, query: str, results: List[Tuple[str, float]], min_similarity: Optional[float]
+    ) -> Optional[str]:
+        """The top result if it clears ``min_similarity`` (default :attr:`min_similarity`)."""
         if not results:
             return None
+        if min_similarity is None:
+            min_similarity = self.min_similarity
         
         response, similarity = results[0]
         
@@ -151,6 +868,128 @@ class EmbeddingService:
             logger.info(f"No good match found (best similarity: {similarity:.3f} < {min_similarity})")
             return None
 
+    async def best_response(
+        self, query: str, min_similarity: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Async :meth:`get_best_response` that encodes on the worker threads.
+
+        The query joins the batch being collected; the batch is encoded once
+        it holds ``batch_size`` queries or ``batch_window`` has passed since
+        its first query arrived.
+
+        Args:
+            query: The input text to find similar responses for
+            min_similarity: Minimum similarity (0-1) for a match; None uses the default
+
+        Returns:
+            The best matching response, or None when there is no good match,
+            the model is not ready, or ``max_pending`` requests are in flight
+        """
+        if not self.ready:
+            return None
+        cached = self._cached(query)
+        if cached is not None:
+            self.queries += 1
+            return self._pick(query, cached, min_similarity)
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning(f"Embedding queue full ({self.pending} pending), skipping semantic match")
+            return None
+
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[Optional[str]]" = loop.create_future()
+        self.pending += 1
+        self.queries += 1
+        started = time.perf_counter()
+        self._batch.append((query, min_similarity, future))
+        if len(self._batch) >= self.batch_size:
+            self._flush_batch()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush_batch)
+        try:
+            return await future
+        finally:
+            self.pending -= 1
+            self.latency.observe(time.perf_counter() - started)
+
+    def _flush_batch(self) -> None:
+        """Send the collected queries to the worker threads as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch = [item for item in self._batch[: self.batch_size] if not item[2].done()]
+        del self._batch[: self.batch_size]
+        loop = asyncio.get_running_loop()
+        if self._batch:
+            # A burst larger than one batch: start on the rest straight away.
+            self._flush_handle = loop.call_soon(self._flush_batch)
+        if not batch:
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="embedding"
+            )
+        self.batches += 1
+        self.batch_sizes.observe(len(batch))
+        matched = loop.run_in_executor(
+            self._executor, self.find_most_similar_batch, [query for query, _, _ in batch], 1
+        )
+
+        def deliver(matched: "asyncio.Future[List[List[Tuple[str, float]]]]") -> None:
+            if matched.cancelled() or matched.exception() is not None:
+                if not matched.cancelled():
+                    logger.error(f"Batched embedding lookup failed: {matched.exception()}")
+                results: List[List[Tuple[str, float]]] = [[] for _ in batch]
+            else:
+                results = matched.result()
+            for (query, min_similarity, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(self._pick(query, result, min_similarity))
+
+        matched.add_done_callback(deliver)
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot: Dict[str, Any] = {
+            "state": self.state,
+            "model": self.model_name,
+            "backend": self.active_backend or self.backend,
+            "min_similarity": self.min_similarity,
+            "responses": len(self.responses),
+            "queries": self.queries,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "batch_size_mean": self.batch_sizes.snapshot()["mean"],
+            "batch_size_max": self.batch_sizes.max,
+            "latency_p50": self.latency.percentile(50),
+            "latency_p95": self.latency.percentile(95),
+            "precision": self.precision,
+            "candidates": self.candidates,
+            "reranked": self.reranked,
+            "full_scans": self.full_scans,
+            "corpus_updates": self.corpus_updates,
+            "update_errors": self.update_errors,
+        }
+        snapshot.update({f"last_update_{name}": value for name, value in self.last_update.items()})
+        snapshot.update(self.query_cache.snapshot())
+        if self.response_embeddings is not None:
+            snapshot["matrix_mb"] = round(self.response_embeddings.nbytes / 1e6, 2)
+        if self.matrix_cache is not None:
+            snapshot.update(self.matrix_cache.snapshot())
+        snapshot.update({name: value for name, value in self.timings.items()})
+        if self.worker_address:
+            snapshot["worker"] = self.worker_address
+            if self._client is not None:
+                snapshot["worker_errors"] = self._client.errors
+                snapshot["worker_timeouts"] = self._client.timeouts
+            if self._supervisor is not None:
+                snapshot.update(self._supervisor.snapshot())
+        if self.error:
+            snapshot["error"] = self.error[:200]
+        return snapshot
+
 
 # Global instance for easy access
 _embedding_service = None
@@ -164,13 +1003,36 @@ def get_embedding_service() -> EmbeddingService:
     return _embedding_service
 
 
+def configure_embedding_service(settings: "Settings") -> EmbeddingService:
+    """Create the global embedding service from settings, without loading it."""
+    global _embedding_service
+    _embedding_service = EmbeddingService(
+        settings.embedding_model,
+        workers=settings.embedding_workers,
+        torch_threads=settings.embedding_torch_threads,
+        max_pending=settings.embedding_max_pending,
+        worker_address=settings.embedding_worker,
+        timeout=settings.embedding_timeout_seconds,
+        batch_size=settings.embedding_batch_size,
+        batch_window=settings.embedding_batch_window_ms / 1000.0,
+        cache_size=settings.embedding_cache_size,
+        cache_file=settings.embedding_cache_file,
+        matrix_cache_directory=settings.embedding_cache_directory,
+        backend=settings.embedding_backend,
+        min_similarity=settings.embedding_min_similarity,
+        candidates=settings.embedding_candidates,
+        precision=settings.embedding_precision,
+    )
+    return _embedding_service
+
+
 def initialize_embedding_service(responses: List[str]) -> None:
     """
-    Initialize the global embedding service with responses.
-    
+    Start loading the global embedding service in the background.
+
     Args:
         responses: List of response strings to match against
     """
     service = get_embedding_service()
-    service.load_responses(responses)
-    logger.info(f"Embedding service initialized with {len(responses)} responses")
+    if service.start_background_load(responses):
+        logger.info(f"Loading embedding service in the background for {len(responses)} responses")
@@ -0,0 +1,542 @@
+"""Embedding worker process and the bot-side client and supervisor.
+
+The worker owns the sentence-transformers model so torch's memory and CPU
+stay out of the bot process. Clients talk to it over
+``multiprocessing.connection`` on a Unix socket (or a named pipe on
+Windows); several bot processes on one host can point at the same address
+and share one worker, each registering its own response corpus.
+
+Messages are pickles, so both ends authenticate with a per-install secret:
+``LIZARD_EMBEDDING_AUTHKEY`` or, when that is unset, ``embedding_worker.key``
+next to ``config.ini``. The bot creates that file (mode 0600) the first time
+it starts a worker; neither side runs without one.
+
+Run it by hand with::
+
+    python -m lizard_bot.embedding_worker --create-key
+    python -m lizard_bot.embedding_worker --address "$XDG_RUNTIME_DIR/lizard-embeddings.sock"
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .embedding_service import EmbeddingService
+from .query_cache import corpus_key
+
+logger = logging.getLogger(__name__)
+
+AUTHKEY_FILE = Path(__file__).resolve().parent.parent / "embedding_worker.key"
+
+
+def _is_pipe(address: str) -> bool:
+    return address.startswith("\\\\")
+
+
+class WorkerError(Exception):
+    """The embedding worker could not be reached, timed out or refused a request."""
+
+
+class WorkerRefused(WorkerError):
+    """The worker answered with an error, e.g. because its model failed to load."""
+
+
+def _authkey() -> bytes:
+    """The shared secret; raises :class:`WorkerRefused` rather than fall back to a known key."""
+    secret = os.environ.get("LIZARD_EMBEDDING_AUTHKEY", "")
+    if secret:
+        return secret.encode()
+    try:
+        if os.name == "posix" and AUTHKEY_FILE.stat().st_mode & 0o077:
+            raise WorkerRefused(f"{AUTHKEY_FILE} is accessible to other users; chmod 600 it")
+        secret = AUTHKEY_FILE.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        pass
+    except OSError as error:
+        raise WorkerRefused(f"cannot read {AUTHKEY_FILE}: {error}") from error
+    if not secret:
+        raise WorkerRefused(
+            "no embedding worker key: set LIZARD_EMBEDDING_AUTHKEY or run "
+            "python -m lizard_bot.embedding_worker --create-key"
+        )
+    return secret.encode()
+
+
+def create_authkey() -> None:
+    """Write a random secret to :data:`AUTHKEY_FILE` (mode 0600) unless a key is already set."""
+    if os.environ.get("LIZARD_EMBEDDING_AUTHKEY"):
+        return
+    try:
+        fd = os.open(AUTHKEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        handle.write(secrets.token_hex(32) + "\n")
+    logger.info(f"Created embedding worker key {AUTHKEY_FILE}")
+
+
+class EmbeddingWorker:
+    """Serves one loaded model to any number of clients and corpora.
+
+    A new corpus is built from the most recently used one, so registering
+    an edited response list only encodes the lines that changed. The
+    ``max_corpora`` most recently used corpora are kept; a client querying
+    an evicted one registers it again.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        torch_threads: int = 2,
+        idle_seconds: float = 600.0,
+        cache_directory: Optional[Path] = None,
+        max_corpora: int = 8,
+        precision: str = "float32",
+        backend: str = "auto",
+        candidates: int = 0,
+    ) -> None:
+        self.model_name = model_name
+        self.idle_seconds = idle_seconds
+        self.cache_directory = cache_directory
+        self.precision = precision
+        self.candidates = candidates
+        self.max_corpora = max(1, max_corpora)
+        self.base = EmbeddingService(model_name, torch_threads=torch_threads, backend=backend)
+        self.corpora: "OrderedDict[str, EmbeddingService]" = OrderedDict()
+        self.clients = 0
+        self.requests = 0
+        self.loaded = threading.Event()
+        self._lock = threading.Lock()
+        self._last_client = time.monotonic()
+
+    def load(self) -> None:
+        self.base.load_now()
+        self.loaded.set()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "model": self.base.model_name,
+            "backend": self.base.active_backend,
+            "precision": self.precision,
+            "candidates": self.candidates,
+            "state": self.base.state,
+            "error": self.base.error,
+            "timings": dict(self.base.timings),
+            "corpora": len(self.corpora),
+            "clients": self.clients,
+            "requests": self.requests,
+        }
+
+    def register(self, responses: List[str], key: str) -> Dict[str, Any]:
+        self.loaded.wait()
+        if self.base.state != "ready":
+            raise WorkerError(f"model {self.base.state}: {self.base.error}")
+        with self._lock:
+            corpus = self.corpora.get(key)
+            if corpus is None:
+                corpus = EmbeddingService(
+                    self.base.model_name,
+                    matrix_cache_directory=self.cache_directory,
+                    precision=self.precision,
+                    candidates=self.candidates,
+                )
+                if self.corpora:
+                    latest = next(reversed(self.corpora.values()))
+                    try:
+                        corpus.load_from(latest, responses)
+                    except Exception as e:
+                        raise WorkerError(f"could not encode responses: {e}") from e
+                elif not corpus.load_now(responses, model=self.base.model):
+                    raise WorkerError(f"could not encode responses: {corpus.error}")
+                self.corpora[key] = corpus
+                while len(self.corpora) > self.max_corpora:
+                    evicted, _ = self.corpora.popitem(last=False)
+                    logger.info(f"Dropped corpus {evicted}")
+                logger.info(f"Registered corpus {key} with {len(responses)} responses")
+            self.corpora.move_to_end(key)
+        return dict(self.info(), corpus=key)
+
+    def query(
+        self, key: str, queries: List[str], top_k: int
+    ) -> Optional[List[List[Tuple[str, float]]]]:
+        # No lock: register() holds it while encoding, which can take a while.
+        corpus = self.corpora.get(key)
+        if corpus is None:
+            return None
+        try:
+            self.corpora.move_to_end(key)
+        except KeyError:
+            # Evicted meanwhile; this answer is still good.
+            pass
+        return corpus.find_most_similar_batch(queries, top_k)
+
+    def _handle(self, message: Tuple[Any, ...]) -> Tuple[str, Any]:
+        op = message[0]
+        if op == "hello":
+            return "ok", self.info()
+        if op == "register":
+            _, key, responses = message
+            return "ok", self.register(responses, key)
+        if op == "query":
+            _, key, queries, top_k = message
+            results = self.query(key, queries, top_k)
+            return ("ok", results) if results is not None else ("missing", key)
+        return "error", f"unknown request {op!r}"
+
+    def _serve_client(self, connection: Connection) -> None:
+        with self._lock:
+            self.clients += 1
+        try:
+            while True:
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    return
+                self.requests += 1
+                try:
+                    reply = self._handle(message)
+                except WorkerError as error:
+                    reply = ("error", str(error))
+                except Exception as error:
+                    logger.exception("Embedding request failed")
+                    reply = ("error", f"{type(error).__name__}: {error}")
+                connection.send(reply)
+        finally:
+            connection.close()
+            with self._lock:
+                self.clients -= 1
+                self._last_client = time.monotonic()
+
+    def _exit_when_idle(self, address: str) -> None:
+        while True:
+            time.sleep(min(30.0, self.idle_seconds))
+            with self._lock:
+                idle = self.clients == 0 and time.monotonic() - self._last_client >= self.idle_seconds
+            if idle:
+                logger.info(f"No clients for {self.idle_seconds:.0f}s, embedding worker exiting")
+                if not _is_pipe(address):
+                    Path(address).unlink(missing_ok=True)
+                os._exit(0)
+
+    def serve(self, address: str) -> None:
+        listener = _listen(address)
+        if listener is None:
+            return
+        logger.info(f"Embedding worker {os.getpid()} listening on {address}")
+        threading.Thread(target=self.load, name="embedding-loader", daemon=True).start()
+        if self.idle_seconds > 0:
+            threading.Thread(
+                target=self._exit_when_idle, args=(address,), name="embedding-idle", daemon=True
+            ).start()
+        while True:
+            try:
+                connection = listener.accept()
+            except (OSError, EOFError, AuthenticationError) as error:
+                # A client that failed the auth handshake or hung up mid-way.
+                logger.warning(f"Rejected embedding client: {error}")
+                continue
+            threading.Thread(
+                target=self._serve_client, args=(connection,), name="embedding-client", daemon=True
+            ).start()
+
+
+def _listen(address: str) -> Optional[Listener]:
+    """Bind ``address``, replacing a stale socket file; None if a live worker holds it."""
+    if not _is_pipe(address) and os.path.exists(address):
+        try:
+            Client(address, authkey=_authkey()).close()
+        except AuthenticationError:
+            logger.error(f"{address} is held by a process that does not know the worker key")
+            return None
+        except OSError:
+            os.unlink(address)
+        else:
+            logger.info(f"Another embedding worker already serves {address}")
+            return None
+    return Listener(address, authkey=_authkey())
+
+
+class WorkerClient:
+    """Blocking client for an :class:`EmbeddingWorker`, one connection per thread.
+
+    Every request waits at most ``timeout`` seconds; a connection that timed
+    out or failed is dropped (a late reply would answer the wrong request)
+    and the next request reconnects.
+    """
+
+    def __init__(self, address: str, timeout: float = 2.0) -> None:
+        self.address = address
+        self.timeout = timeout
+        self.errors = 0
+        self.timeouts = 0
+        self.key: Optional[str] = None
+        self._responses: List[str] = []
+        self._local = threading.local()
+
+    def _connection(self) -> Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = Client(self.address, authkey=_authkey())
+            self._local.connection = connection
+        return connection
+
+    def _drop(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            connection.close()
+
+    def request(self, message: Tuple[Any, ...], timeout: Optional[float] = None) -> Tuple[str, Any]:
+        try:
+            connection = self._connection()
+            connection.send(message)
+            if not connection.poll(self.timeout if timeout is None else timeout):
+                self.timeouts += 1
+                self._drop()
+                raise WorkerError(f"no reply within {self.timeout if timeout is None else timeout}s")
+            status, payload = connection.recv()
+        except (OSError, EOFError, AuthenticationError) as error:
+            self.errors += 1
+            self._drop()
+            raise WorkerError(f"{type(error).__name__}: {error}") from error
+        if status == "error":
+            self.errors += 1
+            raise WorkerRefused(payload)
+        return status, payload
+
+    def hello(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.request(("hello",), timeout)[1]
+
+    def register(self, responses: List[str], wait: float = 300.0) -> Dict[str, Any]:
+        """Send the corpus, waiting up to ``wait`` seconds for the worker to start and encode it."""
+        self._responses = list(responses)
+        key = corpus_key(self._responses)
+        deadline = time.monotonic() + wait
+        while True:
+            try:
+                _, info = self.request(
+                    ("register", key, self._responses), max(0.1, deadline - time.monotonic())
+                )
+                break
+            except WorkerRefused:
+                raise
+            except WorkerError:
+                if time.monotonic() >= deadline:
+                    raise
+                # Worker not up yet (or restarting); the supervisor is on it.
+                time.sleep(0.5)
+        self.key = key
+        return info
+
+    def query(self, queries: List[str], top_k: int = 1) -> List[List[Tuple[str, float]]]:
+        """Top-k matches for each query, encoded by the worker as one batch."""
+        if self.key is None:
+            raise WorkerError("responses not registered")
+        status, payload = self.request(("query", self.key, queries, top_k))
+        if status == "missing":
+            # A restarted worker has forgotten the corpus; send it again once.
+            self.request(("register", self.key, self._responses), self.timeout * 10)
+            status, payload = self.request(("query", self.key, queries, top_k))
+        return payload
+
+
+class WorkerSupervisor:
+    """Keeps a worker answering at ``address``, starting one when nobody does.
+
+    If the worker this process started exits, it is restarted with
+    exponential backoff. A worker started by another bot process is used as
+    is; if it goes away, this supervisor starts a replacement.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        model_name: str,
+        torch_threads: int = 2,
+        check_seconds: float = 5.0,
+        max_backoff_seconds: float = 60.0,
+        cache_directory: Optional[Path] = None,
+        precision: str = "float32",
+        backend: str = "auto",
+        candidates: int = 0,
+    ) -> None:
+        self.address = address
+        self.model_name = model_name
+        self.torch_threads = torch_threads
+        self.cache_directory = cache_directory
+        self.precision = precision
+        self.backend = backend
+        self.candidates = candidates
+        self.check_seconds = check_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.process: Optional[subprocess.Popen] = None
+        self.starts = 0
+        self.crashes = 0
+        self.worker_pid: Optional[int] = None
+        self._stopped = False
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="embedding-supervisor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+
+    def check_now(self) -> None:
+        """Run a health check right away, e.g. after a query failed."""
+        self._wake.set()
+
+    def _reachable(self) -> bool:
+        probe = WorkerClient(self.address, timeout=2.0)
+        try:
+            self.worker_pid = probe.hello().get("pid")
+        except WorkerError:
+            return False
+        finally:
+            probe._drop()
+        return True
+
+    def _spawn(self) -> None:
+        command = [
+            sys.executable,
+            "-m",
+            "lizard_bot.embedding_worker",
+            "--address",
+            self.address,
+            "--model",
+            self.model_name,
+            "--torch-threads",
+            str(self.torch_threads),
+            "--precision",
+            self.precision,
+            "--backend",
+            self.backend,
+            "--candidates",
+            str(self.candidates),
+        ]
+        if self.cache_directory is not None:
+            command += ["--cache-directory", str(self.cache_directory)]
+        # Own session, so the worker outlives this bot for others sharing it.
+        self.process = subprocess.Popen(
+            command,
+            cwd=Path(__file__).resolve().parent.parent,
+            start_new_session=os.name == "posix",
+        )
+        self.starts += 1
+        logger.info(f"Started embedding worker pid {self.process.pid} on {self.address}")
+
+    def _run(self) -> None:
+        backoff = 1.0
+        next_start = 0.0
+        while not self._stopped:
+            if self.process is not None and self.process.poll() is not None:
+                code = self.process.returncode
+                self.process = None
+                if code != 0:
+                    self.crashes += 1
+                    logger.warning(f"Embedding worker exited with code {code}")
+            reachable = self._reachable()
+            if reachable:
+                backoff = 1.0
+            elif self.process is None and time.monotonic() >= next_start:
+                self._spawn()
+                next_start = time.monotonic() + backoff
+                backoff = min(self.max_backoff_seconds, backoff * 2)
+            # Poll quickly while a worker is starting, then settle into health checks.
+            self._wake.wait(self.check_seconds if reachable else 0.5)
+            self._wake.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "worker_pid": self.worker_pid or "-",
+            "worker_starts": self.starts,
+            "worker_crashes": self.crashes,
+        }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve sentence embeddings to Lizard bots.")
+    parser.add_argument("--address", help="Unix socket path or \\\\.\\pipe\\name")
+    parser.add_argument(
+        "--create-key",
+        action="store_true",
+        help=f"write a random key to {AUTHKEY_FILE.name} if there is none, then exit",
+    )
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--torch-threads", type=int, default=2)
+    parser.add_argument(
+        "--idle-seconds",
+        type=float,
+        default=600.0,
+        help="exit after this long without clients (0 keeps running)",
+    )
+    parser.add_argument(
+        "--cache-directory",
+        type=Path,
+        help="keep encoded response matrices here across restarts",
+    )
+    parser.add_argument(
+        "--precision",
+        choices=("float32", "float16", "int8"),
+        default="float32",
+        help="storage for encoded response matrices",
+    )
+    parser.add_argument("--backend", choices=("auto", "transformer", "ngram"), default="auto")
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        default=0,
+        help="responses the BM25 first stage passes on for embedding scoring (0 scores all)",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if args.create_key:
+        create_authkey()
+        return
+    if not args.address:
+        parser.error("--address is required")
+    try:
+        _authkey()
+    except WorkerRefused as error:
+        parser.error(str(error))
+    EmbeddingWorker(
+        args.model,
+        args.torch_threads,
+        args.idle_seconds,
+        args.cache_directory,
+        precision=args.precision,
+        backend=args.backend,
+        candidates=args.candidates,
+    ).serve(args.address)
+
+
+__all__ = [
+    "EmbeddingWorker",
+    "WorkerClient",
+    "WorkerError",
+    "WorkerRefused",
+    "WorkerSupervisor",
+    "corpus_key",
+    "create_authkey",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,11 @@ from typing import Callable
 import discord
 from discord.ext import commands
 
+from .leader import NotLeaderError
 from .state import BotState
 from .settings import Settings, logger
 from .text_cache import TextCache
-from .storage.base import BaseGuildConfigStore
+from .storage.base import BaseGuildConfigStore, StaleFencingTokenError
 from .embedding_service import get_embedding_service, initialize_embedding_service
 
 
@@ -39,6 +40,10 @@ def register_events(
         start_timer()
         print("Lizard timer started (per-guild)")
 
+        # Import torch and load the model only now, off the event loop; mentions
+        # get random responses until it is ready.
+        initialize_embedding_service(text_cache.get_lines("responses") or [])
+
         configs = config_store.load_all()
         if configs:
             print(f"Configured guilds: {len(configs)}")
@@ -108,18 +113,15 @@ def register_events(
                         # Try to find a semantically similar response using embeddings
                         try:
                             embedding_service = get_embedding_service()
-                            
-                            # Initialize the service with responses if not already done
-                            if embedding_service.response_embeddings is None:
-                                initialize_embedding_service(lines)
-                            
+
                             # Extract the query text (remove the mention)
                             query = message.content.replace(f"<@{bot.user.id}>", "").strip()
                             if not query:
                                 query = message.content.replace(f"<@!{bot.user.id}>", "").strip()
                             
-                            # Find the best matching response
-                            best_response = embedding_service.get_best_response(query, min_similarity=0.3)
+                            # Find the best matching response (None until the model is loaded,
+                            # or while too many mentions are already being encoded)
+                            best_response = await embedding_service.best_response(query)
                             
                             if best_response:
                                 response = best_response
@@ -165,6 +167,13 @@ def register_events(
             )
             return
 
+        # The process holding the timer lease answers these commands.
+        cause = getattr(error, "original", error)
+        if isinstance(cause, (NotLeaderError, StaleFencingTokenError)):
+            command_name = ctx.command.qualified_name if ctx.command else "unknown"
+            logger.info("Left %s to the leader: %s", command_name, cause)
+            return
+
         logger.error("Command error: %s", error)
         raise error
 
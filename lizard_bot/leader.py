@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+import socket
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from discord.ext import commands, tasks
+
+from .settings import logger
+from .storage.base import TIMER_LEASE, BaseGuildConfigStore
+
+
+class NotLeaderError(commands.CheckFailure):
+    """Raised when a command would change timer-owned state on a standby process."""
+
+
+class LeaderLease:
+    """Database-backed lease deciding which process runs scheduled visits.
+
+    The holder renews the lease every ``renew_seconds``. If it stops renewing,
+    a standby claims the lease once ``lease_seconds`` have passed and receives
+    a higher fencing token, which makes any late writes from the old leader
+    fail with ``StaleFencingTokenError``.
+    """
+
+    def __init__(
+        self,
+        config_store: BaseGuildConfigStore,
+        lease_seconds: float = 15.0,
+        renew_seconds: float = 5.0,
+        holder: Optional[str] = None,
+        on_promoted: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self.config_store = config_store
+        self.lease_seconds = lease_seconds
+        self.renew_seconds = renew_seconds
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.on_promoted = on_promoted
+        self.token: Optional[int] = None
+        self.promotions = 0
+        self._valid_until = 0.0
+        self._heartbeat = tasks.loop(seconds=renew_seconds)(self._renew)
+
+    @property
+    def is_leader(self) -> bool:
+        # Stop acting on our own before the lease could have expired in the
+        # database, even if a renewal is stuck.
+        return self.token is not None and time.monotonic() < self._valid_until
+
+    def heartbeat(self) -> bool:
+        """Try to take or renew the lease once; returns whether we lead afterwards."""
+        started = time.monotonic()
+        try:
+            token = self.config_store.acquire_lease(TIMER_LEASE, self.holder, self.lease_seconds)
+        except Exception as error:  # pragma: no cover - logging branch
+            logger.error("Leader lease renewal failed: %s", error)
+            return self.is_leader
+
+        if token is None:
+            if self.token is not None:
+                logger.warning("Leader lease lost by %s", self.holder)
+            self.token = None
+            return False
+
+        promoted = token != self.token
+        self.token = token
+        self._valid_until = started + self.lease_seconds
+        if promoted:
+            self.promotions += 1
+            logger.info("Acquired leader lease as %s (token %d)", self.holder, token)
+            if self.on_promoted is not None:
+                self.on_promoted(token)
+        return True
+
+    def demote(self) -> None:
+        """Forget the lease after a fenced write was rejected."""
+        if self.token is not None:
+            logger.warning("Stepping down as leader (token %d is stale)", self.token)
+        self.token = None
+
+    async def _renew(self) -> None:
+        self.heartbeat()
+
+    def start(self) -> None:
+        if not self._heartbeat.is_running():
+            self._heartbeat.start()
+
+    def release(self) -> None:
+        if self._heartbeat.is_running():
+            self._heartbeat.cancel()
+        if self.token is not None:
+            self.config_store.release_lease(TIMER_LEASE, self.holder)
+            self.token = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "holder": self.holder,
+            "is_leader": self.is_leader,
+            "token": self.token,
+            "promotions": self.promotions,
+            "lease_seconds": self.lease_seconds,
+            "renew_seconds": self.renew_seconds,
+        }
+
+
+__all__ = ["LeaderLease", "NotLeaderError"]
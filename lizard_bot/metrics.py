@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import math
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Tuple
+
+
+class Histogram:
+    """Lifetime count/mean/max plus percentiles over a window of recent samples."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        rank = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+@dataclass(frozen=True)
+class SloPolicy:
+    """Scheduler objectives; a breach is logged at most once per ``check_interval_seconds``."""
+
+    lateness_seconds: float = 60.0
+    tick_seconds: float = 10.0
+    percentile: float = 95.0
+    check_interval_seconds: float = 300.0
+
+
+@dataclass
+class TimerStats:
+    """Counters describing how a ``lizard_timer`` partition is keeping up."""
+
+    ticks: int = 0
+    skipped_ticks: int = 0
+    standby_ticks: int = 0
+    overrun_intervals: int = 0
+    visits: int = 0
+    guilds_examined: int = 0
+    last_tick_seconds: float = 0.0
+    max_tick_seconds: float = 0.0
+    lateness_seconds: Histogram = field(default_factory=Histogram)
+    tick_seconds: Histogram = field(default_factory=Histogram)
+    voice_seconds: Histogram = field(default_factory=Histogram)
+    guilds_per_tick: Histogram = field(default_factory=Histogram)
+    visits_per_tick: Histogram = field(default_factory=Histogram)
+    _offenders: Dict[str, float] = field(default_factory=dict, repr=False)
+
+    def record_tick(
+        self,
+        duration: float,
+        guilds_examined: int,
+        visits: int,
+        interval: float = 0.0,
+        voice_seconds: float = 0.0,
+    ) -> None:
+        """Record one tick: ``duration`` of its scheduling pass, ``voice_seconds`` of due visits."""
+        self.ticks += 1
+        self.visits += visits
+        self.guilds_examined = guilds_examined
+        self.last_tick_seconds = duration
+        self.max_tick_seconds = max(self.max_tick_seconds, duration)
+        self.tick_seconds.observe(duration)
+        self.guilds_per_tick.observe(guilds_examined)
+        self.visits_per_tick.observe(visits)
+        if visits:
+            self.voice_seconds.observe(voice_seconds)
+        elapsed = duration + voice_seconds
+        if interval > 0 and elapsed > interval:
+            # tasks.Loop runs the missed iterations back to back, so every whole
+            # interval spent inside this tick is a check that did not happen on time.
+            self.overrun_intervals += int(elapsed // interval)
+
+    def record_lateness(self, guild_name: str, seconds: float) -> None:
+        self.lateness_seconds.observe(seconds)
+        if seconds > self._offenders.get(guild_name, float("-inf")):
+            self._offenders[guild_name] = seconds
+
+    def top_offenders(self, limit: int = 5) -> List[Tuple[str, float]]:
+        ranked = sorted(self._offenders.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+    def slo_breaches(self, policy: SloPolicy) -> List[str]:
+        breaches = []
+        lateness = self.lateness_seconds.percentile(policy.percentile)
+        if lateness > policy.lateness_seconds:
+            breaches.append(
+                f"visit lateness p{policy.percentile:g} {lateness:.1f}s > {policy.lateness_seconds:g}s"
+            )
+        tick = self.tick_seconds.percentile(policy.percentile)
+        if tick > policy.tick_seconds:
+            breaches.append(
+                f"tick duration p{policy.percentile:g} {tick:.1f}s > {policy.tick_seconds:g}s"
+            )
+        return breaches
+
+    def reset_offenders(self) -> None:
+        self._offenders.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ticks": self.ticks,
+            "skipped_ticks": self.skipped_ticks,
+            "standby_ticks": self.standby_ticks,
+            "overrun_intervals": self.overrun_intervals,
+            "visits": self.visits,
+            "guilds_examined": self.guilds_examined,
+            "last_tick_seconds": self.last_tick_seconds,
+            "max_tick_seconds": self.max_tick_seconds,
+            "lateness_seconds": self.lateness_seconds.snapshot(),
+            "tick_seconds": self.tick_seconds.snapshot(),
+            "voice_seconds": self.voice_seconds.snapshot(),
+            "guilds_per_tick": self.guilds_per_tick.snapshot(),
+            "visits_per_tick": self.visits_per_tick.snapshot(),
+        }
+
+
+@dataclass
+class VoiceStats:
+    """Outcome counters for voice sessions, with timeouts broken down by step."""
+
+    sessions: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    timeouts: Counter = field(default_factory=Counter)
+    session_seconds: Histogram = field(default_factory=Histogram)
+    ready_seconds: Histogram = field(default_factory=Histogram)
+
+    def record_timeout(self, reason: str) -> None:
+        self.timeouts[reason] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "sessions": self.sessions,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "timeouts": dict(self.timeouts.most_common()),
+            "session_seconds": self.session_seconds.snapshot(),
+            "ready_seconds": self.ready_seconds.snapshot(),
+        }
+
+
+__all__ = ["Histogram", "SloPolicy", "TimerStats", "VoiceStats"]
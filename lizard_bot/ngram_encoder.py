@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+class HashedNgramEncoder:
+    """Sentence vectors from hashed character n-grams, in pure NumPy.
+
+    Each text is case-folded and reduced to its words; every character
+    n-gram of the space-padded words (``ngram_range``, 3-5 by default) and
+    every whole word is hashed into one of ``dimensions`` buckets with a
+    random sign. Counts are damped with ``log1p`` and rows are L2-normalised,
+    so a dot product is the cosine similarity, as with the transformer.
+
+    It has no state to fit: the same text always gets the same vector, in
+    any process, so encoded matrices can be cached and updated row by row.
+    It matches on shared spelling, not meaning ("sun" finds "sunny", not
+    "warm"), and starts instantly in a few MB.
+    """
+
+    backend = "ngram"
+
+    def __init__(self, dimensions: int = 4096, ngram_range: Tuple[int, int] = (3, 5)) -> None:
+        self.dimensions = dimensions
+        self.ngram_range = ngram_range
+        self.name = f"hashed-ngrams-{dimensions}-{ngram_range[0]}{ngram_range[1]}"
+
+    def features(self, text: str) -> List[str]:
+        words = _WORD.findall(text.casefold())
+        if not words:
+            return []
+        padded = f" {' '.join(words)} "
+        low, high = self.ngram_range
+        grams = [
+            padded[start : start + size]
+            for size in range(low, high + 1)
+            for start in range(len(padded) - size + 1)
+        ]
+        return grams + [f"w:{word}" for word in words]
+
+    def encode(self, texts: Sequence[str], **_: Any) -> "np.ndarray":
+        """Encode ``texts`` into a (len(texts), dimensions) float32 matrix."""
+        rows: List[int] = []
+        columns: List[int] = []
+        signs: List[float] = []
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                digest = zlib.crc32(feature.encode())
+                rows.append(row)
+                columns.append(digest % self.dimensions)
+                signs.append(1.0 if digest & 0x80000000 else -1.0)
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (rows, columns), signs)
+        np.copysign(np.log1p(np.abs(matrix)), matrix, out=matrix)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+__all__ = ["HashedNgramEncoder"]
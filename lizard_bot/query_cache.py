@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .settings import logger
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def corpus_key(responses: Sequence[str]) -> str:
+    """Short content hash of a response list; changes whenever any line does."""
+    digest = hashlib.sha256()
+    for response in responses:
+        digest.update(response.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def normalise_query(query: str) -> str:
+    """Case-fold, drop punctuation and collapse whitespace: "Hi, lizard!" -> "hi lizard"."""
+    return " ".join(_PUNCTUATION.sub(" ", query.casefold()).split())
+
+
+class QueryCache:
+    """Bounded LRU of normalised query -> (best response index, similarity).
+
+    Entries are keyed by corpus version as well as query text, so an answer
+    computed against one response list (or model, precision or BM25 stage)
+    is never served for another. With a ``path`` the cache is loaded at start-up and written back
+    atomically at most every ``save_interval`` seconds once it has changed.
+    Methods may be called from the event loop and the encode threads.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        path: Optional[Path] = None,
+        save_interval: float = 60.0,
+    ) -> None:
+        self.capacity = max(0, capacity)
+        self.path = path
+        self.save_interval = save_interval
+        self.hits = 0
+        self.misses = 0
+        self.save_errors = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        if path is not None and self.capacity:
+            self.load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def get(self, version: str, query: str) -> Optional[Tuple[int, float]]:
+        if not self.enabled:
+            return None
+        key = (version, normalise_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, version: str, query: str, index: int, similarity: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (version, normalise_query(query))
+            self._entries[key] = (index, similarity)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def maybe_save(self) -> None:
+        """Write the cache out if it changed and ``save_interval`` has passed."""
+        if self.path is None or not self._dirty:
+            return
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                entries = json.load(handle)["entries"]
+            with self._lock:
+                for version, query, index, similarity in entries[-self.capacity :]:
+                    self._entries[(version, query)] = (int(index), float(similarity))
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logger.warning("Ignoring unreadable query cache %s: %s", self.path, error)
+            return
+        logger.info("Loaded %d cached queries from %s", len(self._entries), self.path)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            entries = [
+                [version, query, index, similarity]
+                for (version, query), (index, similarity) in self._entries.items()
+            ]
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(
+                dir=self.path.parent, prefix=self.path.name, suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump({"entries": entries}, handle, separators=(",", ":"))
+                os.replace(temp_name, self.path)
+            except BaseException:
+                try:
+                    os.unlink(temp_name)
+                except OSError:
+                    pass
+                raise
+        except OSError as error:
+            self.save_errors += 1
+            self._dirty = True
+            logger.warning("Could not save query cache to %s: %s", self.path, error)
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cache_size": len(self._entries),
+            "cache_capacity": self.capacity,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+__all__ = ["QueryCache", "corpus_key", "normalise_query"]
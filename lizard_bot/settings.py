@@ -26,12 +26,17 @@ class Settings:
     token: str | None
     command_prefix: str
     activity_name: str
+    sharded: bool
+    shard_count: int | None
     readme_url: str
     kofi_url: str
     config_file: Path
     database_file: Path
     audio_file: Path
     ffmpeg_path: Path
+    opus_cache_directory: Path
+    embedding_cache_directory: Path | None
+    clips_directory: Path
     dice_gif: Path
     frames_directory: Path
     messages: Dict[str, str]
@@ -40,13 +45,45 @@ class Settings:
     dice_roll_success_threshold: int
     dice_roll_failure_threshold: int
     immunity_duration_minutes: int
-    pending_kidnap_delay_seconds: int
+    kidnap_move_concurrency: int
     connection_timeout: float
     playback_delay_seconds: float
     disconnect_delay_seconds: float
+    voice_operation_timeout: float
+    voice_playback_timeout: float
+    voice_session_timeout: float
+    voice_breaker_threshold: int
+    voice_breaker_backoff_seconds: float
+    voice_breaker_max_backoff_seconds: float
+    clip_memory_kb: int
     lizard_reaction_probability: float
     timer_min_minutes: int
     timer_max_minutes: int
+    timer_check_interval_seconds: float
+    timer_slo_lateness_seconds: float
+    timer_slo_tick_seconds: float
+    timer_slo_percentile: float
+    timer_slo_check_interval_seconds: float
+    leader_election_enabled: bool
+    leader_lease_seconds: float
+    leader_renew_seconds: float
+    trace_file: Path | None
+    trace_max_kb: int
+    trace_backups: int
+    embedding_model: str
+    embedding_workers: int
+    embedding_torch_threads: int
+    embedding_max_pending: int
+    embedding_worker: str
+    embedding_timeout_seconds: float
+    embedding_batch_size: int
+    embedding_batch_window_ms: float
+    embedding_cache_size: int
+    embedding_cache_file: Path | None
+    embedding_backend: str
+    embedding_min_similarity: float | None
+    embedding_candidates: int
+    embedding_precision: str
 
 
 def load_settings() -> Settings:
@@ -57,6 +94,8 @@ def load_settings() -> Settings:
     token = os.getenv("DISCORD_BOT_TOKEN")
     command_prefix = config_manager.get("bot", "command_prefix", "*")
     activity_name = config_manager.get("bot", "activity_name", "Lizard")
+    sharded = config_manager.get_boolean("bot", "sharded", False)
+    shard_count = config_manager.get_int("bot", "shard_count", 0) or None
 
     readme_url = config_manager.get(
         "urls", "readme_url", "https://github.com/yourname/Lizard#readme"
@@ -67,6 +106,14 @@ def load_settings() -> Settings:
     database_file = project_root / "guild_data.sqlite3"
     audio_file = project_root / config_manager.get("files", "audio_file", "lizzard-1.mp3")
     ffmpeg_path = project_root / config_manager.get("files", "ffmpeg_path", "ffmpeg.exe")
+    opus_cache_directory = project_root / config_manager.get(
+        "files", "opus_cache_directory", "opus_cache"
+    )
+    matrix_cache_name = config_manager.get(
+        "files", "embedding_cache_directory", "embedding_cache"
+    )
+    embedding_cache_directory = project_root / matrix_cache_name if matrix_cache_name else None
+    clips_directory = project_root / config_manager.get("files", "clips_directory", "clips")
     dice_gif = project_root / config_manager.get("files", "dice_gif", "Diceroll.gif")
     frames_directory = project_root / config_manager.get("files", "frames_directory", "Frames")
 
@@ -78,11 +125,22 @@ def load_settings() -> Settings:
     dice_roll_success_threshold = config_manager.get_int("kidnap", "dice_roll_success_threshold", 14)
     dice_roll_failure_threshold = config_manager.get_int("kidnap", "dice_roll_failure_threshold", 7)
     immunity_duration_minutes = config_manager.get_int("kidnap", "immunity_duration_minutes", 30)
-    pending_kidnap_delay_seconds = config_manager.get_int("kidnap", "pending_kidnap_delay_seconds", 2)
+    kidnap_move_concurrency = config_manager.get_int("kidnap", "move_concurrency", 5)
 
     connection_timeout = config_manager.get_float("voice", "connection_timeout", 30.0)
-    playback_delay_seconds = config_manager.get_float("voice", "playback_delay_seconds", 1.0)
+    playback_delay_seconds = config_manager.get_float("voice", "playback_delay_seconds", 0.0)
     disconnect_delay_seconds = config_manager.get_float("voice", "disconnect_delay_seconds", 1.0)
+    voice_operation_timeout = config_manager.get_float("voice", "operation_timeout", 10.0)
+    voice_playback_timeout = config_manager.get_float("voice", "playback_timeout", 30.0)
+    voice_session_timeout = config_manager.get_float("voice", "session_timeout", 90.0)
+    voice_breaker_threshold = config_manager.get_int("voice", "breaker_threshold", 3)
+    voice_breaker_backoff_seconds = config_manager.get_float(
+        "voice", "breaker_backoff_seconds", 60.0
+    )
+    voice_breaker_max_backoff_seconds = config_manager.get_float(
+        "voice", "breaker_max_backoff_seconds", 3600.0
+    )
+    clip_memory_kb = config_manager.get_int("voice", "clip_memory_kb", 4096)
 
     lizard_reaction_probability = config_manager.get_float(
         "reactions", "lizard_reaction_probability", 0.03
@@ -90,17 +148,58 @@ def load_settings() -> Settings:
 
     timer_min_minutes = config_manager.get_int("timer", "min_visit_delay", 2)
     timer_max_minutes = config_manager.get_int("timer", "max_visit_delay", 30)
+    timer_check_interval_seconds = config_manager.get_float("timer", "timer_check_interval", 10.0)
+    timer_slo_lateness_seconds = config_manager.get_float("timer", "slo_lateness_seconds", 60.0)
+    timer_slo_tick_seconds = config_manager.get_float("timer", "slo_tick_seconds", 10.0)
+    timer_slo_percentile = config_manager.get_float("timer", "slo_percentile", 95.0)
+    timer_slo_check_interval_seconds = config_manager.get_float(
+        "timer", "slo_check_interval", 300.0
+    )
+
+    leader_election_enabled = config_manager.get_boolean("leader", "enabled", False)
+    leader_lease_seconds = config_manager.get_float("leader", "lease_seconds", 15.0)
+    leader_renew_seconds = config_manager.get_float("leader", "renew_seconds", 5.0)
+
+    trace_file_name = config_manager.get("tracing", "file", "logs/voice_traces.jsonl")
+    trace_file = project_root / trace_file_name if trace_file_name else None
+    trace_max_kb = config_manager.get_int("tracing", "max_kb", 1024)
+    trace_backups = config_manager.get_int("tracing", "backups", 3)
+
+    embedding_model = config_manager.get("embeddings", "model", "all-MiniLM-L6-v2")
+    embedding_workers = config_manager.get_int("embeddings", "workers", 1)
+    embedding_torch_threads = config_manager.get_int("embeddings", "torch_threads", 2)
+    embedding_max_pending = config_manager.get_int("embeddings", "max_pending", 16)
+    embedding_worker = config_manager.get("embeddings", "worker", "")
+    embedding_timeout_seconds = config_manager.get_float("embeddings", "timeout_seconds", 2.0)
+    embedding_batch_size = config_manager.get_int("embeddings", "batch_size", 16)
+    embedding_batch_window_ms = config_manager.get_float("embeddings", "batch_window_ms", 5.0)
+    embedding_cache_size = config_manager.get_int("embeddings", "cache_size", 1024)
+    embedding_cache_name = config_manager.get("embeddings", "cache_file", "")
+    embedding_cache_file = project_root / embedding_cache_name if embedding_cache_name else None
+    embedding_backend = config_manager.get("embeddings", "backend", "auto")
+    embedding_min_similarity = (
+        config_manager.get_float("embeddings", "min_similarity")
+        if config_manager.get("embeddings", "min_similarity", "").strip()
+        else None
+    )
+    embedding_candidates = config_manager.get_int("embeddings", "candidates", 0)
+    embedding_precision = config_manager.get("embeddings", "precision", "float32")
 
     return Settings(
         token=token,
         command_prefix=command_prefix,
         activity_name=activity_name,
+        sharded=sharded,
+        shard_count=shard_count,
         readme_url=readme_url,
         kofi_url=kofi_url,
         config_file=config_file,
         database_file=database_file,
         audio_file=audio_file,
         ffmpeg_path=ffmpeg_path,
+        opus_cache_directory=opus_cache_directory,
+        embedding_cache_directory=embedding_cache_directory,
+        clips_directory=clips_directory,
         dice_gif=dice_gif,
         frames_directory=frames_directory,
         messages=messages,
@@ -109,13 +208,45 @@ def load_settings() -> Settings:
         dice_roll_success_threshold=dice_roll_success_threshold,
         dice_roll_failure_threshold=dice_roll_failure_threshold,
         immunity_duration_minutes=immunity_duration_minutes,
-        pending_kidnap_delay_seconds=pending_kidnap_delay_seconds,
+        kidnap_move_concurrency=kidnap_move_concurrency,
         connection_timeout=connection_timeout,
         playback_delay_seconds=playback_delay_seconds,
         disconnect_delay_seconds=disconnect_delay_seconds,
+        voice_operation_timeout=voice_operation_timeout,
+        voice_playback_timeout=voice_playback_timeout,
+        voice_session_timeout=voice_session_timeout,
+        voice_breaker_threshold=voice_breaker_threshold,
+        voice_breaker_backoff_seconds=voice_breaker_backoff_seconds,
+        voice_breaker_max_backoff_seconds=voice_breaker_max_backoff_seconds,
+        clip_memory_kb=clip_memory_kb,
         lizard_reaction_probability=lizard_reaction_probability,
         timer_min_minutes=timer_min_minutes,
         timer_max_minutes=timer_max_minutes,
+        timer_check_interval_seconds=timer_check_interval_seconds,
+        timer_slo_lateness_seconds=timer_slo_lateness_seconds,
+        timer_slo_tick_seconds=timer_slo_tick_seconds,
+        timer_slo_percentile=timer_slo_percentile,
+        timer_slo_check_interval_seconds=timer_slo_check_interval_seconds,
+        leader_election_enabled=leader_election_enabled,
+        leader_lease_seconds=leader_lease_seconds,
+        leader_renew_seconds=leader_renew_seconds,
+        trace_file=trace_file,
+        trace_max_kb=trace_max_kb,
+        trace_backups=trace_backups,
+        embedding_model=embedding_model,
+        embedding_workers=embedding_workers,
+        embedding_torch_threads=embedding_torch_threads,
+        embedding_max_pending=embedding_max_pending,
+        embedding_worker=embedding_worker,
+        embedding_timeout_seconds=embedding_timeout_seconds,
+        embedding_batch_size=embedding_batch_size,
+        embedding_batch_window_ms=embedding_batch_window_ms,
+        embedding_cache_size=embedding_cache_size,
+        embedding_cache_file=embedding_cache_file,
+        embedding_backend=embedding_backend,
+        embedding_min_similarity=embedding_min_similarity,
+        embedding_candidates=embedding_candidates,
+        embedding_precision=embedding_precision,
     )
 
 
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Optional
+
+from discord.ext import commands, tasks
+
+from .leader import LeaderLease
+from .metrics import TimerStats
+from .settings import Settings, logger
+from .state import BotState
+from .storage.base import BaseGuildConfigStore
+from .timer import create_lizard_timer
+from .voice_actor import VoiceActors
+
+
+class ShardedLizardTimers:
+    """One ``lizard_timer`` partition per gateway shard.
+
+    Each partition only walks the guilds on its own shard, so a slow or
+    reconnecting shard delays nobody but its own guilds. Due guilds within a
+    partition visit in parallel, each through its own actor from the shared
+    :class:`VoiceActors`, which keeps one guild's visits in order.
+    """
+
+    def __init__(
+        self,
+        bot: commands.AutoShardedBot,
+        state: BotState,
+        settings: Settings,
+        config_store: BaseGuildConfigStore,
+        leader: Optional[LeaderLease] = None,
+        actors: Optional[VoiceActors] = None,
+    ) -> None:
+        self.bot = bot
+        self.state = state
+        self.settings = settings
+        self.config_store = config_store
+        self.leader = leader
+        self.actors = actors if actors is not None else VoiceActors(settings)
+        self._timers: Dict[int, tasks.Loop] = {}
+        self._stats: Dict[int, TimerStats] = {}
+
+    def start(self, shard_id: int) -> None:
+        timer = self._timers.get(shard_id)
+        if timer is None:
+            stats = TimerStats()
+            timer = create_lizard_timer(
+                self.bot,
+                self.state,
+                self.settings,
+                self.config_store,
+                shard_id=shard_id,
+                stats=stats,
+                leader=self.leader,
+                actors=self.actors,
+            )
+            self._timers[shard_id] = timer
+            self._stats[shard_id] = stats
+        if not timer.is_running():
+            timer.start()
+            logger.info("Lizard timer started for shard %d", shard_id)
+
+    def start_all(self) -> None:
+        for shard_id in sorted(self.bot.shards):
+            self.start(shard_id)
+
+    def stop(self, shard_id: int) -> None:
+        timer = self._timers.get(shard_id)
+        if timer is not None and timer.is_running():
+            timer.cancel()
+
+    def stats(self, shard_id: int) -> Optional[TimerStats]:
+        return self._stats.get(shard_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot: Dict[str, Any] = {}
+        for shard_id, stats in sorted(self._stats.items()):
+            shard = self.bot.get_shard(shard_id)
+            entry = stats.snapshot()
+            latency = shard.latency if shard else math.inf
+            entry["latency_ms"] = round(latency * 1000) if math.isfinite(latency) else None
+            entry["connected"] = bool(shard and not shard.is_closed())
+            snapshot[f"shard {shard_id}"] = entry
+        return snapshot
+
+
+__all__ = ["ShardedLizardTimers"]
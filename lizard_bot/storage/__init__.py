@@ -1,6 +1,6 @@
 """Storage backends for guild configuration data."""
 
-from .base import BaseGuildConfigStore
+from .base import TIMER_LEASE, BaseGuildConfigStore, StaleFencingTokenError
 from .json_store import JsonGuildConfigStore
 from .sqlite_store import SqliteGuildConfigStore
 
@@ -8,4 +8,6 @@ __all__ = [
     "BaseGuildConfigStore",
     "JsonGuildConfigStore",
     "SqliteGuildConfigStore",
+    "StaleFencingTokenError",
+    "TIMER_LEASE",
 ]
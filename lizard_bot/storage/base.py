@@ -2,7 +2,15 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, Mapping, Optional, Tuple
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+
+# Lease guarding the scheduled visit timer; fenced writes are checked against it.
+TIMER_LEASE = "lizard_timer"
+
+
+class StaleFencingTokenError(RuntimeError):
+    """Raised when a fenced write carries a token from a lease that changed hands."""
 
 
 class BaseGuildConfigStore(ABC):
@@ -35,6 +43,7 @@ class BaseGuildConfigStore(ABC):
         user_id: int,
         stat_type: str = "visits",
         amount: int = 1,
+        fencing_token: Optional[int] = None,
     ) -> None:
         """Increment a numeric stat (visits, kidnapped, attempts, successes, failures)."""
         raise NotImplementedError
@@ -66,10 +75,22 @@ class BaseGuildConfigStore(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def clear_pending_kidnap(self, guild_id: int, target_user_id: int) -> None:
+    def clear_pending_kidnap(
+        self, guild_id: int, target_user_id: int, fencing_token: Optional[int] = None
+    ) -> None:
         """Remove any pending kidnap entry for a given target."""
         raise NotImplementedError
 
+    @abstractmethod
+    def record_kidnaps(
+        self,
+        guild_id: int,
+        kidnaps: Sequence[Tuple[int, Optional[int]]],
+        fencing_token: Optional[int] = None,
+    ) -> None:
+        """Credit completed kidnaps as (target, initiator) pairs and clear them, atomically."""
+        raise NotImplementedError
+
     @abstractmethod
     def get_pending_kidnap(
         self, guild_id: int, target_user_id: int
@@ -84,7 +105,10 @@ class BaseGuildConfigStore(ABC):
 
     @abstractmethod
     def set_guild_timer(
-        self, guild_id: int, next_visit_at: Optional[datetime]
+        self,
+        guild_id: int,
+        next_visit_at: Optional[datetime],
+        fencing_token: Optional[int] = None,
     ) -> None:
         """Persist the next scheduled automatic visit time for a guild."""
         raise NotImplementedError
@@ -99,5 +123,25 @@ class BaseGuildConfigStore(ABC):
         """Return next scheduled visits for all guilds."""
         raise NotImplementedError
 
+    @abstractmethod
+    def get_clip_weights(self, guild_id: int) -> Dict[str, float]:
+        """Return per-clip selection weights a guild has overridden."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_clip_weight(self, guild_id: int, clip_name: str, weight: Optional[float]) -> None:
+        """Override a clip's weight for a guild; ``None`` restores the default."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def acquire_lease(self, name: str, holder: str, ttl_seconds: float) -> Optional[int]:
+        """Take or renew a named lease, returning its fencing token (None if held elsewhere)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def release_lease(self, name: str, holder: str) -> None:
+        """Give up a lease early so a standby can take over immediately."""
+        raise NotImplementedError
+
 
-__all__ = ["BaseGuildConfigStore"]
+__all__ = ["BaseGuildConfigStore", "StaleFencingTokenError", "TIMER_LEASE"]
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import json
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Mapping, Optional, Tuple
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
 
-from .base import BaseGuildConfigStore
+from .base import TIMER_LEASE, BaseGuildConfigStore, StaleFencingTokenError
 from ..settings import logger
 
 
@@ -76,6 +77,9 @@ class JsonGuildConfigStore(BaseGuildConfigStore):
 
     def __init__(self, path: Path) -> None:
         self.path = Path(path)
+        # The JSON file is never shared between processes, so leases only need
+        # to be consistent within this one.
+        self._leases: Dict[str, Tuple[str, int, float]] = {}
 
     def load_all(self) -> Dict[str, Any]:
         if self.path.exists():
@@ -104,6 +108,13 @@ class JsonGuildConfigStore(BaseGuildConfigStore):
             guild_config.setdefault(key, value)
         return guild_config
 
+    def _check_fence(self, fencing_token: Optional[int]) -> None:
+        if fencing_token is None:
+            return
+        lease = self._leases.get(TIMER_LEASE)
+        if lease is None or lease[1] != fencing_token:
+            raise StaleFencingTokenError(f"Fencing token {fencing_token} is no longer current")
+
     def _normalize_stat_name(self, stat_type: str) -> Optional[str]:
         normalized = stat_type.lower()
         if normalized in DEFAULT_USER_TEMPLATE:
@@ -141,7 +152,7 @@ class JsonGuildConfigStore(BaseGuildConfigStore):
         config = {
             key: value
             for key, value in guild_config.items()
-            if key not in {"stats", "pending_kidnaps", "timer"}
+            if key not in {"stats", "pending_kidnaps", "timer", "clip_weights"}
         }
         timer_info = guild_config.get("timer", {})
         if "next_visit_at" in timer_info:
@@ -162,11 +173,13 @@ class JsonGuildConfigStore(BaseGuildConfigStore):
         user_id: int,
         stat_type: str = "visits",
         amount: int = 1,
+        fencing_token: Optional[int] = None,
     ) -> None:
         stat_name = self._normalize_stat_name(stat_type)
         if not stat_name:
             logger.warning("Unknown stat type '%s' ignored", stat_type)
             return
+        self._check_fence(fencing_token)
 
         configs = self.load_all()
         guild_key = _to_guild_key(guild_id)
@@ -227,7 +240,10 @@ class JsonGuildConfigStore(BaseGuildConfigStore):
         }
         self.save_all(configs)
 
-    def clear_pending_kidnap(self, guild_id: int, target_user_id: int) -> None:
+    def clear_pending_kidnap(
+        self, guild_id: int, target_user_id: int, fencing_token: Optional[int] = None
+    ) -> None:
+        self._check_fence(fencing_token)
         configs = self.load_all()
         guild_key = _to_guild_key(guild_id)
         guild_config = self._ensure_guild(configs, guild_key)
@@ -237,6 +253,34 @@ class JsonGuildConfigStore(BaseGuildConfigStore):
             pending.pop(target_key, None)
             self.save_all(configs)
 
+    def record_kidnaps(
+        self,
+        guild_id: int,
+        kidnaps: Sequence[Tuple[int, Optional[int]]],
+        fencing_token: Optional[int] = None,
+    ) -> None:
+        if not kidnaps:
+            return
+        self._check_fence(fencing_token)
+
+        configs = self.load_all()
+        guild_config = self._ensure_guild(configs, _to_guild_key(guild_id))
+        stats = guild_config.setdefault("stats", {})
+        pending = guild_config.setdefault("pending_kidnaps", {})
+        for target_id, initiator_id in kidnaps:
+            target_key = _to_user_key(target_id)
+            target_stats = stats.setdefault(target_key, _copy_user_template())
+            target_stats["kidnapped"] = int(target_stats.get("kidnapped", 0)) + 1
+            if initiator_id:
+                initiator_stats = stats.setdefault(
+                    _to_user_key(initiator_id), _copy_user_template()
+                )
+                initiator_stats["kidnap_successes"] = (
+                    int(initiator_stats.get("kidnap_successes", 0)) + 1
+                )
+            pending.pop(target_key, None)
+        self.save_all(configs)
+
     def get_pending_kidnap(
         self, guild_id: int, target_user_id: int
     ) -> Optional[Dict[str, Any]]:
@@ -271,8 +315,12 @@ class JsonGuildConfigStore(BaseGuildConfigStore):
         return pending_map
 
     def set_guild_timer(
-        self, guild_id: int, next_visit_at: Optional[datetime]
+        self,
+        guild_id: int,
+        next_visit_at: Optional[datetime],
+        fencing_token: Optional[int] = None,
     ) -> None:
+        self._check_fence(fencing_token)
         configs = self.load_all()
         guild_key = _to_guild_key(guild_id)
         guild_config = self._ensure_guild(configs, guild_key)
@@ -299,5 +347,39 @@ class JsonGuildConfigStore(BaseGuildConfigStore):
             timers[g_id] = _from_iso(timer.get("next_visit_at"))
         return timers
 
+    def get_clip_weights(self, guild_id: int) -> Dict[str, float]:
+        configs = self.load_all()
+        weights = configs.get(_to_guild_key(guild_id), {}).get("clip_weights", {})
+        return {name: float(weight) for name, weight in weights.items()}
+
+    def set_clip_weight(self, guild_id: int, clip_name: str, weight: Optional[float]) -> None:
+        configs = self.load_all()
+        guild_config = self._ensure_guild(configs, _to_guild_key(guild_id))
+        weights = guild_config.setdefault("clip_weights", {})
+        if weight is None:
+            weights.pop(clip_name, None)
+        else:
+            weights[clip_name] = float(weight)
+        self.save_all(configs)
+
+    def acquire_lease(self, name: str, holder: str, ttl_seconds: float) -> Optional[int]:
+        now = time.time()
+        current = self._leases.get(name)
+        if current is None:
+            token = 1
+        elif current[0] == holder:
+            token = current[1]
+        elif current[2] <= now:
+            token = current[1] + 1
+        else:
+            return None
+        self._leases[name] = (holder, token, now + ttl_seconds)
+        return token
+
+    def release_lease(self, name: str, holder: str) -> None:
+        current = self._leases.get(name)
+        if current is not None and current[0] == holder:
+            self._leases[name] = (holder, current[1], 0.0)
+
 
 __all__ = ["JsonGuildConfigStore"]
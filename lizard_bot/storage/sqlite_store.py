@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import sqlite3
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Mapping, Optional, Tuple
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
 
-from .base import BaseGuildConfigStore
+from .base import TIMER_LEASE, BaseGuildConfigStore, StaleFencingTokenError
 from .json_store import DEFAULT_USER_TEMPLATE, STAT_ALIASES, JsonGuildConfigStore
 from ..settings import logger
 
@@ -128,6 +129,20 @@ class SqliteGuildConfigStore(BaseGuildConfigStore):
                     due_at TEXT,
                     PRIMARY KEY (guild_id, user_id)
                 );
+
+                CREATE TABLE IF NOT EXISTS clip_weights (
+                    guild_id TEXT NOT NULL REFERENCES guilds(guild_id) ON DELETE CASCADE,
+                    clip_name TEXT NOT NULL,
+                    weight REAL NOT NULL,
+                    PRIMARY KEY (guild_id, clip_name)
+                );
+
+                CREATE TABLE IF NOT EXISTS leases (
+                    name TEXT PRIMARY KEY,
+                    holder TEXT NOT NULL,
+                    token INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                );
                 """
             )
             
@@ -159,6 +174,17 @@ class SqliteGuildConfigStore(BaseGuildConfigStore):
             (str(guild_id), now_iso, now_iso),
         )
 
+    def _check_fence(self, connection: sqlite3.Connection, fencing_token: Optional[int]) -> None:
+        """Open a write transaction and verify the timer lease has not changed hands."""
+        if fencing_token is None:
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        row = connection.execute(
+            "SELECT token FROM leases WHERE name = ?", (TIMER_LEASE,)
+        ).fetchone()
+        if row is None or row["token"] != fencing_token:
+            raise StaleFencingTokenError(f"Fencing token {fencing_token} is no longer current")
+
     def _has_data(self) -> bool:
         with self._connect() as connection:
             cursor = connection.execute("SELECT 1 FROM guilds LIMIT 1")
@@ -450,6 +476,7 @@ class SqliteGuildConfigStore(BaseGuildConfigStore):
         stat_type: str = "visits",
         amount: int = 1,
         display_name: str = None,
+        fencing_token: Optional[int] = None,
     ) -> None:
         column = _stat_column(stat_type)
         if not column:
@@ -459,6 +486,7 @@ class SqliteGuildConfigStore(BaseGuildConfigStore):
             return
 
         with self._connect() as connection:
+            self._check_fence(connection, fencing_token)
             self._ensure_guild_row(connection, guild_id)
             if display_name and amount != 0:
                 connection.execute(
@@ -584,13 +612,56 @@ class SqliteGuildConfigStore(BaseGuildConfigStore):
                 ),
             )
 
-    def clear_pending_kidnap(self, guild_id: int, target_user_id: int) -> None:
+    def clear_pending_kidnap(
+        self, guild_id: int, target_user_id: int, fencing_token: Optional[int] = None
+    ) -> None:
         with self._connect() as connection:
+            self._check_fence(connection, fencing_token)
             connection.execute(
                 "DELETE FROM pending_kidnaps WHERE guild_id = ? AND user_id = ?",
                 (str(guild_id), str(target_user_id)),
             )
 
+    def record_kidnaps(
+        self,
+        guild_id: int,
+        kidnaps: Sequence[Tuple[int, Optional[int]]],
+        fencing_token: Optional[int] = None,
+    ) -> None:
+        if not kidnaps:
+            return
+        guild_key = str(guild_id)
+        successes: Dict[int, int] = {}
+        for _, initiator_id in kidnaps:
+            if initiator_id:
+                successes[initiator_id] = successes.get(initiator_id, 0) + 1
+
+        with self._connect() as connection:
+            self._check_fence(connection, fencing_token)
+            self._ensure_guild_row(connection, guild_id)
+            connection.executemany(
+                """
+                INSERT INTO user_stats (guild_id, user_id, kidnapped)
+                VALUES (?, ?, 1)
+                ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                    kidnapped = user_stats.kidnapped + 1
+                """,
+                [(guild_key, str(target_id)) for target_id, _ in kidnaps],
+            )
+            connection.executemany(
+                """
+                INSERT INTO user_stats (guild_id, user_id, kidnap_successes)
+                VALUES (?, ?, ?)
+                ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                    kidnap_successes = user_stats.kidnap_successes + excluded.kidnap_successes
+                """,
+                [(guild_key, str(user_id), count) for user_id, count in successes.items()],
+            )
+            connection.executemany(
+                "DELETE FROM pending_kidnaps WHERE guild_id = ? AND user_id = ?",
+                [(guild_key, str(target_id)) for target_id, _ in kidnaps],
+            )
+
     def get_pending_kidnap(
         self, guild_id: int, target_user_id: int
     ) -> Optional[Dict[str, Any]]:
@@ -641,10 +712,14 @@ class SqliteGuildConfigStore(BaseGuildConfigStore):
         return pending
 
     def set_guild_timer(
-        self, guild_id: int, next_visit_at: Optional[datetime]
+        self,
+        guild_id: int,
+        next_visit_at: Optional[datetime],
+        fencing_token: Optional[int] = None,
     ) -> None:
         now_iso = _to_iso(_utcnow())
         with self._connect() as connection:
+            self._check_fence(connection, fencing_token)
             self._ensure_guild_row(connection, guild_id)
             connection.execute(
                 """
@@ -685,5 +760,63 @@ class SqliteGuildConfigStore(BaseGuildConfigStore):
             timers[guild_id] = _from_iso(row["next_visit_at"])
         return timers
 
+    def get_clip_weights(self, guild_id: int) -> Dict[str, float]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT clip_name, weight FROM clip_weights WHERE guild_id = ?",
+                (str(guild_id),),
+            ).fetchall()
+        return {row["clip_name"]: float(row["weight"]) for row in rows}
+
+    def set_clip_weight(self, guild_id: int, clip_name: str, weight: Optional[float]) -> None:
+        with self._connect() as connection:
+            if weight is None:
+                connection.execute(
+                    "DELETE FROM clip_weights WHERE guild_id = ? AND clip_name = ?",
+                    (str(guild_id), clip_name),
+                )
+                return
+            self._ensure_guild_row(connection, guild_id)
+            connection.execute(
+                """
+                INSERT INTO clip_weights (guild_id, clip_name, weight)
+                VALUES (?, ?, ?)
+                ON CONFLICT(guild_id, clip_name) DO UPDATE SET weight = excluded.weight
+                """,
+                (str(guild_id), clip_name, float(weight)),
+            )
+
+    def acquire_lease(self, name: str, holder: str, ttl_seconds: float) -> Optional[int]:
+        now = time.time()
+        with self._connect() as connection:
+            # IMMEDIATE takes the write lock up front so two contenders cannot
+            # both observe an expired lease and claim it.
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT holder, token, expires_at FROM leases WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                token = 1
+                connection.execute(
+                    "INSERT INTO leases (name, holder, token, expires_at) VALUES (?, ?, ?, ?)",
+                    (name, holder, token, now + ttl_seconds),
+                )
+                return token
+            if row["holder"] != holder and row["expires_at"] > now:
+                return None
+            token = row["token"] if row["holder"] == holder else row["token"] + 1
+            connection.execute(
+                "UPDATE leases SET holder = ?, token = ?, expires_at = ? WHERE name = ?",
+                (holder, token, now + ttl_seconds, name),
+            )
+            return token
+
+    def release_lease(self, name: str, holder: str) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE leases SET expires_at = 0 WHERE name = ? AND holder = ?",
+                (name, holder),
+            )
+
 
 __all__ = ["SqliteGuildConfigStore"]
@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 from .settings import logger
 
@@ -13,18 +13,46 @@ class _CacheEntry:
     path: Path
     lines: Optional[List[str]] = None
     mtime: Optional[float] = None
+    version: int = 0
+
+
+Subscriber = Callable[[List[str], int], None]
 
 
 class TextCache:
-    """Simple file-backed text cache with mtime invalidation."""
+    """Simple file-backed text cache with mtime invalidation.
+
+    Each key has a version that goes up whenever a reload changes its lines;
+    subscribers are called with the new lines and version.
+    """
 
     def __init__(self, base_path: Path | str = ".") -> None:
         self.base_path = Path(base_path)
         self._entries: Dict[str, _CacheEntry] = {}
+        self._subscribers: Dict[str, List[Subscriber]] = {}
 
     def register(self, key: str, relative_path: Path | str) -> None:
         self._entries[key] = _CacheEntry(path=self.base_path / relative_path)
 
+    def subscribe(self, key: str, callback: Subscriber) -> None:
+        """Call ``callback(lines, version)`` whenever ``key`` is reloaded with new lines.
+
+        Callbacks run on the thread that called :meth:`get_lines` and must
+        not block.
+        """
+        self._subscribers.setdefault(key, []).append(callback)
+
+    def version(self, key: str) -> int:
+        entry = self._entries.get(key)
+        return entry.version if entry else 0
+
+    def _notify(self, key: str, entry: _CacheEntry) -> None:
+        for callback in self._subscribers.get(key, []):
+            try:
+                callback(list(entry.lines or []), entry.version)
+            except Exception as error:
+                logger.error("Subscriber to %s cache failed: %s", key, error)
+
     def get_lines(self, key: str) -> Optional[List[str]]:
         entry = self._entries.get(key)
         if not entry:
@@ -40,9 +68,14 @@ class TextCache:
             mtime = os.path.getmtime(file_path)
             if entry.lines is None or entry.mtime != mtime:
                 with file_path.open("r", encoding="utf-8") as handle:
-                    entry.lines = [line.strip() for line in handle if line.strip()]
+                    lines = [line.strip() for line in handle if line.strip()]
+                changed = lines != entry.lines
+                entry.lines = lines
                 entry.mtime = mtime
                 logger.info("Loaded %s cache with %d entries", key, len(entry.lines))
+                if changed:
+                    entry.version += 1
+                    self._notify(key, entry)
         except Exception as error:  # pragma: no cover - logging branch
             logger.error("Error loading %s cache: %s", key, error)
             entry.lines = None
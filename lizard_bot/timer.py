@@ -3,19 +3,18 @@ from __future__ import annotations
 import asyncio
 import random
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import discord
 from discord.ext import tasks
 
+from .leader import LeaderLease
+from .metrics import SloPolicy, TimerStats
 from .state import BotState
 from .settings import Settings, logger
-from .storage.base import BaseGuildConfigStore
-from .voice import (
-    execute_kidnap,
-    get_users_in_voice_channels_per_guild,
-    join_play_leave,
-)
+from .storage.base import BaseGuildConfigStore, StaleFencingTokenError
+from .voice import get_users_in_voice_channels_per_guild
+from .voice_actor import VoiceActors
 
 
 def create_lizard_timer(
@@ -23,7 +22,30 @@ def create_lizard_timer(
     state: BotState,
     settings: Settings,
     config_store: BaseGuildConfigStore,
+    clock: Callable[[], datetime] = datetime.now,
+    shard_id: Optional[int] = None,
+    stats: Optional[TimerStats] = None,
+    leader: Optional[LeaderLease] = None,
+    actors: Optional[VoiceActors] = None,
 ) -> tasks.Loop:
+    """Create the visit loop for every guild, or only those on ``shard_id``.
+
+    With a ``leader`` lease the loop idles unless this process holds the lease,
+    and every timer and kidnap write carries the lease's fencing token.
+    Voice work goes through ``actors``, shared with the commands so a guild
+    never has two sessions fighting over its voice connection.
+    """
+    voice_actors = actors if actors is not None else VoiceActors(settings)
+    timer_stats = stats if stats is not None else TimerStats()
+    interval = settings.timer_check_interval_seconds
+    slo = SloPolicy(
+        lateness_seconds=settings.timer_slo_lateness_seconds,
+        tick_seconds=settings.timer_slo_tick_seconds,
+        percentile=settings.timer_slo_percentile,
+        check_interval_seconds=settings.timer_slo_check_interval_seconds,
+    )
+    last_slo_check: Optional[float] = None
+
     def resolve_kidnap_channel(
         guild: discord.Guild, guild_config: Dict[str, any]
     ) -> Optional[discord.VoiceChannel]:
@@ -35,12 +57,174 @@ def create_lizard_timer(
             return channel
         return None
 
-    @tasks.loop(seconds=10)
+    def shard_guilds() -> Optional[List[discord.Guild]]:
+        if shard_id is None:
+            return list(bot.guilds)
+        shard = bot.get_shard(shard_id)
+        if shard is None or shard.is_closed():
+            return None
+        return [guild for guild in bot.guilds if guild.shard_id == shard_id]
+
+    def check_slo(now: float) -> None:
+        nonlocal last_slo_check
+        if last_slo_check is None:
+            last_slo_check = now
+            return
+        if now - last_slo_check < slo.check_interval_seconds:
+            return
+        last_slo_check = now
+        breaches = timer_stats.slo_breaches(slo)
+        if breaches:
+            offenders = ", ".join(
+                f"{name} ({seconds:.0f}s)" for name, seconds in timer_stats.top_offenders()
+            )
+            logger.warning(
+                "Scheduler SLO breached%s: %s. Worst guilds: %s",
+                "" if shard_id is None else f" on shard {shard_id}",
+                "; ".join(breaches),
+                offenders or "none",
+            )
+        timer_stats.reset_offenders()
+
+    @tasks.loop(seconds=interval)
     async def lizard_timer() -> None:
-        guild_voice_info = get_users_in_voice_channels_per_guild(bot)
-        now = datetime.now()
+        guilds = shard_guilds()
+        if guilds is None:
+            # The shard is reconnecting; its guilds wait, other shards carry on.
+            timer_stats.skipped_ticks += 1
+            return
+
+        fencing_token = None
+        if leader is not None:
+            if not leader.is_leader:
+                timer_stats.standby_ticks += 1
+                return
+            fencing_token = leader.token
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            due = run_tick(guilds, fencing_token)
+            # The tick is the scheduling pass; voice playback is timed on its own.
+            scheduled = loop.time()
+            await run_visits(due)
+        except StaleFencingTokenError:
+            # Another process took the lease mid-tick; its writes win.
+            if leader is not None:
+                leader.demote()
+            return
+        finished = loop.time()
+        timer_stats.record_tick(
+            scheduled - started,
+            len(guilds),
+            len(due),
+            interval,
+            voice_seconds=finished - scheduled,
+        )
+        check_slo(finished)
+
+    def lateness_recorder(guild: discord.Guild, scheduled_time: datetime) -> Callable[[], None]:
+        """Records the visit's lateness once, when its first voice job starts."""
+        recorded = False
 
-        for guild in bot.guilds:
+        def record() -> None:
+            nonlocal recorded
+            if not recorded:
+                recorded = True
+                timer_stats.record_lateness(
+                    guild.name, (clock() - scheduled_time).total_seconds()
+                )
+
+        return record
+
+    async def visit_guild(
+        guild: discord.Guild,
+        guild_info: Optional[Dict[str, Any]],
+        kidnap_channel: Optional[discord.VoiceChannel],
+        fencing_token: Optional[int],
+        on_start: Callable[[], None],
+    ) -> None:
+        if guild_info:
+            # Check if there are any pending kidnaps for this guild
+            has_any_pending_kidnaps = False
+            if kidnap_channel:
+                for channel_info in guild_info["channels"]:
+                    members = channel_info["members"]
+                    for member in members:
+                        pending_key = (guild.id, member.id)
+                        if pending_key in state.pending_kidnaps:
+                            has_any_pending_kidnaps = True
+                            break
+                    if has_any_pending_kidnaps:
+                        break
+
+            if has_any_pending_kidnaps:
+                # Skip normal visits entirely, go straight to kidnap execution
+                logger.info(
+                    "[%s] Skipping normal visits (pending kidnaps detected)",
+                    guild.name,
+                )
+            else:
+                # Normal visits - one connection tours every occupied channel
+                channels = [
+                    channel_info["channel"]
+                    for channel_info in guild_info["channels"]
+                    if channel_info["members"]
+                ]
+                logger.info("[%s] Touring %d channel(s)", guild.name, len(channels))
+                await voice_actors.for_guild(guild).tour(channels, on_start=on_start)
+
+            # Always increment visit stats for all members
+            for channel_info in guild_info["channels"]:
+                members = channel_info["members"]
+                for member in members:
+                    config_store.increment_user_stat(
+                        guild.id, member.id, "visits", fencing_token=fencing_token
+                    )
+
+            # Execute pending kidnaps if any, all in one voice session
+            if kidnap_channel:
+                victims = [
+                    member
+                    for channel_info in guild_info["channels"]
+                    for member in channel_info["members"]
+                    if (guild.id, member.id) in state.pending_kidnaps
+                ]
+                if victims:
+                    logger.info(
+                        "[%s] Executing %d pending kidnap(s)", guild.name, len(victims)
+                    )
+                    kidnapped = await voice_actors.for_guild(guild).kidnap_members(
+                        victims, kidnap_channel, on_start=on_start
+                    )
+                    completed = []
+                    for member in kidnapped:
+                        pending = state.pending_kidnaps.get((guild.id, member.id))
+                        completed.append(
+                            (member.id, pending.initiator_id if pending else None)
+                        )
+                    config_store.record_kidnaps(
+                        guild.id, completed, fencing_token=fencing_token
+                    )
+                    for member in kidnapped:
+                        state.pending_kidnaps.pop((guild.id, member.id), None)
+
+            logger.info("[%s] Finished visiting all channels!", guild.name)
+
+        # A visit with no voice work is only as late as its scheduling.
+        on_start()
+        state.guild_timers[guild.id] = None
+        config_store.set_guild_timer(guild.id, None, fencing_token=fencing_token)
+
+    def run_tick(
+        guilds: List[discord.Guild], fencing_token: Optional[int]
+    ) -> List[Awaitable[None]]:
+        """Update every guild's timer; returns the visits that are due, not yet started."""
+        guild_voice_info = get_users_in_voice_channels_per_guild(bot, guilds)
+        now = clock()
+        due: List[Awaitable[None]] = []
+
+        for guild in guilds:
             guild_id = guild.id
             has_users = guild_id in guild_voice_info
             guild_config = config_store.get_guild_config(guild_id)
@@ -49,7 +233,7 @@ def create_lizard_timer(
                 if guild_id in state.guild_timers and state.guild_timers[guild_id] is not None:
                     logger.info("[%s] No users in voice channels. Timer paused.", guild.name)
                 state.guild_timers[guild_id] = None
-                config_store.set_guild_timer(guild_id, None)
+                config_store.set_guild_timer(guild_id, None, fencing_token=fencing_token)
                 continue
 
             if guild_id not in state.guild_timers or state.guild_timers[guild_id] is None:
@@ -58,7 +242,7 @@ def create_lizard_timer(
                 minutes = random.randint(min_minutes, max_minutes)
                 next_visit = now + timedelta(minutes=minutes)
                 state.guild_timers[guild_id] = next_visit
-                config_store.set_guild_timer(guild_id, next_visit)
+                config_store.set_guild_timer(guild_id, next_visit, fencing_token=fencing_token)
                 logger.info(
                     "[%s] Timer set for %d minutes (range %d-%d).",
                     guild.name,
@@ -74,88 +258,26 @@ def create_lizard_timer(
 
             if now >= scheduled_time:
                 logger.info("[%s] Time to play! Visiting all channels...", guild.name)
+                due.append(
+                    visit_guild(
+                        guild,
+                        guild_voice_info.get(guild_id),
+                        resolve_kidnap_channel(guild, guild_config),
+                        fencing_token,
+                        lateness_recorder(guild, scheduled_time),
+                    )
+                )
+        return due
 
-                guild_info = guild_voice_info.get(guild_id)
-                kidnap_channel = resolve_kidnap_channel(guild, guild_config)
-                if guild_info:
-                    # Check if there are any pending kidnaps for this guild
-                    has_any_pending_kidnaps = False
-                    if kidnap_channel:
-                        for channel_info in guild_info["channels"]:
-                            members = channel_info["members"]
-                            for member in members:
-                                pending_key = (guild.id, member.id)
-                                if pending_key in state.pending_kidnaps:
-                                    has_any_pending_kidnaps = True
-                                    break
-                            if has_any_pending_kidnaps:
-                                break
-
-                    if has_any_pending_kidnaps:
-                        # Skip normal visits entirely, go straight to kidnap execution
-                        logger.info(
-                            "[%s] Skipping normal visits (pending kidnaps detected)",
-                            guild.name,
-                        )
-                    else:
-                        # Normal visits - play sound for all channels
-                        for channel_info in guild_info["channels"]:
-                            channel = channel_info["channel"]
-                            members = channel_info["members"]
-
-                            if members:
-                                logger.info(
-                                    "[%s] Joining %s (%d users)",
-                                    guild.name,
-                                    channel.name,
-                                    len(members),
-                                )
-                                await join_play_leave(channel, settings)
-                                await asyncio.sleep(2)
-
-                    # Always increment visit stats for all members
-                    for channel_info in guild_info["channels"]:
-                        members = channel_info["members"]
-                        for member in members:
-                            config_store.increment_user_stat(guild.id, member.id, "visits")
-
-                    # Execute pending kidnaps if any
-                    if kidnap_channel:
-                        for channel_info in guild_info["channels"]:
-                            channel = channel_info["channel"]
-                            members = channel_info["members"]
-                            
-                            for member in members:
-                                pending_key = (guild.id, member.id)
-                                pending = state.pending_kidnaps.get(pending_key)
-                                if pending:
-                                    logger.info(
-                                        "Executing pending kidnap for %s",
-                                        member.display_name,
-                                    )
-                                    success = await execute_kidnap(
-                                        settings, guild, member, kidnap_channel
-                                    )
-                                    if success:
-                                        config_store.increment_user_stat(
-                                            guild.id, member.id, "kidnapped"
-                                        )
-                                        if pending.initiator_id:
-                                            config_store.increment_user_stat(
-                                                guild.id,
-                                                pending.initiator_id,
-                                                "kidnap_successes",
-                                            )
-                                        del state.pending_kidnaps[pending_key]
-                                        config_store.clear_pending_kidnap(
-                                            guild.id, member.id
-                                        )
-                                        await asyncio.sleep(settings.pending_kidnap_delay_seconds)
-
-                    logger.info("[%s] Finished visiting all channels!", guild.name)
-
-                state.guild_timers[guild_id] = None
-                config_store.set_guild_timer(guild_id, None)
+    async def run_visits(due: List[Awaitable[None]]) -> None:
+        if not due:
+            return
+        # Each guild has its own voice actor, so due guilds play in parallel.
+        for result in await asyncio.gather(*due, return_exceptions=True):
+            if isinstance(result, StaleFencingTokenError):
+                raise result
+            if isinstance(result, Exception):
+                logger.error("Scheduled visit failed: %s", result)
 
     @lizard_timer.before_loop
     async def before_lizard_timer() -> None:
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import logging.handlers
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import discord
+
+from .metrics import Histogram
+from .settings import Settings, logger
+
+
+class VoiceTrace:
+    """Timed spans for one voice session, tagged with its guild and channels.
+
+    Span offsets and durations use the event loop clock. Spans may overlap
+    (member moves run concurrently, ``source_prep`` contains ``clip_load``).
+    """
+
+    def __init__(self, tracer: "VoiceTracer", kind: str, guild: discord.Guild) -> None:
+        self.tracer = tracer
+        self.kind = kind
+        self.guild_id = guild.id
+        self.guild_name = guild.name
+        self.channel: Optional[discord.abc.GuildChannel] = None
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self._loop = asyncio.get_running_loop()
+        self._origin = self._loop.time()
+
+    def now(self) -> float:
+        return self._loop.time()
+
+    def record(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        channel: Optional[discord.abc.GuildChannel] = None,
+        **tags: Any,
+    ) -> None:
+        span: Dict[str, Any] = {
+            "name": name,
+            "offset": round(start - self._origin, 6),
+            "seconds": round(end - start, 6),
+        }
+        if channel is not None:
+            span["channel_id"] = channel.id
+            span["channel"] = channel.name
+        span.update(tags)
+        self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, **tags: Any) -> Iterator[None]:
+        """Time the block as ``name``, tagged with the current channel."""
+        channel = self.channel
+        start = self.now()
+        try:
+            yield
+        except BaseException as error:
+            tags["error"] = type(error).__name__
+            raise
+        finally:
+            self.record(name, start, self.now(), channel, **tags)
+
+    def finish(self, outcome: str) -> None:
+        self.tracer.submit(self, outcome, self.now() - self._origin)
+
+
+class FirstPacketProbe(discord.AudioSource):
+    """Wraps a source and records a ``first_packet`` span on its first read.
+
+    ``read`` runs on discord.py's player thread; it only reads the loop clock
+    and appends one span, both safe from any thread.
+    """
+
+    def __init__(self, source: discord.AudioSource, trace: VoiceTrace) -> None:
+        self.source = source
+        self.trace = trace
+        self.channel = trace.channel
+        self.started = trace.now()
+        self._pending = True
+
+    def read(self) -> bytes:
+        data = self.source.read()
+        if self._pending:
+            self._pending = False
+            self.trace.record("first_packet", self.started, self.trace.now(), self.channel)
+        return data
+
+    def is_opus(self) -> bool:
+        return self.source.is_opus()
+
+    def cleanup(self) -> None:
+        self.source.cleanup()
+
+
+class VoiceTracer:
+    """Collects finished voice traces into per-span percentiles and a JSONL file.
+
+    The file rotates at ``max_bytes`` keeping ``backups`` old files; without a
+    path only the in-memory aggregates are kept.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_bytes: int = 1024 * 1024,
+        backups: int = 3,
+        window: int = 1024,
+    ) -> None:
+        self.path = path
+        self.window = window
+        self.traces = 0
+        self.write_errors = 0
+        self.spans: Dict[str, Histogram] = {}
+        self.sessions: Dict[str, Histogram] = {}
+        self._writer: Optional[logging.Logger] = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._writer = logging.Logger(f"lizard_bot.tracing:{path}")
+            self._writer.addHandler(handler)
+
+    def start(self, kind: str, guild: discord.Guild) -> VoiceTrace:
+        return VoiceTrace(self, kind, guild)
+
+    def _histogram(self, table: Dict[str, Histogram], name: str) -> Histogram:
+        histogram = table.get(name)
+        if histogram is None:
+            histogram = table[name] = Histogram(self.window)
+        return histogram
+
+    def submit(self, trace: VoiceTrace, outcome: str, seconds: float) -> None:
+        self.traces += 1
+        self._histogram(self.sessions, trace.kind).observe(seconds)
+        for span in trace.spans:
+            self._histogram(self.spans, span["name"]).observe(span["seconds"])
+
+        if self._writer is None:
+            return
+        record = {
+            "ts": round(trace.started_at, 3),
+            "kind": trace.kind,
+            "guild_id": trace.guild_id,
+            "guild": trace.guild_name,
+            "outcome": outcome,
+            "seconds": round(seconds, 6),
+            "spans": trace.spans,
+        }
+        try:
+            self._writer.info(json.dumps(record, separators=(",", ":")))
+        except (TypeError, ValueError) as error:
+            self.write_errors += 1
+            logger.warning("Could not write voice trace: %s", error)
+
+    def snapshot(self) -> Dict[str, Any]:
+        def summarize(table: Dict[str, Histogram]) -> Dict[str, Any]:
+            summary = {}
+            for name in sorted(table):
+                histogram = table[name]
+                summary[name] = {
+                    "n": histogram.count,
+                    "p50": histogram.percentile(50),
+                    "p95": histogram.percentile(95),
+                    "p99": histogram.percentile(99),
+                }
+            return summary
+
+        return {
+            "traces": self.traces,
+            "file": str(self.path) if self.path is not None else "-",
+            "write_errors": self.write_errors,
+            "sessions": summarize(self.sessions),
+            "spans": summarize(self.spans),
+        }
+
+
+# Global instance for easy access
+_voice_tracer: Optional[VoiceTracer] = None
+
+
+def get_voice_tracer() -> Optional[VoiceTracer]:
+    """The tracer built by :func:`initialize_voice_tracer`, if any."""
+    return _voice_tracer
+
+
+def initialize_voice_tracer(settings: Settings) -> VoiceTracer:
+    global _voice_tracer
+    _voice_tracer = VoiceTracer(
+        settings.trace_file,
+        max_bytes=settings.trace_max_kb * 1024,
+        backups=settings.trace_backups,
+    )
+    if settings.trace_file is not None:
+        logger.info("Writing voice traces to %s", settings.trace_file)
+    return _voice_tracer
+
+
+__all__ = [
+    "FirstPacketProbe",
+    "VoiceTrace",
+    "VoiceTracer",
+    "get_voice_tracer",
+    "initialize_voice_tracer",
+]
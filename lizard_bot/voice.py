@@ -1,11 +1,33 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Dict, List
+from contextlib import nullcontext
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
 import discord
 
+from .audio_library import get_audio_library
+from .breaker import VoiceUnavailable, get_voice_breaker, missing_permissions
+from .metrics import VoiceStats
 from .settings import Settings, logger
+from .tracing import FirstPacketProbe, VoiceTrace, get_voice_tracer
+
+
+T = TypeVar("T")
+
+voice_stats = VoiceStats()
 
 
 def get_users_in_voice_channels(bot: discord.Client) -> List[Dict[str, object]]:
@@ -18,9 +40,12 @@ def get_users_in_voice_channels(bot: discord.Client) -> List[Dict[str, object]]:
     return users_info
 
 
-def get_users_in_voice_channels_per_guild(bot: discord.Client) -> Dict[int, Dict[str, object]]:
+def get_users_in_voice_channels_per_guild(
+    bot: discord.Client,
+    guilds: Optional[Iterable[discord.Guild]] = None,
+) -> Dict[int, Dict[str, object]]:
     guild_voice_info: Dict[int, Dict[str, object]] = {}
-    for guild in bot.guilds:
+    for guild in bot.guilds if guilds is None else guilds:
         channels_with_users = []
         for channel in guild.voice_channels:
             members = [member for member in channel.members if not member.bot]
@@ -31,122 +56,578 @@ def get_users_in_voice_channels_per_guild(bot: discord.Client) -> Dict[int, Dict
     return guild_voice_info
 
 
-async def join_play_leave(channel: discord.VoiceChannel, settings: Settings) -> None:
-    try:
-        if channel.guild.voice_client:
-            await channel.guild.voice_client.disconnect(force=True)
-            await asyncio.sleep(1)
-
-        voice_client = await channel.connect(
-            timeout=settings.connection_timeout, reconnect=False, self_deaf=False, self_mute=False
-        )
-        logger.info("Joined %s in %s", channel.name, channel.guild.name)
-
-        await channel.guild.me.edit(mute=False, deafen=False)
-        await asyncio.sleep(settings.playback_delay_seconds)
-
-        if not settings.audio_file.exists():
-            logger.error("Audio file not found: %s", settings.audio_file)
-            await voice_client.disconnect(force=True)
+class VoiceTimeout(asyncio.TimeoutError):
+    """A voice step ran out of its own budget or of the session's."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"voice {reason} timed out")
+        self.reason = reason
+
+
+class VoiceDeadline:
+    """Time budget for one voice session, shared by every step inside it.
+
+    Each step gets ``min(step timeout, time left in the session)``. When the
+    session budget is the tighter of the two the timeout is counted as
+    ``session:<step>``, so ``voice_stats.timeouts`` shows where time went.
+    With a ``trace`` every step is also recorded as a span named after it.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        stats: Optional[VoiceStats] = None,
+        trace: Optional[VoiceTrace] = None,
+    ) -> None:
+        self._loop = asyncio.get_running_loop()
+        self.started_at = self._loop.time()
+        self.expires_at = self.started_at + seconds
+        self.stats = stats or voice_stats
+        self.stats.sessions += 1
+        self.trace = trace
+
+    @classmethod
+    def open(cls, kind: str, guild: discord.Guild, seconds: float) -> "VoiceDeadline":
+        """Start a session budget, traced as ``kind`` when a tracer is installed."""
+        tracer = get_voice_tracer()
+        return cls(seconds, trace=tracer.start(kind, guild) if tracer is not None else None)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self._loop.time())
+
+    def elapsed(self) -> float:
+        return self._loop.time() - self.started_at
+
+    def enter(self, channel: discord.VoiceChannel) -> None:
+        """Tag the spans that follow with ``channel``."""
+        if self.trace is not None:
+            self.trace.channel = channel
+
+    def span(self, name: str, **tags: Any) -> ContextManager[None]:
+        if self.trace is None:
+            return nullcontext()
+        return self.trace.span(name, **tags)
+
+    async def run(
+        self,
+        reason: str,
+        awaitable: Awaitable[T],
+        timeout: Optional[float] = None,
+        **tags: Any,
+    ) -> T:
+        with self.span(reason, **tags):
+            return await self._run(reason, awaitable, timeout)
+
+    async def _run(self, reason: str, awaitable: Awaitable[T], timeout: Optional[float]) -> T:
+        remaining = self.remaining()
+        if timeout is not None and timeout <= remaining:
+            budget, label = timeout, reason
+        else:
+            budget, label = remaining, f"session:{reason}"
+        if budget <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise self._expired(label)
+        try:
+            return await asyncio.wait_for(awaitable, budget)
+        except asyncio.TimeoutError:
+            raise self._expired(label) from None
+
+    async def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            await self.run("delay", asyncio.sleep(seconds))
+
+    def finish(self, outcome: str) -> None:
+        """Record the session as ``completed``, ``failed`` or ``cancelled``."""
+        setattr(self.stats, outcome, getattr(self.stats, outcome) + 1)
+        self.stats.session_seconds.observe(self.elapsed())
+        if self.trace is not None:
+            self.trace.finish(outcome)
+
+    def _expired(self, label: str) -> VoiceTimeout:
+        self.stats.record_timeout(label)
+        return VoiceTimeout(label)
+
+
+def play_until_done(
+    voice_client: discord.VoiceClient, source: discord.AudioSource
+) -> "asyncio.Future[None]":
+    """Start playing ``source`` and return a future that resolves when it ends.
+
+    discord.py calls ``after`` on its player thread, so the outcome is handed
+    back to the event loop with ``call_soon_threadsafe``. A playback error
+    becomes the future's exception.
+    """
+    loop = asyncio.get_running_loop()
+    done: "asyncio.Future[None]" = loop.create_future()
+
+    def resolve(error: Optional[Exception]) -> None:
+        if done.done():
             return
-
-        ffmpeg_path = settings.ffmpeg_path
-        if not ffmpeg_path.exists():
-            logger.warning("FFmpeg executable not found at %s", ffmpeg_path)
-            executable = str(ffmpeg_path)
+        if error is None:
+            done.set_result(None)
         else:
-            executable = str(ffmpeg_path)
+            done.set_exception(error)
 
-        audio_source = discord.FFmpegPCMAudio(
-            str(settings.audio_file), executable=executable
-        )
+    def after(error: Optional[Exception]) -> None:
+        loop.call_soon_threadsafe(resolve, error)
 
-        def after_playback(error: Exception | None) -> None:
-            if error:
-                logger.error("Playback error: %s", error)
-            else:
-                logger.info("Playback finished successfully")
+    voice_client.play(source, after=after)
+    return done
 
-        voice_client.play(audio_source, after=after_playback)
-        logger.info("Playing %s", settings.audio_file.name)
 
-        while voice_client.is_playing():
-            await asyncio.sleep(1)
+def _in_channel(guild: discord.Guild, channel: discord.VoiceChannel) -> bool:
+    voice = guild.me.voice
+    return voice is not None and voice.channel is not None and voice.channel.id == channel.id
 
-        await asyncio.sleep(settings.disconnect_delay_seconds)
-        await voice_client.disconnect(force=True)
-        logger.info("Left %s", channel.name)
 
-    except asyncio.TimeoutError:
-        logger.error("Voice connection timeout")
-    except discord.ClientException as error:
-        logger.error("ClientException: %s", error)
+async def _move(
+    voice_client: discord.VoiceClient,
+    channel: discord.VoiceChannel,
+    settings: Settings,
+    deadline: VoiceDeadline,
+) -> None:
+    """Move to ``channel`` and wait for the gateway to confirm it.
+
+    ``VoiceClient.move_to`` returns as soon as the request is sent, so listen
+    for our own voice state update (subscribing first, so it cannot be missed).
+    """
+    guild = channel.guild
+    deadline.enter(channel)
+    arrived = asyncio.ensure_future(
+        voice_client.client.wait_for(
+            "voice_state_update",
+            check=lambda member, before, after: member.id == guild.me.id
+            and after.channel is not None
+            and after.channel.id == channel.id,
+        )
+    )
+    try:
+        await deadline.run(
+            "move_self", voice_client.move_to(channel), settings.voice_operation_timeout
+        )
+        if not _in_channel(guild, channel):
+            started = deadline.elapsed()
+            await deadline.run("move_ready", arrived, settings.voice_operation_timeout)
+            deadline.stats.ready_seconds.observe(deadline.elapsed() - started)
+    finally:
+        arrived.cancel()
+
+
+async def _release_voice(guild: discord.Guild, settings: Settings) -> None:
+    """Stop playback and drop the guild's voice connection, whatever state it is in.
+
+    This also catches the client discord.py registers before a connect that
+    was cancelled half way, which it does not clean up itself.
+    """
+    voice_client = guild.voice_client
+    if voice_client is None:
+        return
+    if voice_client.is_playing():
+        # The player thread cleans up its source on exit, which kills ffmpeg.
+        voice_client.stop()
+    try:
+        await asyncio.wait_for(
+            voice_client.disconnect(force=True), settings.voice_operation_timeout
+        )
     except Exception as error:  # pragma: no cover - logging branch
-        logger.error("Error in join_play_leave: %s", error)
+        logger.warning("Could not disconnect from voice in %s: %s", guild.name, error)
+
+
+async def _connect(
+    channel: discord.VoiceChannel, settings: Settings, deadline: VoiceDeadline
+) -> discord.VoiceClient:
+    guild = channel.guild
+    if guild.voice_client:
+        await deadline.run(
+            "disconnect",
+            guild.voice_client.disconnect(force=True),
+            settings.voice_operation_timeout,
+        )
 
+    deadline.enter(channel)
+    timeout = min(settings.connection_timeout, deadline.remaining())
+    voice_client = await deadline.run(
+        "connect",
+        channel.connect(timeout=timeout, reconnect=False, self_deaf=False, self_mute=False),
+        settings.connection_timeout,
+    )
+    await deadline.run(
+        "self_unmute", guild.me.edit(mute=False, deafen=False), settings.voice_operation_timeout
+    )
+    return voice_client
 
-async def execute_kidnap(
-    settings: Settings,
+
+async def _prepare_source(
     guild: discord.Guild,
-    member: discord.Member,
-    afk_channel: discord.VoiceChannel,
+    settings: Settings,
+    deadline: VoiceDeadline,
+    clip: Optional[str],
+) -> Optional[discord.AudioSource]:
+    """Pick the clip (by name, or weighted at random) and build its source."""
+    library = get_audio_library()
+    audio_file = settings.audio_file
+    if library is not None:
+        name = clip or library.choose(guild.id)
+        if name is not None and library.path(name) is not None:
+            encoded = await deadline.run(
+                "clip_load", library.load(name), settings.voice_operation_timeout
+            )
+            if encoded is not None:
+                return encoded.source()
+            audio_file = library.path(name) or audio_file
+        elif clip is not None:
+            logger.warning("Unknown clip %r, playing %s instead", clip, audio_file.name)
+
+    if not audio_file.exists():
+        logger.error("Audio file not found: %s", audio_file)
+        return None
+    ffmpeg_path = settings.ffmpeg_path
+    if not ffmpeg_path.exists():
+        logger.warning("FFmpeg executable not found at %s", ffmpeg_path)
+    return discord.FFmpegPCMAudio(str(audio_file), executable=str(ffmpeg_path))
+
+
+async def _play_clip(
+    voice_client: discord.VoiceClient,
+    settings: Settings,
+    deadline: VoiceDeadline,
+    clip: Optional[str] = None,
 ) -> bool:
+    """Play one clip to the end; returns False when there was nothing to play."""
+    with deadline.span("source_prep"):
+        audio_source = await _prepare_source(voice_client.guild, settings, deadline, clip)
+    if audio_source is None:
+        return False
+    if deadline.trace is not None:
+        audio_source = FirstPacketProbe(audio_source, deadline.trace)
     try:
-        if not member.voice or not member.voice.channel:
+        done = play_until_done(voice_client, audio_source)
+    except BaseException:
+        # Only sources handed to a player get cleaned up by its thread.
+        audio_source.cleanup()
+        raise
+    try:
+        await deadline.run("playback", done, settings.voice_playback_timeout)
+    except VoiceTimeout:
+        raise
+    except Exception as error:
+        logger.error("Playback error in %s: %s", voice_client.channel.name, error)
+    return True
+
+
+def _group_by_channel(
+    members: Iterable[discord.Member],
+) -> List[Tuple[discord.VoiceChannel, List[discord.Member]]]:
+    groups: Dict[int, Tuple[discord.VoiceChannel, List[discord.Member]]] = {}
+    for member in members:
+        channel = member.voice.channel if member.voice else None
+        if channel is None:
+            continue
+        groups.setdefault(channel.id, (channel, []))[1].append(member)
+    return list(groups.values())
+
+
+def _has_listeners(channel: discord.VoiceChannel) -> bool:
+    return any(not member.bot for member in channel.members)
+
+
+class VoiceSession:
+    """A guild's voice connection, kept open across several pieces of work.
+
+    Each piece of work runs under its own :class:`VoiceDeadline`, opened with
+    :meth:`begin`. Between them the connection stays up, so going to another
+    channel is a ``move_to`` rather than a new handshake.
+    """
+
+    def __init__(self, guild: discord.Guild, settings: Settings) -> None:
+        self.guild = guild
+        self.settings = settings
+        self.voice_client: Optional[discord.VoiceClient] = None
+        self.deadline: Optional[VoiceDeadline] = None
+
+    @property
+    def connected(self) -> bool:
+        return self.voice_client is not None and self.voice_client.is_connected()
+
+    def begin(self, kind: str, seconds: float) -> VoiceDeadline:
+        """Close the current budget as completed and open the next one."""
+        self.end("completed")
+        self.deadline = VoiceDeadline.open(kind, self.guild, seconds)
+        return self.deadline
+
+    def end(self, outcome: str) -> None:
+        if self.deadline is not None:
+            self.deadline.finish(outcome)
+            self.deadline = None
+
+    async def goto(self, channel: discord.VoiceChannel) -> discord.VoiceClient:
+        """Connect or move to ``channel``, unless the voice breaker rules it out.
+
+        Raises :class:`VoiceUnavailable` for a skipped channel; connect and
+        move failures are reported to the breaker before propagating.
+        """
+        if self.connected and _in_channel(self.guild, channel):
+            return self.voice_client
+
+        breaker = get_voice_breaker()
+        if breaker is not None:
+            reason = breaker.check(channel)
+            if reason is not None:
+                raise VoiceUnavailable(f"{channel.name}: {reason}")
+        try:
+            if not self.connected:
+                self.voice_client = await _connect(channel, self.settings, self.deadline)
+                logger.info("Joined %s in %s", channel.name, self.guild.name)
+            else:
+                await _move(self.voice_client, channel, self.settings, self.deadline)
+                logger.info("Moved to %s in %s", channel.name, self.guild.name)
+        except (asyncio.TimeoutError, discord.ClientException, discord.HTTPException) as error:
+            # Running out of the whole session's budget is not the channel's fault.
+            session_expired = isinstance(error, VoiceTimeout) and error.reason.startswith("session:")
+            if breaker is not None and not session_expired:
+                breaker.record_failure(channel, error)
+            raise
+        if breaker is not None:
+            breaker.record_success(channel)
+        return self.voice_client
+
+    async def visit(self, channel: discord.VoiceChannel, clip: Optional[str] = None) -> bool:
+        """Go to ``channel`` and play a clip; False when it was skipped or had nothing to play.
+
+        A channel that cannot be joined is logged and skipped so the rest of
+        a tour goes ahead; only running out of the session budget propagates.
+        """
+        try:
+            voice_client = await self.goto(channel)
+        except VoiceUnavailable as error:
+            logger.info("Skipping voice channel in %s: %s", self.guild.name, error)
             return False
-
-        victim_channel = member.voice.channel
-
-        if guild.voice_client:
-            await guild.voice_client.disconnect(force=True)
-            await asyncio.sleep(1)
-
-        voice_client = await victim_channel.connect(
-            timeout=settings.connection_timeout, reconnect=False, self_deaf=False, self_mute=False
+        except (asyncio.TimeoutError, discord.ClientException, discord.HTTPException) as error:
+            if isinstance(error, VoiceTimeout) and error.reason.startswith("session:"):
+                raise
+            logger.warning("Could not join %s in %s: %s", channel.name, self.guild.name, error)
+            return False
+        await self.deadline.sleep(self.settings.playback_delay_seconds)
+        return await _play_clip(voice_client, self.settings, self.deadline, clip)
+
+    async def kidnap(
+        self,
+        members: Sequence[discord.Member],
+        destination: discord.VoiceChannel,
+        clip: Optional[str] = None,
+        on_moved: Optional[Callable[[discord.Member], None]] = None,
+    ) -> List[discord.Member]:
+        """Play once in each victim's channel, then move its victims concurrently.
+
+        At most ``kidnap_move_concurrency`` moves are in flight; discord.py
+        queues anything beyond the route's rate limit. ``on_moved`` is called
+        for each member as soon as their move succeeds.
+        """
+        deadline = self.deadline
+        if "move_members" in missing_permissions(destination, move_members=True):
+            raise VoiceUnavailable(f"cannot move members into {destination.name}")
+        moves = asyncio.Semaphore(max(1, self.settings.kidnap_move_concurrency))
+        moved: List[discord.Member] = []
+
+        async def move_member(member: discord.Member) -> None:
+            async with moves:
+                await deadline.run(
+                    "move_member",
+                    member.move_to(destination),
+                    self.settings.voice_operation_timeout,
+                    member_id=member.id,
+                )
+
+        for channel, victims in _group_by_channel(members):
+            await self.visit(channel, clip)
+
+            results = await asyncio.gather(
+                *(move_member(victim) for victim in victims), return_exceptions=True
+            )
+            expired: Optional[VoiceTimeout] = None
+            for victim, result in zip(victims, results):
+                if result is None:
+                    moved.append(victim)
+                    if on_moved is not None:
+                        on_moved(victim)
+                    logger.info("Moved %s to %s", victim.display_name, destination.name)
+                    continue
+                if isinstance(result, VoiceTimeout) and result.reason.startswith("session:"):
+                    expired = result
+                logger.warning("Could not move %s: %s", victim.display_name, result)
+            if expired is not None:
+                raise expired
+
+        if self.connected:
+            deadline.enter(destination)
+            await deadline.run(
+                "move_self",
+                self.guild.me.move_to(destination),
+                self.settings.voice_operation_timeout,
+            )
+        logger.info(
+            "Kidnapped %d of %d member(s) in %s", len(moved), len(members), self.guild.name
         )
-        logger.info("Joined %s to kidnap %s", victim_channel.name, member.display_name)
+        return moved
 
-        await guild.me.edit(mute=False, deafen=False)
-        await asyncio.sleep(settings.playback_delay_seconds)
+    async def leave(self, delay: bool = True) -> None:
+        if not self.connected:
+            return
+        if delay:
+            await self.deadline.sleep(self.settings.disconnect_delay_seconds)
+        await self.deadline.run(
+            "disconnect",
+            self.voice_client.disconnect(force=True),
+            self.settings.voice_operation_timeout,
+        )
+        logger.info("Left voice in %s", self.guild.name)
+        self.voice_client = None
+
+    def log_error(self, what: str, error: Exception) -> None:
+        if isinstance(error, VoiceTimeout):
+            elapsed = self.deadline.elapsed() if self.deadline is not None else 0.0
+            logger.error(
+                "Voice %s: %s timed out in %s after %.1fs",
+                what,
+                error.reason,
+                self.guild.name,
+                elapsed,
+            )
+        elif isinstance(error, asyncio.TimeoutError):
+            logger.error("Voice %s: connection timeout in %s", what, self.guild.name)
+        elif isinstance(error, discord.ClientException):
+            logger.error("Voice %s: ClientException in %s: %s", what, self.guild.name, error)
+        else:
+            logger.error("Voice %s failed in %s: %s", what, self.guild.name, error)
 
-        if settings.audio_file.exists():
-            ffmpeg_path = settings.ffmpeg_path
-            executable = str(ffmpeg_path)
-            if not ffmpeg_path.exists():
-                logger.warning("FFmpeg executable not found at %s", ffmpeg_path)
-            audio_source = discord.FFmpegPCMAudio(str(settings.audio_file), executable=executable)
+    async def close(self, outcome: str) -> None:
+        """Drop the connection, whatever state it is in, and end the budget."""
+        self.voice_client = None
+        await _release_voice(self.guild, self.settings)
+        self.end(outcome)
 
-            def after_playback(error: Exception | None) -> None:
-                if error:
-                    logger.error("Kidnap playback error: %s", error)
 
-            voice_client.play(audio_source, after=after_playback)
-            logger.info("Playing kidnap sound for %s", member.display_name)
+async def join_play_leave(
+    channel: discord.VoiceChannel, settings: Settings, clip: Optional[str] = None
+) -> bool:
+    """Visit one channel on a connection of its own; True when the clip played."""
+    session = VoiceSession(channel.guild, settings)
+    session.begin("visit", settings.voice_session_timeout)
+    outcome = "failed"
+    played = False
+    try:
+        played = await session.visit(channel, clip)
+        if played:
+            logger.info("Played %s in %s", clip or "a random clip", channel.name)
+            await session.leave()
+            outcome = "completed"
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    except Exception as error:  # pragma: no cover - logging branch
+        session.log_error("visit", error)
+    finally:
+        await session.close(outcome)
+    return played
 
-            while voice_client.is_playing():
-                await asyncio.sleep(1)
 
-        await member.move_to(afk_channel)
-        logger.info("Moved %s to AFK channel", member.display_name)
+async def tour_channels(
+    channels: Sequence[discord.VoiceChannel],
+    settings: Settings,
+    clip: Optional[str] = None,
+) -> List[discord.VoiceChannel]:
+    """Visit several channels of one guild over a single voice connection.
+
+    The bot connects to the first occupied channel, then moves between the
+    rest with ``move_to`` and disconnects once at the end. Channels that
+    emptied while waiting their turn are skipped. Returns the channels where
+    the clip played. The session budget is ``session_timeout`` per channel.
+    """
+    if not channels:
+        return []
+
+    guild = channels[0].guild
+    session = VoiceSession(guild, settings)
+    session.begin("tour", settings.voice_session_timeout * len(channels))
+    outcome = "failed"
+    visited: List[discord.VoiceChannel] = []
+    try:
+        for channel in channels:
+            if not _has_listeners(channel):
+                logger.info("Skipping %s in %s, it emptied", channel.name, guild.name)
+                continue
+            if await session.visit(channel, clip):
+                visited.append(channel)
+        await session.leave()
+        logger.info("Tour of %s finished: %d channel(s)", guild.name, len(visited))
+        outcome = "completed"
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    except Exception as error:  # pragma: no cover - logging branch
+        session.log_error("tour", error)
+    finally:
+        await session.close(outcome)
+    return visited
 
-        await guild.me.move_to(afk_channel)
-        await asyncio.sleep(settings.disconnect_delay_seconds)
 
-        await voice_client.disconnect(force=True)
-        logger.info("Kidnap complete for %s", member.display_name)
+async def kidnap_members(
+    settings: Settings,
+    guild: discord.Guild,
+    members: Sequence[discord.Member],
+    destination: discord.VoiceChannel,
+    clip: Optional[str] = None,
+) -> List[discord.Member]:
+    """Kidnap several members of one guild in a single voice session.
+
+    Victims are grouped by the channel they sit in; see
+    :meth:`VoiceSession.kidnap`. Returns the members that were moved, even
+    when the session fails part way. The session budget is
+    ``session_timeout`` per source channel.
+    """
+    groups = _group_by_channel(members)
+    if not groups:
+        return []
+
+    session = VoiceSession(guild, settings)
+    session.begin("kidnap", settings.voice_session_timeout * len(groups))
+    outcome = "failed"
+    moved: List[discord.Member] = []
+    try:
+        await session.kidnap(members, destination, clip, on_moved=moved.append)
+        await session.leave()
+        outcome = "completed"
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    except Exception as error:  # pragma: no cover - logging branch
+        session.log_error("kidnap", error)
+    finally:
+        await session.close(outcome)
+    return moved
 
-        return True
 
-    except Exception as error:  # pragma: no cover - logging branch
-        logger.error("Error during kidnap execution: %s", error)
-        if guild.voice_client:
-            await guild.voice_client.disconnect(force=True)
-        return False
+async def execute_kidnap(
+    settings: Settings,
+    guild: discord.Guild,
+    member: discord.Member,
+    afk_channel: discord.VoiceChannel,
+    clip: Optional[str] = None,
+) -> bool:
+    return bool(await kidnap_members(settings, guild, [member], afk_channel, clip))
 
 
 __all__ = [
+    "VoiceDeadline",
+    "VoiceSession",
+    "VoiceTimeout",
     "execute_kidnap",
     "get_users_in_voice_channels",
     "get_users_in_voice_channels_per_guild",
     "join_play_leave",
+    "kidnap_members",
+    "play_until_done",
+    "tour_channels",
+    "voice_stats",
 ]
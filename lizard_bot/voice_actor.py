@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Union
+
+import discord
+
+from .settings import Settings, logger
+from .voice import VoiceSession
+
+
+@dataclass
+class _Visit:
+    channel: discord.VoiceChannel
+    clip: Optional[str]
+    skip_empty: bool
+    future: "asyncio.Future[bool]"
+    on_start: List[Callable[[], None]] = field(default_factory=list)
+
+
+@dataclass
+class _Kidnap:
+    member: discord.Member
+    destination: discord.VoiceChannel
+    clip: Optional[str]
+    future: "asyncio.Future[bool]"
+    on_start: List[Callable[[], None]] = field(default_factory=list)
+
+
+_Job = Union[_Visit, _Kidnap]
+
+
+@dataclass
+class ActorStats:
+    """Request counters for one guild's voice actor."""
+
+    requests: int = 0
+    merged: int = 0
+    sessions: int = 0
+    reused: int = 0
+    kidnap_batches: int = 0
+    failures: int = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "merged": self.merged,
+            "sessions": self.sessions,
+            "reused": self.reused,
+            "kidnap_batches": self.kidnap_batches,
+            "failures": self.failures,
+        }
+
+
+def _occupied(channel: discord.VoiceChannel) -> bool:
+    return any(not member.bot for member in channel.members)
+
+
+def _settle(future: "asyncio.Future[bool]", result: bool) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+class GuildVoiceActor:
+    """Runs one guild's voice work in order over a single connection.
+
+    Callers enqueue requests and await their result. A visit to a channel
+    that is already queued with the same clip joins that request instead
+    of queueing another. Queued kidnaps to the same destination run as one
+    batch. After the queue empties the connection lingers for
+    ``disconnect_delay_seconds``; work that arrives meanwhile, such as the
+    pending kidnaps resolved after a visit, reuses it without reconnecting.
+    """
+
+    def __init__(self, guild: discord.Guild, settings: Settings) -> None:
+        self.guild = guild
+        self.settings = settings
+        self.stats = ActorStats()
+        self._queue: Deque[_Job] = deque()
+        self._arrived = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._task is not None
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def visit(
+        self,
+        channel: discord.VoiceChannel,
+        clip: Optional[str] = None,
+        skip_empty: bool = False,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> "asyncio.Future[bool]":
+        """Queue a visit; the future is True once the clip has played there.
+
+        With ``skip_empty`` the visit is dropped (False) if nobody is in the
+        channel by the time its turn comes. ``on_start`` is called when its
+        turn comes, after any work queued ahead of it.
+        """
+        self.stats.requests += 1
+        for job in self._queue:
+            if isinstance(job, _Visit) and job.channel.id == channel.id and job.clip == clip:
+                self.stats.merged += 1
+                job.skip_empty = job.skip_empty and skip_empty
+                if on_start is not None:
+                    job.on_start.append(on_start)
+                return job.future
+        job = _Visit(channel, clip, skip_empty, asyncio.get_running_loop().create_future())
+        if on_start is not None:
+            job.on_start.append(on_start)
+        self._enqueue(job)
+        return job.future
+
+    def kidnap(
+        self,
+        member: discord.Member,
+        destination: discord.VoiceChannel,
+        clip: Optional[str] = None,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> "asyncio.Future[bool]":
+        """Queue a kidnap; the future is True once the member has been moved."""
+        self.stats.requests += 1
+        for job in self._queue:
+            if isinstance(job, _Kidnap) and job.member.id == member.id:
+                self.stats.merged += 1
+                if on_start is not None:
+                    job.on_start.append(on_start)
+                return job.future
+        job = _Kidnap(member, destination, clip, asyncio.get_running_loop().create_future())
+        if on_start is not None:
+            job.on_start.append(on_start)
+        self._enqueue(job)
+        return job.future
+
+    async def tour(
+        self,
+        channels: Sequence[discord.VoiceChannel],
+        clip: Optional[str] = None,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> List[discord.VoiceChannel]:
+        """Visit each channel that still has people in it; returns where the clip played."""
+        futures = [
+            self.visit(channel, clip, skip_empty=True, on_start=on_start) for channel in channels
+        ]
+        results = await asyncio.gather(*(asyncio.shield(future) for future in futures))
+        return [channel for channel, played in zip(channels, results) if played]
+
+    async def kidnap_members(
+        self,
+        members: Sequence[discord.Member],
+        destination: discord.VoiceChannel,
+        clip: Optional[str] = None,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> List[discord.Member]:
+        """Kidnap ``members`` in one batch; returns the ones that were moved."""
+        futures = [self.kidnap(member, destination, clip, on_start) for member in members]
+        results = await asyncio.gather(*(asyncio.shield(future) for future in futures))
+        return [member for member, moved in zip(members, results) if moved]
+
+    def _enqueue(self, job: _Job) -> None:
+        self._queue.append(job)
+        self._arrived.set()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            self._task.add_done_callback(self._stopped)
+
+    def _stopped(self, task: "asyncio.Task[None]") -> None:
+        self._task = None
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error("Voice actor for %s crashed: %s", self.guild.name, task.exception())
+        if self._queue:
+            # Work queued while the actor was closing its session.
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            self._task.add_done_callback(self._stopped)
+
+    def _next_batch(self) -> List[_Job]:
+        job = self._queue.popleft()
+        if isinstance(job, _Visit):
+            return [job]
+        batch: List[_Job] = [job]
+        for other in list(self._queue):
+            if isinstance(other, _Kidnap) and other.destination.id == job.destination.id:
+                self._queue.remove(other)
+                batch.append(other)
+        return batch
+
+    async def _run(self) -> None:
+        session = VoiceSession(self.guild, self.settings)
+        self.stats.sessions += 1
+        outcome = "completed"
+        batch: List[_Job] = []
+        try:
+            while True:
+                while self._queue:
+                    if session.connected:
+                        self.stats.reused += 1
+                    batch = self._next_batch()
+                    await self._execute(session, batch)
+                    batch = []
+                if session.connected and not await self._linger():
+                    await self._leave(session)
+                if not self._queue:
+                    break
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            for job in batch + list(self._queue):
+                job.future.cancel()
+            self._queue.clear()
+            raise
+        finally:
+            await session.close(outcome)
+
+    async def _execute(self, session: VoiceSession, batch: List[_Job]) -> None:
+        head = batch[0]
+        for job in batch:
+            for callback in job.on_start:
+                callback()
+        if isinstance(head, _Visit) and head.skip_empty and not _occupied(head.channel):
+            logger.info("Skipping %s in %s, it emptied", head.channel.name, self.guild.name)
+            _settle(head.future, False)
+            return
+
+        try:
+            if isinstance(head, _Visit):
+                session.begin("visit", self.settings.voice_session_timeout)
+                _settle(head.future, await session.visit(head.channel, head.clip))
+            else:
+                self.stats.kidnap_batches += 1
+                # A member mid-disconnect can still have a voice state without a channel.
+                sources = {
+                    job.member.voice.channel.id
+                    for job in batch
+                    if job.member.voice and job.member.voice.channel
+                }
+                session.begin("kidnap", self.settings.voice_session_timeout * max(1, len(sources)))
+                futures = {job.member.id: job.future for job in batch}
+                await session.kidnap(
+                    [job.member for job in batch],
+                    head.destination,
+                    head.clip,
+                    on_moved=lambda member: _settle(futures[member.id], True),
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            self.stats.failures += 1
+            session.log_error("visit" if isinstance(head, _Visit) else "kidnap", error)
+            # Start the next request from a clean connection.
+            await session.close("failed")
+        finally:
+            for job in batch:
+                _settle(job.future, False)
+
+    async def _linger(self) -> bool:
+        """Wait up to the disconnect delay for more work; True if some arrived."""
+        self._arrived.clear()
+        if self._queue:
+            return True
+        try:
+            await asyncio.wait_for(self._arrived.wait(), self.settings.disconnect_delay_seconds)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _leave(self, session: VoiceSession) -> None:
+        # The last request's budget has usually run out while lingering.
+        session.begin("disconnect", self.settings.voice_session_timeout)
+        try:
+            await session.leave(delay=False)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            session.log_error("disconnect", error)
+            await session.close("failed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats.snapshot(), queued=self.queued, busy=self.busy)
+
+
+class VoiceActors:
+    """One :class:`GuildVoiceActor` per guild; guilds run independently."""
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self._actors: Dict[int, GuildVoiceActor] = {}
+
+    def for_guild(self, guild: discord.Guild) -> GuildVoiceActor:
+        actor = self._actors.get(guild.id)
+        if actor is None:
+            actor = self._actors[guild.id] = GuildVoiceActor(guild, self.settings)
+        return actor
+
+    def snapshot(self) -> Dict[str, Any]:
+        totals = ActorStats()
+        for actor in self._actors.values():
+            for name, value in actor.stats.snapshot().items():
+                setattr(totals, name, getattr(totals, name) + value)
+        return dict(
+            totals.snapshot(),
+            guilds=len(self._actors),
+            busy=sum(1 for actor in self._actors.values() if actor.busy),
+            queued=sum(actor.queued for actor in self._actors.values()),
+        )
+
+
+__all__ = ["ActorStats", "GuildVoiceActor", "VoiceActors"]